@@ -1,79 +1,91 @@
-import json
-import re
-import unicodedata
+import os
+import sys
 
-def normalize_name(name):
-    """
-    Nettoie un nom de joueur pour une meilleure correspondance :
-    - Met en minuscules
-    - Supprime les accents et caractères spéciaux
-    - Supprime les suffixes (Jr., III, etc.)
-    """
-    # Supprime les suffixes comme Jr., Sr., II, III, IV
-    name = re.sub(r'\s+(jr|sr|ii|iii|iv)\.?$', '', name.lower().strip())
-    # Normalise les caractères (enlève les accents, etc.)
-    # Ex: "Nikola Jokić" -> "nikola jokic"
-    normalized = unicodedata.normalize('NFD', name).encode('ascii', 'ignore').decode('utf-8')
-    return normalized
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tools"))
+from player_matching import match_names, player_key
+from name_normalization import normalize_name, AliasTable
+from record_io import iter_records, RecordWriter
+from roster_store import RosterStore
+import metrics
 
-def merge_databases_smarter():
+def merge_databases_smarter(master_path='nba_players_updated.json', stats_path='nba_overall_potential.json',
+                            out_path='nba_database_complete_v2.json', aliases_path='name_aliases.json', compact=False,
+                            store_path=None):
     """
     Fusionne les données en normalisant les noms pour une meilleure correspondance.
+    Les fichiers (tableau JSON ou JSONL) sont lus en flux: seuls les noms et les notes restent en mémoire,
+    le fichier principal est relu et réécrit joueur par joueur.
+    Avec store_path, les notes appariées sont aussi relevées dans le roster SQLite (source '2kratings').
+    Renvoie le nombre de joueurs écrits, ou None en cas d'erreur.
     """
     try:
-        with open('nba_players_updated.json', 'r', encoding='utf-8') as f:
-            master_players = json.load(f)
+        # --- ÉTAPE 1: Ne garder que ce qui sert à l'appariement ---
+        full_names, target_ids = [], []
+        for player in iter_records(master_path):
+            full_names.append(f"{player['prenom']} {player['nom']}")
+            target_ids.append(player_key(player))
 
-        with open('nba_overall_potential.json', 'r', encoding='utf-8') as f:
-            new_stats = json.load(f)
+        new_stats, nameless = [], 0
+        for player in iter_records(stats_path):
+            if not player.get('nom'):
+                nameless += 1  # page vide ou bloquée au scraping: rien à apparier
+                continue
+            new_stats.append((player['nom'], player.get('Overall'), player.get('potential')))
 
         print("Fichiers chargés avec succès.")
+        if nameless:
+            print(f"  -> {nameless} enregistrements 2K sans nom ignorés")
+
+        # --- ÉTAPE 2: Apparier les joueurs (alias connus, noms normalisés, puis approché par blocs) ---
+        aliases = AliasTable(aliases_path)
+        with metrics.timed("stage_seconds", stage="match_2kratings"):
+            report = match_names(full_names, [nom for nom, _, _ in new_stats], normalize=normalize_name,
+                                 aliases=aliases, target_ids=target_ids)
+        aliases.save()
+        print(report.summary(len(full_names)))
+        metrics.match_report("merge_2kratings", report, len(full_names))
+        if store_path:
+            with RosterStore(store_path) as store:
+                store.add_ratings("2kratings", ((target_ids[m.target], *new_stats[m.source][1:])
+                                                for m in report.matches))
 
-        # --- ÉTAPE 2: Créer un dictionnaire de stats avec des noms normalisés ---
-        stats_map = {
-            normalize_name(player['nom']): {
-                'Overall': player.get('Overall'),
-                'potential': player.get('potential')
-            } 
-            for player in new_stats
-        }
-        print(f"{len(stats_map)} joueurs avec des stats uniques chargés et normalisés.")
+        for m in report.matches:
+            if m.method == "fuzzy":
+                print(f"  ~ {full_names[m.target]} <-> {new_stats[m.source][0]} (confiance {m.score:.2f})")
 
-        # --- ÉTAPE 3: Parcourir et mettre à jour en utilisant les noms normalisés ---
-        updated_count = 0
-        not_found_players = []
+        # --- ÉTAPE 3: Mettre à jour les joueurs appariés, au fil de la relecture ---
+        matches = report.by_target()
 
-        for player in master_players:
-            full_name = f"{player['prenom']} {player['nom']}"
-            normalized_full_name = normalize_name(full_name)
+        def merged_players():
+            for i, player in enumerate(iter_records(master_path)):
+                m = matches.get(i)
+                if m is not None:
+                    _, player['overall'], player['potential'] = new_stats[m.source]
+                yield player
 
-            if normalized_full_name in stats_map:
-                new_player_stats = stats_map[normalized_full_name]
-                
-                player['overall'] = new_player_stats['Overall']
-                player['potential'] = new_player_stats['potential']
-                
-                updated_count += 1
-            else:
-                not_found_players.append(full_name)
+        updated_count = len(report.matches)
+        not_found_players = [full_names[i] for i in report.unmatched]
 
         print(f"\n{updated_count} joueurs ont été mis à jour.")
 
         if not_found_players:
+            metrics.event("unmatched", stage="merge_2kratings", names=not_found_players)
             print(f"\n{len(not_found_players)} joueurs n'ont toujours pas été trouvés :")
             # Pour ne pas surcharger, on n'affiche que les 10 premiers
             print(", ".join(not_found_players[:10]) + ('...' if len(not_found_players) > 10 else ''))
 
         # --- ÉTAPE 4: Sauvegarder la base de données finale ---
-        with open('nba_database_complete_v2.json', 'w', encoding='utf-8') as f:
-            json.dump(master_players, f, indent=2, ensure_ascii=False)
+        with RecordWriter(out_path, indent=2, compact=compact) as out:
+            written = out.write_all(merged_players())
 
-        print("\n✅ Fusion améliorée terminée ! Fichier prêt dans 'nba_database_complete_v2.json'.")
+        print(f"\n✅ Fusion améliorée terminée ! Fichier prêt dans '{out_path}'.")
+        return written
 
     except FileNotFoundError as e:
         print(f"❌ ERREUR : Fichier manquant : '{e.filename}'")
     except Exception as e:
         print(f"❌ Une erreur inattendue est survenue : {e}")
 
-# Lancer la fusion améliorée
-merge_databases_smarter()
\ No newline at end of file
+if __name__ == "__main__":
+    # Lancer la fusion améliorée
+    merge_databases_smarter()
@@ -1,66 +1,89 @@
-import json
+import os
+import sys
 
-def update_player_ratings():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tools"))
+from player_matching import match_names, player_key
+from name_normalization import AliasTable
+from record_io import iter_records, RecordWriter
+from roster_store import RosterStore
+import metrics
+
+def update_player_ratings(ratings_path='nba_2k_ratings_ALL_PAGES.json', players_path='nba_players_with_age.json',
+                          out_path='nba_players_updated.json', aliases_path='name_aliases.json', compact=False,
+                          store_path=None):
     """
     Met à jour les notes 'overall' des joueurs d'un fichier principal
     en utilisant un fichier de référence pour les notes.
+    Les fichiers sont lus en flux (tableau JSON ou JSONL): seuls les noms et les notes restent en mémoire.
+    Avec store_path, les notes appariées sont aussi relevées dans le roster SQLite (source 'hoopshype').
+    Renvoie le nombre de joueurs écrits, ou None en cas d'erreur.
     """
     try:
-        # --- ÉTAPE 1: Charger les deux fichiers JSON ---
-        with open('nba_2k_ratings_ALL_PAGES.json', 'r', encoding='utf-8') as f:
-            scraped_data = json.load(f) # Fichier avec les bonnes notes
+        # --- ÉTAPE 1: Lire les noms et notes du fichier de référence, les noms du fichier principal ---
+        scraped_data = [(player['nom'], player['note_generale']) for player in iter_records(ratings_path)] # Fichier avec les bonnes notes
 
-        with open('nba_players_with_age.json', 'r', encoding='utf-8') as f:
-            main_players_data = json.load(f) # Votre fichier à mettre à jour
+        full_names, target_ids = [], [] # Votre fichier à mettre à jour
+        for player in iter_records(players_path):
+            full_names.append(f"{player['prenom']} {player['nom']}")
+            target_ids.append(player_key(player))
 
         print("Fichiers chargés avec succès.")
 
-        # --- ÉTAPE 2: Créer un dictionnaire de notes pour une recherche rapide ---
-        # Cela évite les doublons et rend la recherche quasi instantanée.
-        # La clé est le nom du joueur, la valeur est sa note.
-        ratings_map = {player['nom']: player['note_generale'] for player in scraped_data}
-        print(f"{len(ratings_map)} notes uniques ont été extraites.")
+        # --- ÉTAPE 2: Apparier les joueurs avec le fichier de notes ---
+        # Égalité exacte des noms normalisés d'abord (Dončić vs Doncic), puis
+        # correspondance approchée limitée aux noms proches (même nom de famille, même phonétique...).
+        # Les corrections connues (name_aliases.json) passent avant tout le reste.
+        aliases = AliasTable(aliases_path)
+        with metrics.timed("stage_seconds", stage="match_hoopshype"):
+            report = match_names(full_names, [nom for nom, _ in scraped_data], aliases=aliases, target_ids=target_ids)
+        aliases.save()
+        print(report.summary(len(full_names)))
+        metrics.match_report("apply_hoopshype", report, len(full_names))
+        if store_path:
+            with RosterStore(store_path) as store:
+                store.add_ratings("hoopshype", ((target_ids[m.target], scraped_data[m.source][1], None)
+                                                for m in report.matches))
+
+        # --- ÉTAPE 3: Relire le fichier principal et mettre à jour les notes au passage ---
+        matches = report.by_target()
 
-        # --- ÉTAPE 3: Parcourir votre fichier principal et mettre à jour les notes ---
-        updated_count = 0
-        not_found_players = []
+        def updated_players():
+            for i, player in enumerate(iter_records(players_path)):
+                m = matches.get(i)
+                if m is not None:
+                    source_name, new_rating = scraped_data[m.source]
+                    old_rating = player['overall']
 
-        for player in main_players_data:
-            # On construit le nom complet à partir des champs "prenom" et "nom"
-            # Note : Certains noms peuvent avoir des orthographes différentes (ex: Dončić vs Doncic)
-            # Cette version simple fonctionnera pour la majorité des cas.
-            full_name = f"{player['prenom']} {player['nom']}"
+                    # On met à jour la note
+                    player['overall'] = new_rating
+                    confidence = "" if m.method != "fuzzy" else f", confiance {m.score:.2f} avec '{source_name}'"
+                    print(f"Mise à jour : {full_names[i]} (Ancienne note : {old_rating}, Nouvelle note : {new_rating}{confidence})")
+                yield player
 
-            # On cherche le nom complet dans notre dictionnaire de notes
-            if full_name in ratings_map:
-                new_rating = ratings_map[full_name]
-                old_rating = player['overall']
-                
-                # On met à jour la note
-                player['overall'] = new_rating
-                updated_count += 1
-                print(f"Mise à jour : {full_name} (Ancienne note : {old_rating}, Nouvelle note : {new_rating})")
-            else:
-                not_found_players.append(full_name)
+        # --- ÉTAPE 4: Sauvegarder le résultat dans un nouveau fichier, joueur par joueur ---
+        with RecordWriter(out_path, indent=2, compact=compact) as out:
+            written = out.write_all(updated_players())
+
+        updated_count = len(report.matches)
+        not_found_players = [full_names[i] for i in report.unmatched]
 
         print(f"\n{updated_count} joueurs ont été mis à jour.")
 
         # Afficher les joueurs qui n'ont pas été trouvés
         if not_found_players:
+            metrics.event("unmatched", stage="apply_hoopshype", names=not_found_players)
             print("\nLes joueurs suivants n'ont pas été trouvés dans le fichier de notes (vérifiez l'orthographe) :")
             for name in not_found_players:
                 print(f"- {name}")
 
-        # --- ÉTAPE 4: Sauvegarder le résultat dans un nouveau fichier ---
-        with open('nba_players_updated.json', 'w', encoding='utf-8') as f:
-            json.dump(main_players_data, f, indent=2, ensure_ascii=False)
-
-        print("\n✅ Opération terminée ! Le fichier 'nba_players_updated.json' a été créé avec toutes les données à jour.")
+        print(f"\n✅ Opération terminée ! Le fichier '{out_path}' a été créé avec toutes les données à jour.")
+        return written
 
     except FileNotFoundError as e:
         print(f"❌ ERREUR : Un fichier est manquant. Assurez-vous que '{e.filename}' est dans le même dossier que le script.")
     except Exception as e:
         print(f"❌ Une erreur inattendue est survenue : {e}")
 
-# Lancer la fonction de mise à jour
-update_player_ratings()
\ No newline at end of file
+if __name__ == "__main__":
+    # Lancer la fonction de mise à jour
+    update_player_ratings()
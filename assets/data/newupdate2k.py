@@ -1,110 +1,593 @@
-import json
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-
-# --- Configuration de Selenium ---
-chrome_options = Options()
-# Une fenêtre Chrome va s'ouvrir.
-chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36")
-
-try:
-    driver = webdriver.Chrome(options=chrome_options)
-    print("Une fenêtre Chrome va s'ouvrir. Veuillez ne pas la fermer, le script la pilote.")
-except Exception as e:
-    print(f"ERREUR : Impossible de démarrer chromedriver : {e}")
-    exit()
-
-final_player_data = []
-
-try:
-    # --- La liste complète des 30 équipes ---
-    team_urls = [
-        "https://www.2kratings.com/teams/atlanta-hawks", "https://www.2kratings.com/teams/boston-celtics",
-        "https://www.2kratings.com/teams/brooklyn-nets", "https://www.2kratings.com/teams/charlotte-hornets",
-        "https://www.2kratings.com/teams/chicago-bulls", "https://www.2kratings.com/teams/cleveland-cavaliers",
-        "https://www.2kratings.com/teams/dallas-mavericks", "https://www.2kratings.com/teams/denver-nuggets",
-        "https://www.2kratings.com/teams/detroit-pistons", "https://www.2kratings.com/teams/golden-state-warriors",
-        "https://www.2kratings.com/teams/houston-rockets", "https://www.2kratings.com/teams/indiana-pacers",
-        "https://www.2kratings.com/teams/la-clippers", "https://www.2kratings.com/teams/los-angeles-lakers",
-        "https://www.2kratings.com/teams/memphis-grizzlies", "https://www.2kratings.com/teams/miami-heat",
-        "https://www.2kratings.com/teams/milwaukee-bucks", "https://www.2kratings.com/teams/minnesota-timberwolves",
-        "https://www.2kratings.com/teams/new-orleans-pelicans", "https://www.2kratings.com/teams/new-york-knicks",
-        "https://www.2kratings.com/teams/oklahoma-city-thunder", "https://www.2kratings.com/teams/orlando-magic",
-        "https://www.2kratings.com/teams/philadelphia-76ers", "https://www.2kratings.com/teams/phoenix-suns",
-        "https://www.2kratings.com/teams/portland-trail-blazers", "https://www.2kratings.com/teams/sacramento-kings",
-        "https://www.2kratings.com/teams/san-antonio-spurs", "https://www.2kratings.com/teams/toronto-raptors",
-        "https://www.2kratings.com/teams/utah-jazz", "https://www.2kratings.com/teams/washington-wizards"
-    ]
-    
-    # --- ÉTAPE 1: Lister tous les joueurs ---
-    player_links = set()
-    for team_url in team_urls:
-        print(f"Analyse de l'équipe : {team_url}")
-        driver.get(team_url)
-        time.sleep(1)
-        team_soup = BeautifulSoup(driver.page_source, 'html.parser')
-        player_rows = team_soup.find('tbody').find_all('tr')
-        for row in player_rows:
-            link_tag = row.find('a')
-            if link_tag and 'href' in link_tag.attrs:
-                player_links.add(link_tag['href'])
-    print(f"\n{len(player_links)} joueurs uniques trouvés. Début du scraping des stats...")
-
-    # --- ÉTAPE 2: Visiter chaque page et extraire les stats voulues ---
-    for player_url in list(player_links):
-        driver.get(player_url)
-        print(f"Scraping de : {player_url}")
-        
-        # On fait défiler pour charger les éléments
-        driver.execute_script("window.scrollTo(0, 500);")
-        time.sleep(1)
-
-        player_soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        player_name = player_soup.find('h1').text.strip()
-        overall_rating = None
-        potential_rating = None
-
-        # Recherche de la note "Overall"
-        overall_tag = player_soup.find('span', class_='attribute-box-player')
-        if overall_tag:
-            try:
-                overall_rating = int(overall_tag.text.strip())
-            except ValueError:
-                print(f"  -> Avertissement: Impossible de lire l'Overall pour {player_name}")
-
-        # Recherche de la note "Potential"
-        stat_cards = player_soup.find_all('div', class_='card-header')
-        for card in stat_cards:
-            h4 = card.find('h4', class_='card-title')
-            if h4 and 'Potential' in h4.text:
-                value_span = h4.find('span', class_=lambda c: c and c.startswith('attribute-box'))
-                if value_span:
-                    try:
-                        potential_rating = int(value_span.text.strip())
-                        break # On a trouvé le potentiel, on arrête de chercher
-                    except ValueError:
-                        print(f"  -> Avertissement: Impossible de lire le Potentiel pour {player_name}")
-
-        # On crée l'objet JSON avec la structure demandée
-        player_data = {
-            "nom": player_name,
-            "Overall": overall_rating,
-            "potential": potential_rating
-        }
-        final_player_data.append(player_data)
-        
-    # --- ÉTAPE 3: Sauvegarde finale ---
-    with open('nba_overall_potential.json', 'w', encoding='utf-8') as f:
-        json.dump(final_player_data, f, indent=4, ensure_ascii=False) # indent=4 pour une meilleure lisibilité
-        
-    print(f"\n✅ Mission accomplie ! {len(final_player_data)} joueurs ont été sauvegardés dans 'nba_overall_potential.json'.")
-
-except Exception as e:
-    print(f"\n❌ Une erreur est survenue : {e}")
-
-finally:
-    print("Fermeture du navigateur.")
-    driver.quit()
\ No newline at end of file
+import os
+import re
+import sys
+import json
+import time
+import queue
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from urllib.parse import urljoin, urlsplit
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+from bs4 import BeautifulSoup, SoupStrainer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tools"))
+from rate_control import RateController, host_of
+from record_io import RecordWriter
+from page_store import PageStore, read_page
+from checkpoint import write_atomic
+import metrics
+
+try:
+    # parseur C + XPath compilés: ~20x plus rapide que BeautifulSoup/html.parser sur une page joueur
+    import lxml.html
+    from lxml import etree
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+BASE_URL = "https://www.2kratings.com"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36"
+
+# --- La liste complète des 30 équipes ---
+TEAM_SLUGS = [
+    "atlanta-hawks", "boston-celtics", "brooklyn-nets", "charlotte-hornets",
+    "chicago-bulls", "cleveland-cavaliers", "dallas-mavericks", "denver-nuggets",
+    "detroit-pistons", "golden-state-warriors", "houston-rockets", "indiana-pacers",
+    "la-clippers", "los-angeles-lakers", "memphis-grizzlies", "miami-heat",
+    "milwaukee-bucks", "minnesota-timberwolves", "new-orleans-pelicans", "new-york-knicks",
+    "oklahoma-city-thunder", "orlando-magic", "philadelphia-76ers", "phoenix-suns",
+    "portland-trail-blazers", "sacramento-kings", "san-antonio-spurs", "toronto-raptors",
+    "utah-jazz", "washington-wizards",
+]
+
+
+def team_urls(base_url: str = BASE_URL) -> list[str]:
+    return [f"{base_url.rstrip('/')}/teams/{slug}" for slug in TEAM_SLUGS]
+
+
+def rebase(url: str, base_url: str) -> str:
+    """Réécrit l'hôte d'un lien absolu (utile pour rejouer les pages sur un serveur local)."""
+    parts = urlsplit(url)
+    return urljoin(base_url.rstrip("/") + "/", parts.path.lstrip("/"))
+
+
+def make_driver(headless: bool = False):
+    chrome_options = Options()
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--window-size=1280,2000")
+        # pas d'images: on ne lit que du texte
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    return webdriver.Chrome(options=chrome_options)
+
+
+# --- Extraction HTML (sans navigateur, testable sur des pages sauvegardées) ---
+# Chaque backend ne lit que les éléments utiles: XPath ciblés avec lxml, sinon un SoupStrainer
+# limite l'arbre construit par html.parser aux balises lues plus bas.
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if PARSER == "lxml":
+    HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+    TEAM_ROWS = etree.XPath("(//tbody)[1]//tr")
+    PLAYER_H1 = etree.XPath("(//h1)[1]")
+    OVERALL_SPAN = etree.XPath(f"(//span[{_has_class('attribute-box-player')}])[1]")
+    CARD_TITLES = etree.XPath(f"//h4[{_has_class('card-title')}]")
+else:
+    TEAM_STRAINER = SoupStrainer("tbody")
+    PLAYER_STRAINER = SoupStrainer(["h1", "span", "h4"])
+ATTRIBUTE_BOX_RE = re.compile(r"^attribute-box")
+
+
+def _is_attribute_box(classes: str | None) -> bool:
+    return any(c.startswith("attribute-box") for c in (classes or "").split())
+
+
+def _team_rows_lxml(html: str) -> list[tuple[str, str]]:
+    doc = lxml.html.fromstring(html.encode("utf-8"), parser=HTML_PARSER)
+    rows = []
+    for row in TEAM_ROWS(doc):
+        link_tag = row.find(".//a")
+        if link_tag is not None and link_tag.get("href") is not None:
+            rows.append((link_tag.get("href"), " ".join(row.itertext())))
+    return rows
+
+
+def _team_rows_soup(html: str) -> list[tuple[str, str]]:
+    tbody = BeautifulSoup(html, PARSER, parse_only=TEAM_STRAINER).find('tbody')
+    if tbody is None:
+        return []
+    rows = []
+    for row in tbody.find_all('tr'):
+        link_tag = row.find('a')
+        if link_tag and 'href' in link_tag.attrs:
+            rows.append((link_tag['href'], row.get_text(" ")))
+    return rows
+
+
+def _player_texts_lxml(html: str) -> tuple[str | None, str | None, list[str]]:
+    doc = lxml.html.fromstring(html.encode("utf-8"), parser=HTML_PARSER)
+    h1, overall = PLAYER_H1(doc), OVERALL_SPAN(doc)
+    potentials = []
+    for h4 in CARD_TITLES(doc):
+        if 'Potential' in h4.text_content():
+            span = next((sp for sp in h4.iter('span') if _is_attribute_box(sp.get('class'))), None)
+            if span is not None:
+                potentials.append(span.text_content())
+    return (h1[0].text_content() if h1 else None, overall[0].text_content() if overall else None, potentials)
+
+
+def _player_texts_soup(html: str) -> tuple[str | None, str | None, list[str]]:
+    player_soup = BeautifulSoup(html, PARSER, parse_only=PLAYER_STRAINER)
+    h1 = player_soup.find('h1')
+    overall = player_soup.find('span', class_='attribute-box-player')
+    potentials = []
+    for h4 in player_soup.find_all('h4', class_='card-title'):
+        if 'Potential' in h4.text:
+            value_span = h4.find('span', class_=ATTRIBUTE_BOX_RE)
+            if value_span:
+                potentials.append(value_span.text)
+    return (h1.text if h1 else None, overall.text if overall else None, potentials)
+
+
+def row_fingerprint(text: str) -> str:
+    """Empreinte du texte d'une ligne du tableau d'équipe (nom, poste, note affichée...), espaces normalisés."""
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def parse_team_rows(html: str) -> list[tuple[str, str]]:
+    """(lien, empreinte de la ligne) pour chaque joueur listé dans le tableau d'une équipe."""
+    if not html.strip():
+        return []
+    rows = _team_rows_lxml(html) if PARSER == "lxml" else _team_rows_soup(html)
+    return [(href, row_fingerprint(text)) for href, text in rows]
+
+
+def parse_team_page(html: str) -> list[str]:
+    """Liens des joueurs listés dans le tableau d'une équipe."""
+    return [href for href, _ in parse_team_rows(html)]
+
+
+def parse_player_page(html: str) -> dict:
+    """Construit l'objet {nom, Overall, potential} à partir de la page d'un joueur."""
+    if html.strip():
+        name, overall_text, potential_texts = (_player_texts_lxml if PARSER == "lxml" else _player_texts_soup)(html)
+    else:
+        name, overall_text, potential_texts = None, None, []
+
+    player_name = name.strip() if name is not None else None
+    overall_rating = None
+    potential_rating = None
+
+    # Recherche de la note "Overall"
+    if overall_text is not None:
+        try:
+            overall_rating = int(overall_text.strip())
+        except ValueError:
+            print(f"  -> Avertissement: Impossible de lire l'Overall pour {player_name}")
+
+    # Recherche de la note "Potential" (titre h4.card-title des cartes de stats)
+    for text in potential_texts:
+        try:
+            potential_rating = int(text.strip())
+            break  # On a trouvé le potentiel, on arrête de chercher
+        except ValueError:
+            print(f"  -> Avertissement: Impossible de lire le Potentiel pour {player_name}")
+
+    return {
+        "nom": player_name,
+        "Overall": overall_rating,
+        "potential": potential_rating
+    }
+
+
+def parse_stored(kind: str, path: str):
+    """Tâche du pool de parsing pour une page du PageStore: renvoie (résultat, erreur)."""
+    try:
+        html = read_page(path)
+        return (parse_team_rows(html) if kind == "team" else parse_player_page(html)), None
+    except Exception as e:
+        return None, str(e)
+
+
+def player_link(team_url: str, href: str, base_url: str | None) -> str:
+    href = urljoin(team_url, href)
+    return rebase(href, base_url) if base_url else href
+
+
+class RowState:
+    """
+    État du mode delta: URL joueur -> {"row": empreinte de sa ligne d'équipe, "record": {nom, Overall, potential},
+    "team": URL de la page d'équipe}.
+    Même empreinte qu'au dernier passage = page joueur inutile à revisiter, on reprend l'enregistrement connu.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries: dict[str, dict] = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def record(self, url: str) -> dict | None:
+        entry = self.entries.get(url)
+        return entry["record"] if entry else None
+
+    def is_current(self, url: str, row: str) -> bool:
+        entry = self.entries.get(url)
+        return entry is not None and entry["row"] == row
+
+    def update(self, url: str, row: str, record: dict, team: str | None = None):
+        self.entries[url] = {"row": row, "record": record, "team": team}
+
+    def of_teams(self, teams) -> list[str]:
+        """URLs des joueurs connus de ces équipes (et ceux d'un ancien état sans équipe, par prudence)."""
+        return sorted(url for url, e in self.entries.items() if e.get("team") in teams or e.get("team") is None)
+
+    def save(self, keep):
+        """Ne garde que les joueurs encore listés (`keep`: URLs du dernier passage) puis écrit l'état."""
+        self.entries = {url: e for url, e in self.entries.items() if url in keep}
+        write_atomic(self.path, json.dumps(self.entries, ensure_ascii=False, indent=1, sort_keys=True))
+
+
+def _merge_known(rows: dict[str, str], refreshed: set[str], state: RowState, failed_teams=()):
+    """
+    Joueurs non revisités (ligne inchangée, ou page en échec): dernière version connue, puis sauvegarde de l'état.
+    Les joueurs des équipes dont la page n'a pas pu être lue sont repris tels quels et gardés dans l'état:
+    un crawl partiel ne doit pas faire maigrir le roster. Sans rien à reprendre pour une équipe, on échoue.
+    """
+    for url in sorted(rows):
+        if url not in refreshed and state.record(url) is not None:
+            yield state.record(url)
+    carried = [url for url in state.of_teams(set(failed_teams)) if url not in rows] if failed_teams else []
+    if failed_teams:
+        known = {state.entries[url].get("team") for url in carried}
+        lost = set(failed_teams) - known
+        if lost and None not in known:
+            raise RuntimeError(f"équipes non récupérées et absentes de l'état précédent: {', '.join(sorted(lost))}")
+        print(f"  -> {len(failed_teams)} équipes non récupérées: {len(carried)} joueurs repris de l'état précédent")
+        metrics.event("carried_over", teams=len(failed_teams), players=len(carried))
+    for url in carried:
+        yield state.record(url)
+    state.save(set(rows) | set(carried))
+
+
+def parse_pool(parse_workers: int | None):
+    """
+    Pool de processus pour le parsing (None = un par cœur). 0 = un seul thread, sans processus.
+    Contexte 'spawn': on ne forke pas un processus qui fait déjà tourner les threads des navigateurs.
+    """
+    if parse_workers == 0:
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+# --- Pilotage du navigateur ---
+
+class DriverPool:
+    """Pool borné de navigateurs: chaque tâche emprunte un driver puis le rend."""
+
+    def __init__(self, size: int, headless: bool):
+        self.size = size
+        self.headless = headless
+        self.idle: queue.Queue = queue.Queue()
+        self.created = []
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.created) < self.size:
+                driver = make_driver(self.headless)
+                self.created.append(driver)
+                return driver
+        return self.idle.get()
+
+    def release(self, driver):
+        self.idle.put(driver)
+
+    def close(self):
+        for driver in self.created:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.created.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_page(driver, url: str, css_selectors: list[str], timeout: float, scroll: bool = False) -> tuple[str, int]:
+    """
+    Charge une page et attend explicitement les éléments voulus au lieu d'un sleep fixe.
+    Renvoie le HTML et le nombre de sélecteurs jamais apparus.
+    """
+    driver.get(url)
+    if scroll:
+        # On fait défiler pour charger les éléments
+        driver.execute_script("window.scrollTo(0, 500);")
+    missing = 0
+    for selector in css_selectors:
+        try:
+            WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+            )
+        except TimeoutException:
+            missing += 1
+            print(f"  -> Avertissement: '{selector}' absent après {timeout}s sur {url}")
+    return driver.page_source, missing
+
+
+def _fetch_with_pool(pool: DriverPool, rate: RateController, url: str, selectors: list[str], timeout: float, scroll: bool) -> str:
+    driver = pool.acquire()  # d'abord le navigateur: un créneau de débit réservé ne doit pas attendre un driver
+    try:
+        rate.wait(url)
+        started = time.monotonic()
+        html, missing = load_page(driver, url, selectors, timeout, scroll)
+        latency = time.monotonic() - started
+        if missing == len(selectors):
+            rate.record_throttle(url)  # page vide: probablement bloqués par le site, on ralentit
+        else:
+            rate.record_success(url, latency)
+        if metrics.enabled():
+            host = host_of(url)
+            metrics.inc("http_requests_total", host=host, status="empty" if missing == len(selectors) else "ok")
+            metrics.observe("http_request_seconds", latency, host=host)
+            metrics.inc("http_bytes_total", len(html.encode("utf-8")), host=host)
+            metrics.inc("selectors_missing_total", missing, host=host)
+        return html
+    finally:
+        pool.release(driver)
+
+
+def _parse_as_fetched(fetch_futures: dict, parsers, parse_fn, kind: str, store: PageStore | None, label: str):
+    """
+    Consommateur: chaque page téléchargée est stockée (si `store`) puis confiée au pool de parsing,
+    pendant que les navigateurs continuent. Renvoie (url, résultat) au fil des parsings terminés.
+    """
+    parsing = {}
+
+    def finished(futures):
+        for fut in futures:
+            url = parsing.pop(fut)
+            try:
+                result = fut.result()
+            except Exception as e:
+                print(f"  -> {label} {url} : {e}")
+                metrics.inc("parse_errors_total", kind=kind)
+                continue
+            metrics.inc("pages_parsed_total", kind=kind)
+            yield url, result
+
+    for fut in as_completed(fetch_futures):
+        url = fetch_futures[fut]
+        try:
+            html = fut.result()
+        except Exception as e:
+            print(f"  -> {label} {url} : {e}")
+            metrics.inc("fetch_errors_total", kind=kind)
+            continue
+        if store:
+            store.put(url, kind, html)
+        parsing[parsers.submit(parse_fn, html)] = url
+        yield from finished([f for f in parsing if f.done()])
+    yield from finished(as_completed(list(parsing)))
+
+
+def scrape_players(urls_of_teams: list[str], workers: int = 1, rps: float = 2.0, headless: bool = False,
+                   timeout: float = 10.0, base_url: str | None = None, rate: RateController | None = None,
+                   store: PageStore | None = None, parse_workers: int | None = None,
+                   state: RowState | None = None, delta: bool = False):
+    """
+    Générateur: liste les joueurs des équipes puis visite leurs pages avec un pool
+    de `workers` navigateurs. Les navigateurs ne font que récupérer le HTML; le parsing
+    tourne dans un pool de processus (`parse_workers`). Chaque joueur est renvoyé dès que sa page est parsée.
+    `rps` est le plafond de débit par hôte; le débit réel s'adapte en dessous.
+    Avec `store`, les pages brutes sont gardées (gzip) pour un re-parsing ultérieur (voir reparse).
+    Avec `state`, chaque joueur est mémorisé avec l'empreinte de sa ligne d'équipe; `delta=True` ne visite
+    que les pages dont la ligne a changé ou qui sont nouvelles, les autres joueurs sont repris de l'état.
+    """
+    rate = rate or RateController(initial_rps=min(1.0, rps), max_rps=rps, cooldown=10.0)
+    with DriverPool(workers, headless) as pool, ThreadPoolExecutor(max_workers=workers) as executor, \
+            parse_pool(parse_workers) as parsers:
+        # --- ÉTAPE 1: Lister tous les joueurs (avec l'empreinte de leur ligne) ---
+        rows: dict[str, str] = {}
+        team_of: dict[str, str] = {}
+        futures = {
+            executor.submit(_fetch_with_pool, pool, rate, url, ["tbody tr"], timeout, False): url
+            for url in urls_of_teams
+        }
+        for team_url, team_rows in _parse_as_fetched(futures, parsers, parse_team_rows, "team", store, "Équipe ignorée"):
+            print(f"Analyse de l'équipe : {team_url} ({len(team_rows)} joueurs)")
+            for href, row in team_rows:
+                url = player_link(team_url, href, base_url)
+                rows[url] = row
+                team_of[url] = team_url
+        # page en erreur ou tableau vide (page bloquée): équipe non récupérée
+        failed_teams = sorted(set(urls_of_teams) - set(team_of.values()))
+        for team_url in failed_teams:
+            print(f"  -> Équipe non récupérée : {team_url}")
+        player_links = sorted(rows)
+        print(f"\n{len(player_links)} joueurs uniques trouvés. Début du scraping des stats...")
+        if delta and state is not None:
+            player_links = [url for url in player_links if not state.is_current(url, rows[url])]
+            new = sum(1 for url in player_links if state.record(url) is None)
+            print(f"Mode delta: {len(rows) - len(player_links)} lignes inchangées, {len(player_links)} pages à visiter "
+                  f"(dont {new} nouveaux joueurs).")
+            metrics.event("delta", rows=len(rows), unchanged=len(rows) - len(player_links),
+                          to_visit=len(player_links), new=new)
+
+        # --- ÉTAPE 2: Visiter chaque page et extraire les stats voulues ---
+        selectors = ["h1", "span.attribute-box-player", "h4.card-title"]
+        refreshed = set()
+        nameless = player_links
+        for attempt in range(2):  # une page sans nom (vide, bloquée) est retentée une fois
+            if attempt:
+                print(f"  -> {len(nameless)} pages joueurs sans nom, nouvel essai")
+            futures = {
+                executor.submit(_fetch_with_pool, pool, rate, url, selectors, timeout, True): url
+                for url in nameless
+            }
+            nameless = []
+            for player_url, player_data in _parse_as_fetched(futures, parsers, parse_player_page, "player", store,
+                                                             "Joueur ignoré"):
+                if not player_data.get("nom"):
+                    nameless.append(player_url)
+                    continue
+                print(f"Scraping de : {player_url}")
+                if state is not None:
+                    if player_data.get("Overall") is not None:
+                        state.update(player_url, rows[player_url], player_data, team_of[player_url])
+                    elif state.record(player_url) is not None:
+                        continue  # page incomplète: la dernière version connue est reprise plus bas
+                refreshed.add(player_url)
+                yield player_data
+            if not nameless:
+                break
+        if nameless:
+            print(f"  -> {len(nameless)} pages joueurs toujours sans nom, ignorées")
+            metrics.inc("players_skipped_total", len(nameless), reason="no_name")
+        if state is not None:
+            yield from _merge_known(rows, refreshed, state, failed_teams)
+        elif failed_teams:
+            raise RuntimeError(f"{len(failed_teams)} équipes non récupérées et aucun état pour reprendre leurs joueurs")
+        rate.report()
+        if store:
+            store.report()
+
+
+def reparse(store: PageStore, base_url: str | None = None, parse_workers: int | None = None,
+            state: RowState | None = None):
+    """
+    Générateur: rejoue le parsing d'un crawl stocké, sans navigateur ni réseau.
+    Les pages d'équipe donnent la liste des joueurs, puis chaque page joueur stockée est re-parsée
+    (par URL triée: la sortie est stable). Seuls les chemins des fichiers transitent vers le pool.
+    Avec `state`, l'état du mode delta est remis à jour avec les enregistrements re-parsés, et les joueurs
+    absents du stockage (page d'équipe ou joueur manquante ou illisible) sont repris de l'état, comme un crawl.
+    """
+    teams, players = store.entries("team"), store.entries("player")
+    with parse_pool(parse_workers) as parsers:
+        team_list = sorted(teams)
+        rows: dict[str, str] = {}
+        team_of: dict[str, str] = {}
+        failed_teams = []
+        for team_url, (result, error) in zip(team_list, parsers.map(
+                parse_stored, ["team"] * len(team_list), [store.file_of(teams[u]) for u in team_list])):
+            if error or not result:
+                print(f"  -> Équipe ignorée {team_url} : {error or 'aucun joueur'}")
+                failed_teams.append(team_url)
+                continue
+            for href, row in result:
+                url = player_link(team_url, href, base_url)
+                rows[url] = row
+                team_of[url] = team_url
+        if state is not None:  # équipes du dernier passage dont la page n'est plus dans le stockage
+            failed_teams += sorted({e.get("team") for e in state.entries.values()} - set(teams) - {None})
+
+        stored = sorted(url for url in rows if url in players)
+        if len(stored) < len(rows):
+            print(f"  -> {len(rows) - len(stored)} pages joueurs absentes du stockage (relancer un crawl)")
+        print(f"Re-parsing de {len(stored)} pages joueurs ({len(team_list)} équipes) avec {PARSER}...")
+        chunksize = max(1, len(stored) // (4 * (parse_workers or os.cpu_count() or 1)))
+        refreshed = set()
+        for url, (result, error) in zip(stored, parsers.map(
+                parse_stored, ["player"] * len(stored), [store.file_of(players[u]) for u in stored], chunksize=chunksize)):
+            if error or not result.get("nom"):
+                print(f"  -> Joueur ignoré {url} : {error or 'page sans nom'}")
+                metrics.inc("players_skipped_total", reason="error" if error else "no_name")
+                continue
+            if state is not None and result.get("Overall") is not None:
+                state.update(url, rows[url], result, team_of[url])
+            refreshed.add(url)
+            yield result
+        if state is not None:
+            yield from _merge_known(rows, refreshed, state, failed_teams)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=1, help="Nombre de navigateurs en parallèle (>1 = headless)")
+    ap.add_argument("--rps", type=float, default=3.0, help="Plafond de requêtes/s par hôte")
+    ap.add_argument("--headless", action="store_true", help="Navigateur sans fenêtre")
+    ap.add_argument("--timeout", type=float, default=10.0, help="Attente max des éléments d'une page (s)")
+    ap.add_argument("--base-url", type=str, default=BASE_URL, help="Hôte à scraper (ex: serveur de fixtures local)")
+    ap.add_argument("--out", type=str, default="nba_overall_potential.json", help="Chemin du JSON de sortie")
+    ap.add_argument("--stream", type=str, default=None, help="JSONL alimenté au fil de l'eau (un joueur par ligne)")
+    ap.add_argument("--compact", action="store_true", help="JSON compact (un joueur par ligne) au lieu d'indenté")
+    ap.add_argument("--store", type=str, default=None, help="Dossier où garder les pages HTML brutes (gzip)")
+    ap.add_argument("--parse-workers", type=int, default=None, help="Processus de parsing (défaut: un par cœur, 0 = aucun)")
+    ap.add_argument("--reparse", action="store_true", help="Re-parse les pages de --store, sans navigateur")
+    ap.add_argument("--delta", action="store_true", help="Ne visite que les joueurs dont la ligne d'équipe a changé")
+    ap.add_argument("--state", type=str, default=None, help="État du mode delta (défaut: <out>.rows.json)")
+    metrics.add_arguments(ap)
+    args = ap.parse_args()
+    metrics.enable_from_args(args)
+
+    if args.reparse and not args.store:
+        ap.error("--reparse nécessite --store")
+    store = PageStore(args.store) if args.store else None
+    # l'état est toujours tenu à jour, pour qu'un passage complet prépare le suivant en --delta
+    state = RowState(args.state or os.path.splitext(args.out)[0] + ".rows.json")
+    if args.delta and not len(state):
+        print("Mode delta: aucun état précédent, passage complet.")
+    headless = args.headless or args.workers > 1
+    if not headless and not args.reparse:
+        print("Une fenêtre Chrome va s'ouvrir. Veuillez ne pas la fermer, le script la pilote.")
+
+    stream = open(args.stream, "w", encoding="utf-8") if args.stream else None
+    started = time.monotonic()
+    try:
+        base_url = args.base_url if args.base_url != BASE_URL else None
+        if args.reparse:
+            players = reparse(store, base_url, args.parse_workers, state)
+        else:
+            players = scrape_players(team_urls(args.base_url), args.workers, args.rps, headless,
+                                     args.timeout, base_url, store=store, parse_workers=args.parse_workers,
+                                     state=state, delta=args.delta)
+        # --- ÉTAPE 3: Sauvegarde au fil de l'eau (fichier final remplacé seulement en fin de scraping) ---
+        with RecordWriter(args.out, indent=4, compact=args.compact) as out:  # indent=4 pour une meilleure lisibilité
+            for player_data in players:
+                out.write(player_data)
+                if stream:
+                    stream.write(json.dumps(player_data, ensure_ascii=False) + "\n")
+                    stream.flush()
+
+        print(f"\n✅ Mission accomplie ! {out.count} joueurs ont été sauvegardés dans '{args.out}'.")
+        metrics.throughput("2kratings_players", out.count, time.monotonic() - started)
+
+    except Exception as e:
+        print(f"\n❌ Une erreur est survenue : {e}")
+        return 1
+
+    finally:
+        if stream:
+            stream.close()
+        print("Fermeture du navigateur.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
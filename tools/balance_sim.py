@@ -0,0 +1,373 @@
+"""
+Simulateur Monte-Carlo de l'économie du jeu: contrats, offres et cap, sur le roster produit par build_roster.
+
+Reprend, vectorisé sur des milliers de ligues en parallèle (tableaux NumPy [ligues x joueurs]):
+- WorldGenerator: équipes tirées du roster, 10% des joueurs < 80 libérés, contrats initiaux par palier;
+- advance_week.dart: progression, expiration des contrats (toutes les 4 semaines), résolution des offres
+  à échéance (_playerAcceptsOffer), nouvelles offres des équipes (poste le moins fourni, headroom), vieillissement.
+Les offres aux clients de l'agent (generate_client_offers.dart) ne sont pas simulées: il n'y a pas d'agent.
+
+balancing.json n'est pas encore lu par advance_week.dart (cap codé à 150M). Le simulateur l'applique ainsi:
+    cap                  remplace la constante du headroom
+    offerAggressiveness  multiplie le salaire offert (1.0 = comportement actuel)
+    luxuryTaxFactor      taxe de fin de saison par équipe: facteur x dépassement du cap (rapportée seulement)
+
+Les contrats initiaux démarrent en semaine 1 - (années - 1) x 52: ils se terminent TOUS en semaine 53,
+relevés au contrôle mensuel de la semaine 56. Avant, les équipes dépassent le cap de 150M (environ 2x
+avec le roster livré) et aucune offre n'est faite: le marché ne s'ouvre qu'en saison 2. Il faut donc au
+moins MIN_SEASONS saisons (expirations + fenêtre Free Agency qui suit, semaines 53 à 64); défaut: 3.
+
+Comme dans le jeu, deux offres qui arrivent à échéance la même semaine sont évaluées toutes les deux:
+la première acceptée signe, les suivantes acceptées sont comptées comme « doubles signatures ».
+
+    python balance_sim.py --sims 2000 --seasons 3
+    python balance_sim.py --cap 130e6 150e6 170e6 --aggr 0.8 1.0 1.2 --tax 0.5 0.75 --out sweep.json
+"""
+import os, json, time, argparse, itertools, multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from record_io import iter_records
+from roster_binary import clamp_ratings, read_roster, DEFAULT_AGE
+from checkpoint import write_atomic
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROSTER = os.path.join(TOOLS_DIR, "..", "assets", "data", "nba_database_final.json")
+DEFAULT_CONFIG = os.path.join(TOOLS_DIR, "..", "assets", "config", "balancing.json")
+
+POSITIONS = ("PG", "SG", "SF", "PF", "C")
+MIN_PLAYERS = 320            # WorldGenerator complète le roster avec des joueurs générés
+WEEKS = 52
+OFFER_TTL = 2                # expiresWeek = week + 2
+MAX_OFFERS = 5               # faBoost maximum par semaine
+FA_WEEKS = 12                # phase "Free Agency" de GameCalendar (semaines 1 à 12 de chaque année)
+MIN_SEASONS = 2              # fin des contrats initiaux (semaine 53) + fenêtre FA qui suit: semaine 64
+# contrats initiaux (WorldGenerator._generateInitialContract): overall minimum -> (salaire min, amplitude)
+SALARY_TIERS = ((90, 35_000_000, 15_000_000), (85, 25_000_000, 10_000_000), (80, 15_000_000, 10_000_000),
+                (75, 8_000_000, 7_000_000), (70, 3_000_000, 5_000_000), (0, 1_000_000, 2_000_000))
+
+
+def parse_position(primary: str | None, secondary: str | None) -> int:
+    """PositionUtils.parsePosition -> indice dans POSITIONS."""
+    pos = (primary or secondary or "").upper().replace("-", "").strip()
+    for i, (code, word) in enumerate((("PG", "POINT"), ("SG", "SHOOTING"), ("SF", "SMALL"), ("PF", "POWER"), ("C", "CENTER"))):
+        if code in pos or pos == word:
+            return i
+    hint = "P" in (secondary or "").upper()
+    if pos in ("G", "GUARD"):
+        return 0 if hint else 1
+    if pos in ("F", "FORWARD"):
+        return 3 if hint else 2
+    return 2
+
+
+def load_world(path: str) -> dict:
+    """Roster de l'app (JSON ou .bin) -> colonnes NumPy, notes bornées comme NbaRepository.loadPlayers."""
+    records = read_roster(path).iter_records() if path.endswith(".bin") else iter_records(path)
+    teams: dict[str, int] = {}
+    cols = {k: [] for k in ("overall", "potential", "age", "pos", "team")}
+    for r in records:
+        bio, ratings = r.get("bio") or {}, r.get("ratings") or {}
+        age = bio.get("age")
+        ov, pot = clamp_ratings(ratings.get("overall"), ratings.get("potential"), age)
+        name = (r.get("team") or {}).get("team_name")
+        cols["overall"].append(ov)
+        cols["potential"].append(pot)
+        cols["age"].append(DEFAULT_AGE if age is None else int(age))
+        cols["pos"].append(parse_position(r.get("position_primary"), r.get("position_secondary")))
+        cols["team"].append(-1 if name is None else teams.setdefault(name, len(teams)))
+    if not teams:
+        raise ValueError(f"{path}: aucun joueur rattaché à une équipe")
+    world = {k: np.array(v, dtype=np.int16) for k, v in cols.items()}
+    world["teams"] = list(teams)
+    return world
+
+
+def load_config(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- Modèle (vectorisé sur les ligues) ---
+
+def salary_ask(ov, form, market):
+    """_salaryAsk: overall² x 4000, ajusté par la forme et la notoriété."""
+    return np.floor(ov.astype(np.float64) ** 2 * 4000 * (1 + form * 0.02) * (1 + market * 0.004))
+
+
+def accept_probability(ratio, age, greed):
+    """_playerAcceptsOffer."""
+    prob = np.select([ratio >= 1.2, ratio >= 1.0, ratio >= 0.8], [0.8, 0.6, 0.4], 0.2)
+    prob = prob + np.where(age > 30, 0.1, 0.0) - greed * 0.2
+    return np.clip(prob, 0.1, 0.9)
+
+
+def _team_totals(team, values, n_teams: int):
+    """Somme de `values` par (ligue, équipe); team = -1 est ignoré."""
+    leagues = team.shape[0]
+    idx = (np.arange(leagues)[:, None] * (n_teams + 1) + team + 1).ravel()
+    totals = np.bincount(idx, weights=np.broadcast_to(values, team.shape).ravel(), minlength=leagues * (n_teams + 1))
+    return totals.reshape(leagues, n_teams + 1)[:, 1:]
+
+
+def _initial_league(world: dict, leagues: int, rng) -> dict:
+    n_teams = len(world["teams"])
+    tile = lambda a: np.repeat(a[None, :], leagues, axis=0)
+    ov, pot, age, pos, team = (tile(world[k]).astype(np.int32) for k in ("overall", "potential", "age", "pos", "team"))
+    n = ov.shape[1]
+    form = np.zeros((leagues, n), dtype=np.int32)
+    greed = np.full((leagues, n), 0.5)
+    market = np.full((leagues, n), 65, dtype=np.int32)
+    if n < MIN_PLAYERS:  # _generateFallbackPlayers, répartis au hasard dans les équipes
+        g = (leagues, MIN_PLAYERS - n)
+        gov = 58 + rng.integers(0, 35, g)
+        ov = np.hstack([ov, gov])
+        pot = np.hstack([pot, np.clip(gov + rng.integers(0, 10, g), 60, 99)])
+        age = np.hstack([age, 19 + rng.integers(0, 16, g)])
+        pos = np.hstack([pos, rng.integers(0, len(POSITIONS), g)])
+        team = np.hstack([team, rng.integers(0, n_teams, g)])
+        form = np.hstack([form, rng.integers(0, 5, g) - 2])
+        greed = np.hstack([greed, rng.random(g)])
+        market = np.hstack([market, rng.integers(0, 100, g)])
+    shape = ov.shape
+
+    team = np.where((team >= 0) & (ov < 80) & (rng.random(shape) < 0.10), -1, team)
+    tier = np.select([ov >= low for low, _, _ in SALARY_TIERS[:-1]], range(len(SALARY_TIERS) - 1), len(SALARY_TIERS) - 1)
+    base = np.array([b for _, b, _ in SALARY_TIERS], dtype=np.float64)
+    span = np.array([s for _, _, s in SALARY_TIERS], dtype=np.float64)
+    salary = base[tier] + np.floor(rng.random(shape) * span[tier])
+    extra = rng.integers(0, 2, shape)
+    years = np.select([(age <= 25) & (ov >= 80), (age <= 28) & (ov >= 85), age <= 30], [4 + extra, 3 + extra, 2 + extra],
+                      1 + extra)
+    years = np.where(rng.random(shape) < 0.20, 1, years)
+    start = 1 - (years - 1) * WEEKS
+    salary = np.where(team >= 0, salary, 0.0)
+    return {"ov": ov, "pot": pot, "age": age, "pos": pos, "team": team, "form": form, "greed": greed,
+            "market": market, "salary": salary, "end": start + years * WEEKS,
+            "cap_used": _team_totals(team, salary, n_teams), "n_teams": n_teams}
+
+
+def simulate(world: dict, config: dict, leagues: int, seasons: int, seed) -> dict:
+    """Simule `leagues` ligues pendant `seasons` saisons; renvoie les compteurs et distributions bruts."""
+    rng = np.random.default_rng(seed)
+    lg = _initial_league(world, leagues, rng)
+    ov, pot, age, pos, team = lg["ov"], lg["pot"], lg["age"], lg["pos"], lg["team"]
+    form, greed, market, salary, end, cap_used = lg["form"], lg["greed"], lg["market"], lg["salary"], lg["end"], lg["cap_used"]
+    n_teams, n = lg["n_teams"], ov.shape[1]
+    cap, aggr = float(config["cap"]), float(config["offerAggressiveness"])
+    rows = np.arange(leagues)
+    order_key = n - np.arange(n)              # à overall égal, l'ordre du roster (tri stable)
+
+    # offres en attente: 3 lots hebdomadaires (créés en w, résolus en w + 2) x MAX_OFFERS
+    off_team = np.zeros((leagues, 3, MAX_OFFERS), dtype=np.int32)
+    off_player = np.zeros((leagues, 3, MAX_OFFERS), dtype=np.int32)
+    off_salary = np.zeros((leagues, 3, MAX_OFFERS))
+    off_years = np.zeros((leagues, 3, MAX_OFFERS), dtype=np.int32)
+    off_active = np.zeros((leagues, 3, MAX_OFFERS), dtype=bool)
+    signed_week = np.full((leagues, n), -1, dtype=np.int32)
+
+    stats = {"offers": 0, "evaluated": 0, "accepted": 0, "double_signings": 0, "skipped_no_headroom": 0}
+    offer_salary, offer_ratio, offer_years = [], [], []
+    season_cap, season_fa, season_offers = [], [], []
+    offers_at_season_start = 0
+
+    for week in range(1, seasons * WEEKS + 1):
+        # 1) progression (forme)
+        ov = np.clip(np.floor(ov + (pot - ov) / 200.0 + form * 0.02 + 0.5), 40, 99).astype(np.int32)
+
+        # 2) expiration des contrats, une fois par mois
+        if week % 4 == 0:
+            expired = (team >= 0) & (week >= end)
+            if expired.any():
+                cap_used -= _team_totals(np.where(expired, team, -1), salary, n_teams)
+                team = np.where(expired, -1, team)
+                salary = np.where(expired, 0.0, salary)
+
+        # 3) résolution des offres arrivées à échéance (lot créé il y a OFFER_TTL semaines), dans l'ordre de création
+        b = (week - OFFER_TTL) % 3
+        for i in range(MAX_OFFERS):
+            r = np.flatnonzero(off_active[:, b, i])
+            if r.size == 0:
+                continue
+            p, t, sal = off_player[r, b, i], off_team[r, b, i], off_salary[r, b, i]
+            ask = salary_ask(ov[r, p], form[r, p], market[r, p])
+            accepted = rng.random(r.size) < accept_probability(sal / ask, age[r, p], greed[r, p])
+            free = team[r, p] < 0
+            stats["evaluated"] += int(free.sum())
+            stats["accepted"] += int((accepted & free).sum())
+            stats["double_signings"] += int((accepted & ~free & (signed_week[r, p] == week)).sum())
+            s = accepted & free
+            r, p, t, sal = r[s], p[s], t[s], sal[s]
+            team[r, p] = t
+            salary[r, p] = sal
+            end[r, p] = week + off_years[r, b, i] * WEEKS
+            signed_week[r, p] = week
+            cap_used[r, t] += sal
+        off_active[:, b] = False
+
+        # 5) nouvelles offres: faBoost équipes tirées au hasard, poste le moins fourni, meilleur agent libre
+        fa_boost = 5 if 1 <= week <= FA_WEEKS else 2   # semaine absolue, comme advance_week.dart
+        picks = rng.permuted(np.tile(np.arange(n_teams), (leagues, 1)), axis=1)[:, :fa_boost]
+        depth = np.bincount(((rows[:, None] * (n_teams + 1) + team + 1) * len(POSITIONS) + pos).ravel(),
+                            minlength=leagues * (n_teams + 1) * len(POSITIONS)).reshape(leagues, n_teams + 1, -1)[:, 1:]
+        key = np.where(team < 0, ov * (n + 1) + order_key, -1)
+        best_any, has_fa = key.argmax(axis=1), key.max(axis=1) >= 0
+        by_pos = np.stack([np.where(pos == k, key, -1) for k in range(len(POSITIONS))], axis=1)
+        best_pos, has_pos = by_pos.argmax(axis=2), by_pos.max(axis=2) >= 0
+        b = week % 3
+        for i in range(fa_boost):
+            t = picks[:, i]
+            need = depth[rows, t].argmin(axis=1)
+            cand = np.where(has_pos[rows, need], best_pos[rows, need], best_any)
+            headroom = cap - cap_used[rows, t]
+            ok = has_fa & (headroom > 0)
+            ask = salary_ask(ov[rows, cand], form[rows, cand], market[rows, cand])
+            sal = np.floor(np.minimum(ask, np.maximum(1_000_000, np.floor(headroom * (0.4 + rng.random(leagues) * 0.6)))) * aggr)
+            years = 1 + rng.integers(0, 4, leagues)
+            off_team[:, b, i], off_player[:, b, i], off_salary[:, b, i], off_years[:, b, i] = t, cand, sal, years
+            off_active[:, b, i] = ok
+            stats["offers"] += int(ok.sum())
+            stats["skipped_no_headroom"] += int((has_fa & ~ok).sum())
+            offer_salary.append(sal[ok].astype(np.float32))
+            offer_ratio.append((sal[ok] / ask[ok]).astype(np.float32))
+            offer_years.append(years[ok].astype(np.int8))
+
+        # vieillissement en fin d'année, déclin à partir de 34 ans
+        if week % WEEKS == WEEKS - 1:
+            age = age + 1
+            ov = np.where(age >= 34, np.clip(ov - 2, 60, 99), ov)
+        if week % WEEKS == 0:
+            season_cap.append(cap_used.astype(np.float32))
+            season_fa.append((team < 0).sum(axis=1).astype(np.int32))
+            season_offers.append(stats["offers"] - offers_at_season_start)
+            offers_at_season_start = stats["offers"]
+
+    return {**stats, "leagues": leagues, "seasons": seasons,
+            "offer_salary": np.concatenate(offer_salary), "offer_ratio": np.concatenate(offer_ratio),
+            "offer_years": np.concatenate(offer_years),
+            "cap_used": np.stack(season_cap), "free_agents": np.stack(season_fa), "season_offers": season_offers}
+
+
+# --- Agrégation et rapport ---
+
+def summarize(config: dict, chunks: list[dict]) -> dict:
+    cap, tax = float(config["cap"]), float(config["luxuryTaxFactor"])
+    leagues = sum(c["leagues"] for c in chunks)
+    seasons = chunks[0]["seasons"]
+    total = lambda k: sum(c[k] for c in chunks)
+    cap_used = np.concatenate([c["cap_used"] for c in chunks], axis=1)          # [saisons, ligues, équipes]
+    free_agents = np.concatenate([c["free_agents"] for c in chunks], axis=1)
+    sal = np.concatenate([c["offer_salary"] for c in chunks])
+    ratio = np.concatenate([c["offer_ratio"] for c in chunks])
+    years = np.concatenate([c["offer_years"] for c in chunks])
+    pct = lambda a, q: float(np.percentile(a, q)) if a.size else None
+
+    per_season = []
+    for k in range(seasons):
+        used = cap_used[k].astype(np.float64)
+        per_season.append({
+            "season": k + 1,
+            "cap_use_mean": float(used.mean() / cap),
+            "cap_use_p90": float(np.percentile(used, 90) / cap),
+            "teams_over_cap": float((used > cap).mean()),
+            "teams_no_headroom": float((used >= cap).mean()),
+            "luxury_tax_per_team": float((tax * np.maximum(0.0, used - cap)).mean()),
+            "free_agents_mean": float(free_agents[k].mean()),
+            "offers_per_league": sum(c["season_offers"][k] for c in chunks) / leagues,
+        })
+    per_league_season = leagues * seasons
+    return {
+        "config": config, "leagues": leagues, "seasons": seasons,
+        "offers_per_season": total("offers") / per_league_season,
+        "acceptance_rate": total("accepted") / total("evaluated") if total("evaluated") else None,
+        "signings_per_season": total("accepted") / per_league_season,
+        "double_signings_per_season": total("double_signings") / per_league_season,
+        "skipped_no_headroom_per_season": total("skipped_no_headroom") / per_league_season,
+        "offer_salary": {"p10": pct(sal, 10), "p50": pct(sal, 50), "p90": pct(sal, 90), "mean": float(sal.mean()) if sal.size else None},
+        "offer_ratio": {"p10": pct(ratio, 10), "p50": pct(ratio, 50), "p90": pct(ratio, 90),
+                        "at_or_above_ask": float((ratio >= 1.0).mean()) if ratio.size else None},
+        "offer_years": {str(y): float((years == y).mean()) for y in range(1, 5)} if years.size else {},
+        "per_season": per_season,
+    }
+
+
+def report(result: dict):
+    c = result["config"]
+    m = lambda v: f"{v / 1e6:.1f}M" if v is not None else "-"
+    pc = lambda v: f"{v * 100:.0f}%" if v is not None else "-"   # None: aucune offre évaluée
+    print(f"\ncap={m(c['cap'])} luxuryTaxFactor={c['luxuryTaxFactor']} offerAggressiveness={c['offerAggressiveness']} "
+          f"({result['leagues']} ligues x {result['seasons']} saisons)")
+    s, r = result["offer_salary"], result["offer_ratio"]
+    print(f"  offres/saison {result['offers_per_season']:.1f}, acceptées {pc(result['acceptance_rate'])}, "
+          f"signatures/saison {result['signings_per_season']:.1f}, doubles signatures/saison "
+          f"{result['double_signings_per_season']:.2f}, sans headroom {result['skipped_no_headroom_per_season']:.1f}")
+    if result["offers_per_season"]:
+        print(f"  salaire offert p10/p50/p90 {m(s['p10'])} / {m(s['p50'])} / {m(s['p90'])}, offre/demande p50 "
+              f"{r['p50']:.2f} (>= demande: {pc(r['at_or_above_ask'])})")
+    else:
+        print("  ⚠️ aucune offre: aucune équipe n'a de headroom sous ce cap (voir cap moy. ci-dessous)")
+    print(f"  {'saison':>8} {'cap moy.':>9} {'cap p90':>8} {'> cap':>7} {'taxe/équipe':>12} {'agents libres':>14} {'offres':>7}")
+    for k in result["per_season"]:
+        print(f"  {k['season']:>8} {k['cap_use_mean'] * 100:>8.0f}% {k['cap_use_p90'] * 100:>7.0f}% "
+              f"{k['teams_over_cap'] * 100:>6.0f}% {m(k['luxury_tax_per_team']):>12} {k['free_agents_mean']:>14.1f} "
+              f"{k['offers_per_league']:>7.1f}")
+
+
+def _pool(workers: int):
+    """workers=0: tout dans le processus courant (débogage, profilage)."""
+    if workers == 0:
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def sweep(world: dict, configs: list[dict], leagues: int, seasons: int, chunk: int, workers: int, seed: int) -> list[dict]:
+    """Chaque config est découpée en lots de `chunk` ligues, tous répartis sur le pool de processus."""
+    sizes = [min(chunk, leagues - start) for start in range(0, leagues, chunk)]
+    with _pool(workers) as pool:
+        futures = {(ci, k): pool.submit(simulate, world, cfg, size, seasons, np.random.SeedSequence([seed, ci, k]))
+                   for ci, cfg in enumerate(configs) for k, size in enumerate(sizes)}
+        return [summarize(cfg, [futures[ci, k].result() for k in range(len(sizes))]) for ci, cfg in enumerate(configs)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--roster", type=str, default=DEFAULT_ROSTER, help="Roster de l'app (JSON ou .bin)")
+    ap.add_argument("--config", type=str, default=DEFAULT_CONFIG, help="balancing.json de référence")
+    ap.add_argument("--cap", type=float, nargs="+", default=None, help="Valeurs de cap à balayer")
+    ap.add_argument("--tax", type=float, nargs="+", default=None, help="Valeurs de luxuryTaxFactor")
+    ap.add_argument("--aggr", type=float, nargs="+", default=None, help="Valeurs de offerAggressiveness")
+    ap.add_argument("--sims", type=int, default=1000, help="Ligues simulées par configuration")
+    ap.add_argument("--seasons", type=int, default=3,
+                    help=f"Saisons par ligue (>= {MIN_SEASONS}: le marché s'ouvre à la fin des contrats initiaux)")
+    ap.add_argument("--chunk", type=int, default=250, help="Ligues par tâche du pool")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processus (0 = dans ce processus)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=str, default=None, help="Résultats JSON")
+    args = ap.parse_args()
+    if args.seasons < MIN_SEASONS:
+        ap.error(f"--seasons {args.seasons}: les contrats initiaux expirent tous en semaine 53 et la fenêtre "
+                 f"Free Agency qui suit finit en semaine {WEEKS + FA_WEEKS}; il faut au moins {MIN_SEASONS} saisons")
+
+    base = load_config(args.config)
+    configs = [{"cap": cap, "luxuryTaxFactor": tax, "offerAggressiveness": aggr}
+               for cap, tax, aggr in itertools.product(args.cap or [base["cap"]], args.tax or [base["luxuryTaxFactor"]],
+                                                      args.aggr or [base["offerAggressiveness"]])]
+    world = load_world(args.roster)
+    print(f"{len(world['overall'])} joueurs, {len(world['teams'])} équipes; {len(configs)} configuration(s) x "
+          f"{args.sims} ligues x {args.seasons} saisons sur {args.workers or 1} processus")
+
+    started = time.perf_counter()
+    results = sweep(world, configs, args.sims, args.seasons, args.chunk, args.workers, args.seed)
+    for result in results:
+        report(result)
+    elapsed = time.perf_counter() - started
+    print(f"\n{len(configs) * args.sims * args.seasons} saisons simulées en {elapsed:.1f}s")
+    if args.out:
+        write_atomic(args.out, json.dumps({"roster": args.roster, "seed": args.seed, "seconds": round(elapsed, 2),
+                                           "results": results}, indent=2))
+        print(f"Résultats écrits dans {args.out}")
+
+
+if __name__ == "__main__":
+    main()
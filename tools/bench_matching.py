@@ -0,0 +1,84 @@
+"""
+Benchmark du moteur d'appariement (player_matching) sur des effectifs synthétiques.
+
+Tailles: 1x, 10x et 100x l'effectif actuel (~600 joueurs). Les sources sont les cibles
+bruitées (accents, suffixes Jr., fautes de frappe, prénoms inversés) plus 10% d'intrus.
+La comparaison toutes-paires est mesurée sur un échantillon puis extrapolée. La colonne « avec alias »
+mesure le chemin des scripts de fusion: table d'alias neuve (en mémoire) et player_ids, donc
+apprentissage des alias sûrs compris.
+
+    python bench_matching.py --scales 1 10 100
+"""
+import time, random, argparse
+from player_matching import match_names, similarity
+from name_normalization import normalize_name, AliasTable
+
+ROSTER_SIZE = 600
+SYLLABLES = ["ka", "lo", "mi", "ne", "ro", "ta", "vi", "jo", "de", "sa", "bu", "ric", "son", "gan", "mor",
+             "li", "za", "ki", "an", "el", "ton", "ber", "do", "vic", "ach", "ue", "wa", "ley", "gi", "os"]
+ACCENTS = {"c": "ć", "e": "é", "a": "á", "o": "ö", "s": "š", "z": "ž", "u": "ü"}
+
+
+def synthetic_name(rng: random.Random) -> str:
+    first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+    last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    return f"{first} {last}"
+
+
+def perturb(name: str, rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.5:
+        return name                                   # identique
+    if roll < 0.65:
+        return "".join(ACCENTS.get(c, c) if rng.random() < 0.5 else c for c in name)
+    if roll < 0.75:
+        return name + rng.choice([" Jr.", " III", " II"])
+    if roll < 0.9:
+        i = rng.randrange(1, len(name) - 1)           # faute de frappe: deux lettres inversées
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    first, last = name.split(" ", 1)
+    return f"{last} {first}"
+
+
+def make_dataset(n: int, seed: int = 42) -> tuple[list[str], list[str]]:
+    rng = random.Random(seed)
+    targets = list({synthetic_name(rng) for _ in range(n * 2)})[:n]
+    sources = [perturb(t, rng) for t in targets] + [synthetic_name(rng) for _ in range(n // 10)]
+    rng.shuffle(sources)
+    return targets, sources
+
+
+def all_pairs_estimate(targets: list[str], sources: list[str], threshold: float, budget: int = 200_000) -> float:
+    """Temps extrapolé d'une comparaison exhaustive (chaque cible contre toutes les sources, même élagage)."""
+    norm_s = [normalize_name(s) for s in sources]
+    picked = targets[:max(1, budget // len(sources))]
+    started = time.perf_counter()
+    for t in picked:
+        nt = normalize_name(t)
+        max(similarity(nt, s, threshold) for s in norm_s)
+    return (time.perf_counter() - started) / len(picked) * len(targets)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="Multiples de l'effectif actuel")
+    ap.add_argument("--threshold", type=float, default=0.85)
+    args = ap.parse_args()
+
+    print(f"{'taille':>8} {'bloqué (s)':>11} {'avec alias (s)':>15} {'comparaisons':>13} {'appariés':>9} "
+          f"{'toutes paires (s, estimé)':>27}")
+    for scale in args.scales:
+        targets, sources = make_dataset(ROSTER_SIZE * scale)
+        started = time.perf_counter()
+        report = match_names(targets, sources, threshold=args.threshold)
+        elapsed = time.perf_counter() - started
+        rate = len(report.matches) / len(targets) * 100
+        started = time.perf_counter()
+        match_names(targets, sources, threshold=args.threshold, aliases=AliasTable(None), target_ids=list(range(len(targets))))
+        with_aliases = time.perf_counter() - started
+        print(f"{len(targets):>8} {elapsed:>11.2f} {with_aliases:>15.2f} {report.comparisons:>13} {rate:>8.1f}% "
+              f"{all_pairs_estimate(targets, sources, args.threshold):>27.1f}")
+
+
+if __name__ == "__main__":
+    main()
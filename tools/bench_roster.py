@@ -0,0 +1,76 @@
+"""
+Benchmark du roster binaire (roster_binary) contre nba_database_final.json.
+
+Pour chaque taille (1x, 10x, 100x le roster actuel), on compare:
+- la taille du JSON indenté, du JSON compact et du binaire (brute et gzip, ce qui compte dans l'APK);
+- le chargement JSON façon NbaRepository: json.loads puis bornage des notes joueur par joueur;
+- le chargement binaire: vues en colonnes seulement, puis avec matérialisation de tous les joueurs.
+
+    python bench_roster.py --scales 1 10 100
+"""
+import os, gzip, json, time, argparse
+from roster_binary import encode_roster, clamp_ratings, Roster
+
+DEFAULT_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "data", "nba_database_final.json")
+
+
+def scaled(players: list[dict], scale: int) -> list[dict]:
+    """Roster agrandi: chaque copie a ses propres noms et slugs, comme un vrai roster plus grand
+    (des noms dupliqués seraient internés une seule fois et flatteraient la table de chaînes)."""
+    out = []
+    for k in range(scale):
+        for p in players:
+            suffix = f" {k}" if k else ""
+            out.append({**p, "player_id": p["player_id"] + k * 100_000, "full_name": p["full_name"] + suffix,
+                        "slug": p["slug"] + suffix.replace(" ", "_")})
+    return out
+
+
+def load_json(raw: str) -> list[tuple[int, int]]:
+    """Ce que fait l'app au démarrage: décodage complet puis bornage des notes."""
+    out = []
+    for e in json.loads(raw):
+        ratings, bio = e.get("ratings") or {}, e.get("bio") or {}
+        out.append(clamp_ratings(ratings.get("overall"), ratings.get("potential"), bio.get("age")))
+    return out
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--json", type=str, default=DEFAULT_JSON, help="Roster JSON de référence")
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="Multiples du roster actuel")
+    ap.add_argument("--repeat", type=int, default=5, help="Meilleur temps sur N essais")
+    args = ap.parse_args()
+
+    with open(args.json, encoding="utf-8") as f:
+        players = json.load(f)
+
+    print(f"{'joueurs':>8} {'JSON (Ko)':>10} {'compact':>8} {'binaire':>8} {'gz JSON':>8} {'gz bin':>7} "
+          f"{'JSON (ms)':>10} {'colonnes (ms)':>14} {'+ joueurs (ms)':>15}")
+    for scale in args.scales:
+        data = scaled(players, scale)
+        pretty = json.dumps(data, ensure_ascii=False, indent=2)
+        compact = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        binary = encode_roster(data)
+
+        t_json = timed(lambda: load_json(pretty), args.repeat)
+        t_cols = timed(lambda: Roster(binary), args.repeat)
+        t_full = timed(lambda: list(Roster(binary).iter_records()), args.repeat)
+
+        kb = lambda b: len(b) / 1024
+        print(f"{len(data):>8} {kb(pretty.encode()):>10.0f} {kb(compact.encode()):>8.0f} {kb(binary):>8.0f} "
+              f"{kb(gzip.compress(pretty.encode())):>8.0f} {kb(gzip.compress(binary)):>7.0f} "
+              f"{t_json * 1000:>10.1f} {t_cols * 1000:>14.2f} {t_full * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
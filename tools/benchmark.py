@@ -0,0 +1,425 @@
+"""
+Benchmark de bout en bout des scripts de données, sur des fixtures rejouées par un serveur local.
+
+Un roster synthétique (600 joueurs x --scales) est écrit sous forme de fixtures pour les trois sources
+(API balldontlie, pages hoopshype, pages 2kratings) puis servi par fixture_server. Toutes les mesures
+portent donc sur des données et des pages HTML générées (pages 2kratings lestées de --page-kb Ko de
+remplissage), pas sur des captures du vrai site: le rapport et le JSON le rappellent. Avec
+--replay-store, l'étape reparse_store re-parse en plus un vrai crawl gardé par newupdate2k --store
+(PageStore): c'est la seule mesure faite sur de vraies pages (run "captures" du JSON). Chaque étape
+appelle le vrai code des scripts, sauf fetch_2kratings_http:
+
+    fetch_bio             fetch_nba_players.fetch_active_players
+    fetch_hoopshype       scraper_2k.scrape_all
+    fetch_2kratings_http  pages équipes + joueurs en HTTP simple (requests); le pool de navigateurs
+                          Selenium de newupdate2k n'est PAS mesuré (il faut Chrome)
+    parse_2kratings       newupdate2k.parse_team_rows / parse_player_page dans le pool de parsing
+    normalize             name_normalization.normalize_name, cache vidé
+    match                 player_matching.match_names (roster contre hoopshype et 2kratings), sans alias
+    match_aliases         idem avec table d'alias (vide, en mémoire) et player_ids: le chemin des fusions
+    apply_hoopshype       build_roster.build_players_base + nba_players_updated.update_player_ratings
+    merge_2kratings       mix.merge_databases_smarter
+    serialize             build_roster.export_app (JSON de l'app + roster binaire)
+Comme dans build_roster, les trois dernières étapes passent par le roster SQLite (roster_store).
+
+Par étape: durée et débit (éléments/s); avec --memory, le pic des allocations Python de l'étape
+(tracemalloc, remis à zéro avant chaque étape; processus principal seulement, pas les processus de
+parsing); avec --profile les fonctions les plus coûteuses (cProfile: thread principal seulement; pour
+les étapes réseau on y voit surtout l'attente des workers). --memory et --profile ralentissent les mesures.
+--stages ajoute d'office les étapes qui produisent les entrées des étapes demandées.
+Les résultats sont écrits en JSON; --compare signale les étapes plus lentes qu'une exécution de référence.
+
+    python benchmark.py --scales 1 10 --out bench_v2.json
+    python benchmark.py --scales 1 10 --compare bench_v2.json --tolerance 0.25
+"""
+import os, io, sys, json, time, random, shutil, pstats, cProfile, platform, argparse, tempfile, subprocess, tracemalloc
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import build_roster
+import fetch_nba_players
+import scraper_2k
+from bench_matching import synthetic_name, perturb
+from fixture_server import serve_fixtures
+from name_normalization import normalize_name, AliasTable
+from player_matching import match_names
+from rate_control import RateController
+from record_io import iter_records, write_records
+from checkpoint import write_atomic
+from page_store import PageStore
+
+import mix, nba_players_updated, newupdate2k  # assets/data, ajouté au chemin par build_roster
+
+ROSTER_SIZE = 600
+HOOPSHYPE_PAGE_SIZE = 25
+API_PAGE_SIZE = 100
+BUILD_ID = "bench"
+CONFERENCES = ["East"] * 15 + ["West"] * 15
+FIXTURES = "synthétiques"
+STAGES = ["fetch_bio", "fetch_hoopshype", "fetch_2kratings_http", "parse_2kratings", "normalize", "match",
+          "match_aliases", "apply_hoopshype", "merge_2kratings", "serialize"]
+# étapes qui produisent les entrées d'une autre (ajoutées d'office avec --stages)
+DEPENDS = {
+    "parse_2kratings": ["fetch_2kratings_http"],
+    "normalize": ["fetch_hoopshype", "parse_2kratings"],
+    "match": ["fetch_hoopshype", "parse_2kratings"],
+    "match_aliases": ["fetch_hoopshype", "parse_2kratings"],
+    "apply_hoopshype": ["fetch_bio", "fetch_hoopshype"],
+    "merge_2kratings": ["apply_hoopshype", "parse_2kratings"],
+    "serialize": ["merge_2kratings"],
+}
+
+
+def with_dependencies(selected: list[str]) -> list[str]:
+    needed = set()
+
+    def visit(name):
+        if name not in needed:
+            needed.add(name)
+            for dep in DEPENDS.get(name, []):
+                visit(dep)
+
+    for name in selected:
+        visit(name)
+    return [name for name in STAGES if name in needed]
+
+
+# --- Roster et fixtures synthétiques ---
+
+def make_roster(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    names, seen = [], set()
+    while len(names) < n:
+        name = synthetic_name(rng)
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    roster = []
+    for i, name in enumerate(names, start=1):
+        first, last = name.split(" ", 1)
+        ov = rng.randint(60, 97)
+        roster.append({
+            "id": i, "first_name": first, "last_name": last, "team_id": 1 + i % 30,
+            "position": rng.choice(["G", "F", "C", "G-F", "F-C"]),
+            "height": f"{rng.randint(5, 7)}-{rng.randint(0, 11)}", "weight": str(rng.randint(170, 290)),
+            "country": rng.choice(["USA", "France", "Canada", "Serbia", "Australia"]),
+            "overall": ov, "potential": min(99, ov + rng.randint(0, 8)),
+            "hoopshype_name": perturb(name, rng), "kratings_name": perturb(name, rng),
+        })
+    return roster
+
+
+def _write(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_fixtures(root: str, roster: list[dict], page_kb: int = 40) -> dict:
+    """Écrit les trois sources sous `root` (chemins attendus par fixture_server). Renvoie quelques comptes."""
+    teams = [{"id": t, "full_name": f"Team {t}", "abbreviation": f"T{t:02d}", "conference": CONFERENCES[t - 1]}
+             for t in range(1, 31)]
+    historical = [{"id": 100 + t, "full_name": f"Old Team {t}", "abbreviation": "", "conference": " "} for t in range(5)]
+    _write(os.path.join(root, "v1", "teams"), json.dumps({"data": teams + historical}))
+
+    # balldontlie: /v1/players?per_page=100&page=N, la page après la dernière est vide
+    api_pages = (len(roster) + API_PAGE_SIZE - 1) // API_PAGE_SIZE
+    for page in range(1, api_pages + 2):
+        chunk = roster[(page - 1) * API_PAGE_SIZE:page * API_PAGE_SIZE]
+        data = [{"id": p["id"], "first_name": p["first_name"], "last_name": p["last_name"], "position": p["position"],
+                 "height": p["height"], "weight": p["weight"], "country": p["country"], "team": teams[p["team_id"] - 1]}
+                for p in chunk]
+        _write(os.path.join(root, "v1", f"players@per_page={API_PAGE_SIZE}_page={page}"), json.dumps({"data": data}))
+
+    # hoopshype: page 1 en HTML (__NEXT_DATA__), les suivantes via /_next/data/<build>/...; 404 après la dernière
+    def page_props(chunk):
+        ratings = [{"rating": str(p["overall"]), "fullPlayer": {"firstName": p["hoopshype_name"].split(" ", 1)[0],
+                                                                "lastName": p["hoopshype_name"].split(" ", 1)[-1]}}
+                   for p in chunk]
+        pages = [{"videoGameRatings": {"videoGameRatings": ratings}}]
+        return {"dehydratedState": {"queries": [{}, {}, {}, {"state": {"data": {"pages": pages}}}]}}
+
+    listed = [p for p in roster if p["id"] % 10]  # ~10% des joueurs absents de hoopshype
+    hoop_pages = max(1, (len(listed) + HOOPSHYPE_PAGE_SIZE - 1) // HOOPSHYPE_PAGE_SIZE)
+    for page in range(1, hoop_pages + 1):
+        props = page_props(listed[(page - 1) * HOOPSHYPE_PAGE_SIZE:page * HOOPSHYPE_PAGE_SIZE])
+        if page == 1:
+            next_data = json.dumps({"buildId": BUILD_ID, "props": {"pageProps": props}})
+            _write(os.path.join(root, "nba-2k", "players", "index.html"),
+                   f'<html><body><script id="__NEXT_DATA__" type="application/json">{next_data}</script></body></html>')
+        else:
+            _write(os.path.join(root, "_next", "data", BUILD_ID, "nba-2k", f"players.json@page={page}"),
+                   json.dumps({"pageProps": props}))
+
+    # 2kratings: une page par équipe (tableau de liens) et une page par joueur, lestée à ~page_kb Ko
+    filler = "".join(f'<div class="row"><span class="stat-{i % 9}">{i}</span><p>Lorem ipsum {i}</p>'
+                     f'<a href="/news/{i}">x</a></div>' for i in range(page_kb * 1024 // 90))
+    for t in range(1, 31):
+        members = [p for p in roster if p["team_id"] == t]
+        rows = "".join(f'<tr><td><a href="/p/{p["id"]}">{p["kratings_name"]}</a></td><td>{p["overall"]}</td></tr>'
+                       for p in members)
+        _write(os.path.join(root, "teams", newupdate2k.TEAM_SLUGS[t - 1] + ".html"),
+               f"<html><body>{filler}<table><tbody>{rows}</tbody></table></body></html>")
+        for p in members:
+            _write(os.path.join(root, "p", f"{p['id']}.html"),
+                   f'<html><body>{filler}<h1> {p["kratings_name"]} </h1>'
+                   f'<span class="attribute-box-player">{p["overall"]}</span>'
+                   f'<div class="card-header"><h4 class="card-title">Potential '
+                   f'<span class="attribute-box good">{p["potential"]}</span></h4></div>{filler}</body></html>')
+    return {"api_pages": api_pages, "hoopshype_pages": hoop_pages, "hoopshype_players": len(listed)}
+
+
+def hot_spots(profile: cProfile.Profile, top: int) -> list[dict]:
+    stats = pstats.Stats(profile)
+    rows = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:top]
+    return [{"function": f"{os.path.basename(file)}:{line}({func})", "calls": nc,
+             "tottime": round(tt, 4), "cumtime": round(ct, 4)}
+            for (file, line, func), (cc, nc, tt, ct, callers) in rows]
+
+
+def run_stage(name: str, fn, profile: bool, top: int, verbose: bool, memory: bool = False) -> dict:
+    """Exécute `fn` (qui renvoie le nombre d'éléments traités) et mesure durée, débit, pic mémoire et profil."""
+    prof = cProfile.Profile() if profile else None
+    out = sys.stdout if verbose else io.StringIO()
+    if memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()   # pic propre à l'étape, pas celui de tout le processus
+        base = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    with redirect_stdout(out):
+        if prof:
+            prof.enable()
+        try:
+            items = fn()
+        finally:
+            if prof:
+                prof.disable()
+    seconds = time.perf_counter() - started
+    if items is None:
+        raise RuntimeError(f"l'étape {name} n'a rien produit (relancer avec --verbose)")
+    result = {"seconds": round(seconds, 4), "items": items, "per_s": round(items / seconds, 1) if seconds else None,
+              "peak_alloc_mb": round((tracemalloc.get_traced_memory()[1] - base) / 2 ** 20, 1) if memory else None}
+    if prof:
+        result["hot_spots"] = hot_spots(prof, top)
+    return result
+
+
+def fetch_pages(session: requests.Session, urls: list[str], workers: int) -> dict[str, str]:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(urls, executor.map(lambda u: session.get(u, timeout=30).text, urls)))
+
+
+def bench_scale(scale: int, args, work: str) -> dict:
+    roster = make_roster(ROSTER_SIZE * scale)
+    fixtures = os.path.join(work, "fixtures")
+    counts = write_fixtures(fixtures, roster, args.page_kb)
+    out = lambda name: os.path.join(work, name)
+    state: dict = {}
+    results = {}
+
+    with serve_fixtures(fixtures, delay=args.delay) as base_url:
+        fast = lambda: RateController(initial_rps=args.max_rps, max_rps=args.max_rps)
+
+        def fetch_bio():
+            fetch_nba_players.API_KEY = "benchmark"
+            fetch_nba_players.TEAMS_URL = f"{base_url}/v1/teams"
+            fetch_nba_players.PLAYERS_URL = f"{base_url}/v1/players"
+            fetch_nba_players.RATE = fast()
+            return len(fetch_nba_players.fetch_active_players(per_page=API_PAGE_SIZE, cap=len(roster) + 1,
+                                                              save_path=out("active.json"), fresh=True))
+
+        def fetch_hoopshype():
+            players = scraper_2k.scrape_all(base_url, counts["hoopshype_pages"] + 1, args.concurrency, rate=fast())
+            return write_records(out("hoopshype.json"), players, compact=True)
+
+        def fetch_2kratings_http():
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_maxsize=args.concurrency))
+            state["team_pages"] = fetch_pages(session, newupdate2k.team_urls(base_url), args.concurrency)
+            # les liens sont connus d'avance: le parsing des équipes est mesuré dans parse_2kratings
+            urls = [f"{base_url}/p/{p['id']}" for p in roster]
+            state["player_pages"] = fetch_pages(session, urls, args.concurrency)
+            return len(state["team_pages"]) + len(state["player_pages"])
+
+        def parse_2kratings():
+            with newupdate2k.parse_pool(args.parse_workers) as parsers:
+                rows = [r for team in parsers.map(newupdate2k.parse_team_rows, state["team_pages"].values()) for r in team]
+                pages = list(state["player_pages"].values())
+                chunksize = max(1, len(pages) // (4 * (args.parse_workers or os.cpu_count() or 1)))
+                players = list(parsers.map(newupdate2k.parse_player_page, pages, chunksize=chunksize))
+            write_records(out("overall_potential.json"), players, compact=True)
+            return len(rows) + len(players)
+
+        steps = {"fetch_bio": fetch_bio, "fetch_hoopshype": fetch_hoopshype,
+                 "fetch_2kratings_http": fetch_2kratings_http, "parse_2kratings": parse_2kratings}
+        for name in STAGES[:4]:
+            if name in args.stages:
+                results[name] = run_stage(name, steps[name], args.profile, args.top, args.verbose, args.memory)
+                report(ROSTER_SIZE * scale, name, results[name])
+
+    masters = [f"{p['first_name']} {p['last_name']}" for p in roster]
+    hoop_names = [p["nom"] for p in iter_records(out("hoopshype.json"))] if os.path.exists(out("hoopshype.json")) else []
+    k_names = [p["nom"] for p in iter_records(out("overall_potential.json"))] if os.path.exists(out("overall_potential.json")) else []
+
+    def normalize():
+        normalize_name.cache_clear()
+        names = masters + hoop_names + k_names
+        for n in names:
+            normalize_name(n)
+        return len(names)
+
+    def match():
+        normalize_name.cache_clear()
+        a = match_names(masters, hoop_names)
+        b = match_names(masters, k_names)
+        state["match_rate"] = round((len(a.matches) + len(b.matches)) / (2 * len(masters)) * 100, 1)
+        return 2 * len(masters)
+
+    def match_aliases():
+        normalize_name.cache_clear()
+        ids = [p["id"] for p in roster]
+        for names in (hoop_names, k_names):   # une table neuve par fusion, comme mix / nba_players_updated
+            match_names(masters, names, aliases=AliasTable(None), target_ids=ids)
+        return 2 * len(masters)
+
+    # aliases_path=None: chaque appel crée sa propre table d'alias vide en mémoire, rien n'est appris
+    # d'une exécution (ou d'une échelle) à l'autre
+    def apply_hoopshype():
+        build_roster.build_players_base(out("active.json"), out("with_age.json"), out("roster.db"))
+        return nba_players_updated.update_player_ratings(out("hoopshype.json"), out("with_age.json"),
+                                                         out("updated.json"), aliases_path=None, compact=True,
+                                                         store_path=out("roster.db"))
+
+    def merge_2kratings():
+        return mix.merge_databases_smarter(out("updated.json"), out("overall_potential.json"), out("complete.json"),
+                                           aliases_path=None, compact=True, store_path=out("roster.db"))
+
+    def serialize():
+        return build_roster.export_app(out("complete.json"), out("final.json"), store_path=out("roster.db"))
+
+    steps = {"normalize": normalize, "match": match, "match_aliases": match_aliases, "apply_hoopshype": apply_hoopshype,
+             "merge_2kratings": merge_2kratings, "serialize": serialize}
+    for name in STAGES[4:]:
+        if name in args.stages:
+            results[name] = run_stage(name, steps[name], args.profile, args.top, args.verbose, args.memory)
+            if name == "match":
+                results[name]["match_rate_pct"] = state["match_rate"]
+            report(ROSTER_SIZE * scale, name, results[name])
+    return {"players": len(roster), "fixtures": counts, "stages": results}
+
+
+def bench_replay(args) -> dict:
+    """Re-parsing d'un crawl réel (pages stockées), mesuré comme les autres étapes."""
+    store = PageStore(args.replay_store)
+    pages = len(store.entries("player"))
+    if not pages:
+        raise SystemExit(f"Aucune page joueur dans {args.replay_store} (crawl avec newupdate2k.py --store)")
+
+    def reparse_store():
+        return sum(1 for _ in newupdate2k.reparse(store, parse_workers=args.parse_workers))
+
+    r = run_stage("reparse_store", reparse_store, args.profile, args.top, args.verbose, args.memory)
+    print(f"Captures réelles ({args.replay_store}, {pages} pages joueurs):")
+    report("captures", "reparse_store", r)
+    return {"store": os.path.abspath(args.replay_store), "player_pages": pages, "stages": {"reparse_store": r}}
+
+
+def report(players, name: str, r: dict):
+    mem = f"{r['peak_alloc_mb']:.1f}" if r.get("peak_alloc_mb") is not None else "-"
+    print(f"{players:>8} {name:<20} {r['seconds']:>9.3f} {r['items']:>9} {r['per_s'] or 0:>11.0f} {mem:>9}")
+    for spot in r.get("hot_spots", [])[:5]:
+        print(f"{'':>8}   {spot['tottime']:>8.3f}s {spot['calls']:>9}  {spot['function']}")
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_seconds: float) -> list[str]:
+    """Étapes plus lentes que la référence au-delà de `tolerance` (les étapes très courtes sont ignorées)."""
+    regressions = []
+    for players, run in current["runs"].items():
+        base_run = baseline.get("runs", {}).get(players)
+        if not base_run:
+            continue
+        for name, r in run["stages"].items():
+            old = base_run["stages"].get(name)
+            if not old or max(old["seconds"], r["seconds"]) < min_seconds:
+                continue
+            ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+            flag = "RÉGRESSION" if ratio > 1 + tolerance else ""
+            print(f"{players:>8} {name:<20} {old['seconds']:>9.3f} -> {r['seconds']:>9.3f}  x{ratio:.2f} {flag}")
+            if flag:
+                regressions.append(f"{name} ({players} joueurs): x{ratio:.2f}")
+    return regressions
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="Multiples du roster actuel (600 joueurs)")
+    ap.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES, help="Étapes à mesurer")
+    ap.add_argument("--profile", action="store_true", help="Profil cProfile de chaque étape (ralentit les mesures)")
+    ap.add_argument("--memory", action="store_true", help="Pic des allocations Python par étape (tracemalloc, ralentit)")
+    ap.add_argument("--top", type=int, default=15, help="Nombre de fonctions gardées par profil")
+    ap.add_argument("--delay", type=float, default=0.0, help="Latence simulée par requête du serveur de fixtures (s)")
+    ap.add_argument("--concurrency", type=int, default=8, help="Requêtes simultanées des fetchers")
+    ap.add_argument("--max-rps", type=float, default=1000.0, help="Plafond de débit des fetchers pendant le benchmark")
+    ap.add_argument("--parse-workers", type=int, default=None, help="Processus de parsing 2kratings (0 = aucun)")
+    ap.add_argument("--page-kb", type=int, default=40, help="Taille approximative d'une page 2kratings (Ko)")
+    ap.add_argument("--out", type=str, default="bench_results.json", help="Fichier JSON des résultats")
+    ap.add_argument("--compare", type=str, default=None, help="JSON de référence pour détecter les régressions")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="Ralentissement toléré avant de signaler (0.2 = +20%%)")
+    ap.add_argument("--min-seconds", type=float, default=0.05, help="Étapes plus courtes ignorées dans la comparaison")
+    ap.add_argument("--replay-store", type=str, default=None,
+                    help="Crawl 2kratings réel gardé par newupdate2k --store, re-parsé en plus des fixtures")
+    ap.add_argument("--keep", type=str, default=None, help="Garde fixtures et sorties dans ce dossier")
+    ap.add_argument("--verbose", action="store_true", help="Affiche la sortie des scripts")
+    args = ap.parse_args()
+    args.stages = with_dependencies(args.stages)
+
+    results = {"revision": git_revision(), "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "fixtures": FIXTURES,
+               "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+               "options": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "keep", "verbose")},
+               "runs": {}}
+    print(f"Fixtures {FIXTURES} (roster et pages HTML générés, servis en local): "
+          f"les durées ne reflètent ni le vrai site ni le navigateur.")
+    print(f"{'joueurs':>8} {'étape':<20} {'durée (s)':>9} {'éléments':>9} {'éléments/s':>11} {'alloc (Mo)':>9}")
+    for scale in args.scales:
+        work = args.keep and os.path.join(args.keep, f"x{scale}")
+        if work:
+            shutil.rmtree(work, ignore_errors=True)
+            os.makedirs(work)
+            results["runs"][str(ROSTER_SIZE * scale)] = bench_scale(scale, args, work)
+        else:
+            with tempfile.TemporaryDirectory(prefix="nba_bench_") as tmp:
+                results["runs"][str(ROSTER_SIZE * scale)] = bench_scale(scale, args, tmp)
+    if args.replay_store:
+        results["runs"]["captures"] = bench_replay(args)
+
+    write_atomic(args.out, json.dumps(results, ensure_ascii=False, indent=2))
+    print(f"\nRésultats écrits dans {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nComparaison avec {args.compare} (révision {baseline.get('revision')}):")
+        for flag in ("profile", "memory"):
+            if bool(baseline.get("options", {}).get(flag)) != getattr(args, flag):
+                print(f"⚠️ --{flag} sur une seule des deux exécutions: les durées ne sont pas comparables")
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s): " + ", ".join(regressions))
+            sys.exit(1)
+        print("\n✅ Aucune régression au-delà de la tolérance.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Point d'entrée unique du build de assets/data/nba_database_final.json.
+
+    bio ──────────────► players_base ─► enrich ─┐
+    ratings_hoopshype ──────────────────────────┴► apply_hoopshype ─┐
+    ratings_2kratings ──────────────────────────────────────────────┴► merge_2kratings ─► export_app
+                                             (roster.db: joueurs, équipes et notes par source) ──┘
+
+Les trois sources (bio balldontlie, notes hoopshype, notes 2kratings) tournent en parallèle; enrich
+comble ensuite la taille, le poids, le pays et l'âge manquants (enrich_players.py). balldontlie ne donnant
+pas l'âge, il est repris du roster déjà publié (--out), vieilli depuis sa date (bio.age_as_of), quand aucun
+endpoint de dates de naissance n'est fourni.
+Les fichiers intermédiaires vont dans --work-dir, en JSON compact (un joueur par ligne), et sont lus en flux;
+seules les étapes dont une entrée a changé sont rejouées. Les étapes alimentent aussi le roster SQLite
+(roster_store.py) dont export_app relit les joueurs actifs et leur dernière note par source.
+Chaque export garde un instantané des notes en colonnes (ratings_history.py, si NumPy est installé).
+
+    python build_roster.py                               # build incrémental
+    python build_roster.py --refresh ratings_hoopshype   # re-télécharge une source et propage
+    python build_roster.py --refresh-sources --jobs 3    # rafraîchissement complet
+"""
+import os, sys, argparse, unicodedata
+
+from pipeline import Stage, Pipeline
+from name_normalization import EXTRA_ASCII
+from record_io import iter_records, write_records
+from roster_binary import write_roster
+from roster_store import RosterStore
+import metrics
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TOOLS_DIR)
+DATA_DIR = os.path.join(REPO_DIR, "assets", "data")
+sys.path.insert(0, DATA_DIR)
+
+SOURCE_STAGES = ("bio", "ratings_hoopshype", "ratings_2kratings")
+CONFERENCES = {"East": "Est", "West": "Ouest"}
+# pays renvoyés par balldontlie -> code ISO utilisé par l'app
+COUNTRY_CODES = {
+    "USA": "US", "United States": "US", "Canada": "CA", "France": "FR", "Australia": "AU", "Germany": "DE",
+    "Serbia": "RS", "Spain": "ES", "Nigeria": "NG", "Cameroon": "CM", "Slovenia": "SI", "Croatia": "HR",
+    "Greece": "GR", "Turkey": "TR", "Lithuania": "LT", "Latvia": "LV", "Italy": "IT", "Japan": "JP",
+    "New Zealand": "NZ", "Bahamas": "BS", "Dominican Republic": "DO", "Senegal": "SN", "Mali": "ML",
+    "South Sudan": "SS", "Sudan": "SD", "Congo": "CG", "DRC": "CD", "Democratic Republic of the Congo": "CD",
+    "Georgia": "GE", "Russia": "RU", "Ukraine": "UA", "Finland": "FI", "Sweden": "SE", "Switzerland": "CH",
+    "Austria": "AT", "Belgium": "BE", "Netherlands": "NL", "Czech Republic": "CZ", "Montenegro": "ME",
+    "Bosnia and Herzegovina": "BA", "Israel": "IL", "Brazil": "BR", "Argentina": "AR", "Jamaica": "JM",
+    "Haiti": "HT", "Angola": "AO", "Egypt": "EG", "Saint Lucia": "LC", "United Kingdom": "GB",
+    "England": "GB", "Poland": "PL", "Portugal": "PT", "Philippines": "PH", "Puerto Rico": "PR",
+    "Guinea": "GN", "Ghana": "GH", "Gabon": "GA", "China": "CN",
+}
+
+
+# --- Transformations (sans réseau) ---
+
+def slugify(full_name: str) -> str:
+    """'Shai Gilgeous-Alexander' -> 'shai_gilgeous-alexander', 'R.J. Davis' -> 'rj_davis'."""
+    s = unicodedata.normalize("NFD", full_name.lower().translate(EXTRA_ASCII)).encode("ascii", "ignore").decode()
+    s = s.replace(".", "").replace("'", "").replace("’", "")
+    return "_".join(s.split())
+
+
+def parse_height(height: str | None) -> tuple[float | None, float | None]:
+    """'6-8' -> (2.03 m, 6.66 ft)."""
+    try:
+        feet, inches = (int(x) for x in str(height).split("-"))
+    except (TypeError, ValueError):
+        return None, None
+    meters = round((feet * 12 + inches) * 0.0254, 2)
+    return meters, round(meters / 0.3048, 2)
+
+
+def parse_weight(weight) -> tuple[float | None, int | None]:
+    """'220' (livres) -> (99.8 kg, 220 lb)."""
+    try:
+        lb = int(float(weight))
+    except (TypeError, ValueError):
+        return None, None
+    return round(lb * 0.45359237, 1), lb
+
+
+def to_master_record(p: dict) -> dict:
+    """Joueur balldontlie nettoyé -> schéma prenom/nom attendu par les scripts de fusion."""
+    return {
+        "extId": p.get("extId"),
+        "prenom": p.get("first_name") or "",
+        "nom": p.get("last_name") or "",
+        "position": p.get("position"),
+        "position_detail": p.get("position_detail") or "",
+        "age": p.get("age"),
+        "height": p.get("height"),
+        "weight": p.get("weight"),
+        "country": p.get("country"),
+        "team": p.get("team") or {},
+        "overall": None,
+        "potential": None,
+    }
+
+
+def to_app_record(player_id: int, p: dict) -> dict:
+    """Schéma lu par NbaRepository.loadPlayers (lib/data/nba_repository.dart)."""
+    full_name = f"{p.get('prenom', '')} {p.get('nom', '')}".strip()
+    height_m, height_ft = parse_height(p.get("height"))
+    weight_kg, weight_lb = parse_weight(p.get("weight"))
+    positions = [x for x in (p.get("position_detail") or "").upper().split("-") if x]
+    team = p.get("team") or {}
+    country = p.get("country")
+    return {
+        "player_id": player_id,
+        "full_name": full_name,
+        "slug": slugify(full_name),
+        "bio": {
+            "age": p.get("age"),
+            "age_as_of": p.get("age_as_of") if p.get("age") is not None else None,   # relu par enrich_players
+            "country": COUNTRY_CODES.get(country, country if country and len(country) == 2 else None),
+            "height_m": height_m,
+            "height_ft": height_ft,
+            "weight_kg": weight_kg,
+            "weight_lb": weight_lb,
+        },
+        "team": {
+            "team_id": team.get("team_id", team.get("id")),
+            "team_name": team.get("team_name") or team.get("full_name"),
+            "conference": CONFERENCES.get(team.get("conference"), team.get("conference")),
+        },
+        "position_primary": positions[0] if positions else None,
+        "position_secondary": positions[1] if len(positions) > 1 else None,
+        "ratings": {
+            "overall": p.get("overall"),
+            "potential": p.get("potential"),
+        },
+    }
+
+
+def build_players_base(src: str, dest: str, store_path: str | None = None):
+    count = write_records(dest, (to_master_record(p) for p in iter_records(src)), compact=True)
+    if store_path:
+        with RosterStore(store_path) as store:
+            store.sync_players(iter_records(dest))
+    return count
+
+
+def binary_path(out_path: str) -> str:
+    return os.path.splitext(out_path)[0] + ".bin"
+
+
+def export_app(src: str, dest: str, compact: bool = False, store_path: str | None = None,
+               history_dir: str | None = None):
+    # ids attribués par ordre alphabétique (nom, prénom), comme dans le fichier historique.
+    # Avec store_path, les joueurs viennent du roster SQLite (déjà triés), sinon du fichier fusionné `src`.
+    if store_path:
+        with RosterStore(store_path) as store:
+            players = store.master_records()
+        if not players:
+            raise RuntimeError(f"{store_path}: aucun joueur actif (relancer avec --refresh enrich)")
+    else:
+        players = sorted(iter_records(src), key=lambda p: (p.get("nom", "").lower(), p.get("prenom", "").lower()))
+    records = [to_app_record(i, p) for i, p in enumerate(players, start=1)]
+    count = write_records(dest, records, compact=compact)
+    # même roster en colonnes binaires, notes déjà bornées (voir roster_binary.py)
+    write_roster(binary_path(dest), records)
+    print(f"✅ {count} joueurs exportés au format de l'app -> {dest} (+ {binary_path(dest)})")
+    if history_dir:
+        try:
+            import ratings_history
+        except ImportError:
+            print("  -> NumPy absent: pas d'instantané des notes (pip install numpy)")
+        else:
+            print(f"  -> instantané des notes: {ratings_history.save_snapshot(history_dir, players)}")
+    return count
+
+
+# --- Étapes réseau (imports tardifs: selenium/requests ne sont nécessaires que si l'étape tourne) ---
+
+def fetch_bio(dest: str, cache):
+    import fetch_nba_players
+    fetch_nba_players.CACHE = cache
+    return fetch_nba_players.fetch_active_players(save_path=dest)
+
+
+def enrich(src: str, dest: str, cache, store_path: str | None, memo_dir: str, bio_url: str | None = None,
+           previous: str | None = None):
+    import fetch_nba_players, enrich_players
+    fetch_nba_players.CACHE = cache
+    count = enrich_players.enrich_file(src, dest, bio_url=bio_url, memo_dir=memo_dir, previous=previous)
+    if store_path:
+        with RosterStore(store_path) as store:
+            store.sync_players(iter_records(dest))
+    return count
+
+
+def fetch_hoopshype(dest: str, cache):
+    import scraper_2k
+    return write_records(dest, scraper_2k.scrape_all(cache=cache), compact=True)
+
+
+def fetch_2kratings(dest: str, workers: int, pages_dir: str, rows_path: str):
+    import newupdate2k
+    from page_store import PageStore
+    # le générateur du scraper est écrit au fil de l'eau; les pages brutes restent dans pages_dir
+    # (newupdate2k.py --reparse --store <pages_dir> pour les re-parser sans navigateur).
+    # Mode delta: seules les lignes d'équipe modifiées depuis le dernier passage sont revisitées
+    # (supprimer rows_path pour forcer un passage complet).
+    players = newupdate2k.scrape_players(newupdate2k.team_urls(), workers=workers, headless=True,
+                                         store=PageStore(pages_dir), state=newupdate2k.RowState(rows_path),
+                                         delta=True)
+    return write_records(dest, players, compact=True)
+
+
+def make_pipeline(work_dir: str, out_path: str, workers: int = 4, cache=None, compact: bool = False,
+                  bio_url: str | None = None) -> Pipeline:
+    import mix, nba_players_updated
+
+    w = lambda name: os.path.join(work_dir, name)
+    active, base, with_age = w("nba_players_active_2025.json"), w("nba_players_base.json"), w("nba_players_with_age.json")
+    hoopshype, overall_potential = w("nba_2k_ratings_ALL_PAGES.json"), w("nba_overall_potential.json")
+    updated, complete = w("nba_players_updated.json"), w("nba_database_complete_v2.json")
+    # une table d'alias par fusion, sortie de l'étape qui l'apprend: la corriger à la main relance l'étape,
+    # et aucune étape ne relit une table qu'une autre vient de réécrire (build idempotent)
+    aliases = {source: w(f"name_aliases_{source}.json") for source in ("hoopshype", "2kratings")}
+    store = w("roster.db")
+
+    stages = [
+        Stage("bio", lambda: fetch_bio(active, cache), outputs=[active]),
+        Stage("ratings_hoopshype", lambda: fetch_hoopshype(hoopshype, cache), outputs=[hoopshype]),
+        Stage("ratings_2kratings", lambda: fetch_2kratings(overall_potential, workers, w("raw_pages"), w("2kratings_rows.json")), outputs=[overall_potential]),
+        Stage("players_base", lambda: build_players_base(active, base), inputs=[active], outputs=[base]),
+        # le roster publié (sortie d'export_app) est relu pour ses âges: `previous`, pas une entrée (cycle)
+        Stage("enrich", lambda: enrich(base, with_age, cache, store, w(".enrich_memo"), bio_url, out_path),
+              inputs=[base], outputs=[with_age], previous=[out_path]),
+        Stage("apply_hoopshype",
+              lambda: nba_players_updated.update_player_ratings(hoopshype, with_age, updated, aliases["hoopshype"],
+                                                                compact=True, store_path=store),
+              inputs=[hoopshype, with_age], outputs=[updated, aliases["hoopshype"]]),
+        Stage("merge_2kratings",
+              lambda: mix.merge_databases_smarter(updated, overall_potential, complete, aliases["2kratings"],
+                                                  compact=True, store_path=store),
+              inputs=[updated, overall_potential], outputs=[complete, aliases["2kratings"]]),
+        # export_app relit les joueurs et les notes dans roster.db: la base est une entrée au même titre que `complete`
+        Stage("export_app", lambda: export_app(complete, out_path, compact, store, w("ratings_history")),
+              inputs=[complete, store], outputs=[out_path, binary_path(out_path)]),
+    ]
+    return Pipeline(stages, w("pipeline_state.json"))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--work-dir", type=str, default=os.path.join(TOOLS_DIR, "build"), help="Fichiers intermédiaires")
+    ap.add_argument("--out", type=str, default=os.path.join(DATA_DIR, "nba_database_final.json"), help="JSON final de l'app")
+    ap.add_argument("--only", nargs="+", default=None, help="Étapes cibles (et leurs dépendances)")
+    ap.add_argument("--refresh", nargs="+", default=[], help="Étapes à rejouer même si elles sont à jour")
+    ap.add_argument("--refresh-sources", action="store_true", help="Re-télécharge les trois sources")
+    ap.add_argument("--force", action="store_true", help="Rejoue toutes les étapes")
+    ap.add_argument("--jobs", type=int, default=3, help="Étapes indépendantes en parallèle")
+    ap.add_argument("--workers", type=int, default=4, help="Navigateurs pour l'étape 2kratings")
+    ap.add_argument("--dry-run", action="store_true", help="Affiche ce qui serait rejoué")
+    ap.add_argument("--offline", action="store_true", help="Sources API rejouées depuis le cache HTTP, sans réseau")
+    ap.add_argument("--compact", action="store_true", help="JSON final compact (un joueur par ligne) au lieu d'indenté")
+    ap.add_argument("--bio-url", type=str, default=os.environ.get("NBA_BIO_URL"),
+                    help="Endpoint des dates de naissance pour l'étape enrich (player_ids[] -> birth_date)")
+    metrics.add_arguments(ap)
+    args = ap.parse_args()
+
+    metrics.enable_from_args(args)
+    os.makedirs(args.work_dir, exist_ok=True)
+    from http_cache import HttpCache
+    cache = HttpCache(os.path.join(args.work_dir, ".http_cache"), offline=args.offline)
+    pipeline = make_pipeline(args.work_dir, args.out, args.workers, cache, args.compact, args.bio_url)
+    refresh = set(args.refresh) | (set(SOURCE_STAGES) if args.refresh_sources else set())
+    status = pipeline.run(args.only, refresh, args.force, args.jobs, args.dry_run)
+    print("\n" + ", ".join(f"{k}={v}" for k, v in status.items()))
+    sys.exit(1 if any(v in ("failed", "blocked") for v in status.values()) else 0)
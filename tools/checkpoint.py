@@ -0,0 +1,87 @@
+"""
+Checkpoint append-only pour les crawls paginés longs.
+
+Chaque page terminée ajoute ses enregistrements à un fichier JSON Lines puis réécrit
+atomiquement un petit curseur `<fichier>.cursor.json` :
+    {"page": 7, "offset": 123456, "count": 512, "done": false}
+`offset` est la taille du JSONL validée par ce curseur: à la reprise, tout ce qui a été
+écrit après (page interrompue par un crash) est tronqué, donc aucune ligne n'est dupliquée.
+"""
+import os, json
+from record_io import RecordWriter
+
+EMPTY_CURSOR = {"page": 0, "offset": 0, "count": 0, "done": False}
+
+
+def write_atomic(path: str, text: str):
+    """Écrit via un fichier temporaire + os.replace: jamais de fichier à moitié écrit."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class JsonlCheckpoint:
+    def __init__(self, path: str):
+        self.path = path
+        self.cursor_path = f"{path}.cursor.json"
+        self.cursor = dict(EMPTY_CURSOR)
+
+    def resume(self) -> dict:
+        """Charge le curseur et ramène le JSONL à la dernière page validée."""
+        try:
+            with open(self.cursor_path, encoding="utf-8") as f:
+                self.cursor = {**EMPTY_CURSOR, **json.load(f)}
+        except FileNotFoundError:
+            self.cursor = dict(EMPTY_CURSOR)
+        if os.path.exists(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(self.cursor["offset"])
+        return self.cursor
+
+    def append_page(self, page: int, records: list[dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            offset = f.tell()
+        self.cursor = {"page": page, "offset": offset,
+                       "count": self.cursor["count"] + len(records), "done": False}
+        write_atomic(self.cursor_path, json.dumps(self.cursor))
+
+    def mark_done(self):
+        self.cursor["done"] = True
+        write_atomic(self.cursor_path, json.dumps(self.cursor))
+
+    def iter_records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def compact(self, dest: str, key: str | None = None, indent: int | None = 2) -> int:
+        """
+        Produit le tableau JSON final (dédoublonné sur `key`, dernier gagnant) puis supprime le checkpoint.
+        Deux passes en flux: la première ne retient que la dernière ligne de chaque clé. Renvoie le nombre écrit.
+        """
+        last: dict = {}
+        if key:
+            for n, rec in enumerate(self.iter_records()):
+                last[rec[key]] = n
+        with RecordWriter(dest, fmt="json", indent=indent, compact=indent is None) as out:
+            for n, rec in enumerate(self.iter_records()):
+                if not key or last[rec[key]] == n:
+                    out.write(rec)
+        self.clear()
+        return out.count
+
+    def clear(self):
+        for p in (self.path, self.cursor_path):
+            if os.path.exists(p):
+                os.remove(p)
+        self.cursor = dict(EMPTY_CURSOR)
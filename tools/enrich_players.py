@@ -0,0 +1,220 @@
+"""
+Enrichissement des joueurs: comble les champs vides (âge, taille, poids, pays) avant les fusions de notes.
+
+- /players?player_ids[]=...   taille, poids, pays: jusqu'à BATCH_SIZE ids par requête
+- bio_url (optionnel)          date de naissance, même format ({"data": [{"id", "birth_date"}]}) et même
+                               découpage en lots; /players ne la donne pas, d'où un endpoint configurable
+- previous (optionnel)         roster de l'app déjà publié (nba_database_final.json): l'âge qu'il donne,
+                               vieilli des années écoulées depuis sa date (bio.age_as_of), est repris pour
+                               les joueurs que rien d'autre ne renseigne
+
+balldontlie ne fournit pas l'âge: sans bio_url, c'est le roster publié qui le conserve d'un build à l'autre.
+Chaque âge comblé est daté (age_as_of) pour pouvoir être vieilli au build suivant au lieu de rester figé.
+
+Les lots partent dans un pool borné de `workers` threads, tous sous le contrôle de débit partagé
+de fetch_nba_players (et son cache HTTP). Les réponses sont mémorisées par saison dans
+<memo_dir>/enrich_<saison>.jsonl: un joueur n'est interrogé qu'une fois par saison, y compris
+quand l'API ne le connaît pas. base_url permet de tout rejouer contre une API locale (fixture_server).
+
+    python enrich_players.py build/nba_players_base.json build/nba_players_with_age.json --workers 4
+"""
+import os, json, time, argparse, datetime, threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fetch_nba_players
+from fetch_nba_players import http_get
+from name_normalization import normalize_name
+from record_io import iter_records, write_records
+from rate_control import RateController
+import metrics
+
+BATCH_SIZE = 100          # maximum de player_ids[] accepté par /players (per_page max)
+BIO_FIELDS = ("height", "weight", "country")
+
+
+def current_season(today: datetime.date | None = None) -> int:
+    """Saison NBA en cours, désignée par son année de départ (la saison démarre en octobre)."""
+    today = today or datetime.date.today()
+    return today.year if today.month >= 10 else today.year - 1
+
+
+def age_on(birth_date: str | None, as_of: datetime.date) -> int | None:
+    try:
+        born = datetime.date.fromisoformat(str(birth_date)[:10])
+    except ValueError:
+        return None
+    return as_of.year - born.year - ((as_of.month, as_of.day) < (born.month, born.day))
+
+
+def batches(ids: list, size: int = BATCH_SIZE):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def aged(age: int | None, since: str | None, as_of: datetime.date) -> int | None:
+    """
+    Âge connu à la date `since` (ISO), augmenté des années entières écoulées jusqu'à `as_of`
+    (sans date de naissance: au plus un an de retard, jamais figé).
+    """
+    if age is None:
+        return None
+    years = age_on(since, as_of)
+    return age + max(0, years) if years is not None else age
+
+
+def previous_ages(path: str | None, as_of: datetime.date) -> dict[str, int]:
+    """
+    Nom normalisé -> âge à la date `as_of`, d'après un roster au format de l'app (vide si le fichier n'existe pas).
+    Les âges sont datés par bio.age_as_of, sinon (roster publié avant cette date) par la date du fichier.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    written = datetime.date.fromtimestamp(os.path.getmtime(path)).isoformat()
+    ages = {}
+    for p in iter_records(path):
+        bio = p.get("bio") or {}
+        if bio.get("age") is not None and p.get("full_name"):
+            ages[normalize_name(p["full_name"])] = aged(bio["age"], bio.get("age_as_of") or written, as_of)
+    return ages
+
+
+class EnrichMemo:
+    """Réponses mémorisées d'une saison: id -> {"birth_date", "height", "weight", "country", ...}."""
+
+    def __init__(self, directory: str, season: int):
+        self.path = os.path.join(directory, f"enrich_{season}.jsonl")
+        self.lock = threading.Lock()
+        self.entries: dict[str, dict] = {}
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            for line in iter_records(self.path):
+                self.entries.setdefault(line["id"], {}).update(line)
+
+    def missing(self, ids, field: str) -> list[str]:
+        """Ids dont `field` n'a encore jamais été demandé cette saison."""
+        return [i for i in ids if field not in self.entries.get(i, {})]
+
+    def add(self, entries: list[dict]):
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for e in entries:
+                    f.write(json.dumps(e, ensure_ascii=False) + "\n")
+                    self.entries.setdefault(e["id"], {}).update(e)
+
+    def get(self, player_id: str) -> dict:
+        return self.entries.get(player_id, {})
+
+
+def _fetch_batch(url: str, headers: dict, ids: list[str], fields, rate: RateController | None) -> list[dict]:
+    """Un lot d'ids -> une entrée de mémo par id demandé (champs à None si l'API ne renvoie pas le joueur)."""
+    payload = http_get(url, headers, {"player_ids[]": ids, "per_page": BATCH_SIZE}, rate)
+    found = {str(p.get("id")): p for p in payload.get("data", [])}
+    entries = []
+    for i in ids:
+        p = found.get(i) or {}
+        entries.append({"id": i, **{k: v(p) if callable(v) else p.get(v) for k, v in fields.items()}})
+    metrics.inc("enrich_requests_total", endpoint=url.rsplit("/", 1)[-1])
+    metrics.inc("enrich_players_total", len(found), endpoint=url.rsplit("/", 1)[-1])
+    return entries
+
+
+def _fan_out(url, headers, ids, fields, memo: EnrichMemo, workers: int, rate) -> int:
+    """Lots envoyés en parallèle (pool borné); chaque lot terminé est ajouté au mémo. Renvoie le nombre de lots."""
+    todo = list(batches(ids))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for entries in pool.map(lambda b: _fetch_batch(url, headers, b, fields, rate), todo):
+            memo.add(entries)
+    return len(todo)
+
+
+def enrich_records(players: list[dict], base_url: str = fetch_nba_players.BASE_URL, bio_url: str | None = None,
+                   memo_dir: str = ".enrich_memo", season: int | None = None, workers: int = 4,
+                   rate: RateController | None = None, as_of: datetime.date | None = None,
+                   previous: str | None = None) -> list[dict]:
+    """
+    Joueurs au schéma prenom/nom (build_roster.to_master_record) -> mêmes joueurs, champs vides comblés.
+    Une valeur déjà présente n'est jamais remplacée. Âge: date de naissance (bio_url), sinon roster `previous`;
+    tout joueur dont l'âge est connu sort avec age_as_of (date à laquelle cet âge est juste).
+    """
+    api_key = fetch_nba_players.API_KEY
+    headers = {"Authorization": api_key}
+    memo = EnrichMemo(memo_dir, season if season is not None else current_season())
+    as_of = as_of or datetime.date.today()
+    ids = sorted({str(p["extId"]) for p in players if p.get("extId") is not None})
+
+    def needs(field):
+        return {str(p["extId"]) for p in players if p.get("extId") is not None and p.get(field) in (None, "")}
+
+    bio_ids = memo.missing(sorted(needs("height") | needs("weight") | needs("country")), "height")
+    age_ids = memo.missing(sorted(needs("age")), "birth_date") if bio_url else []
+    # la clé n'est exigée que si une requête doit partir: mémo complet ou cache hors-ligne suffisent sinon
+    offline = fetch_nba_players.CACHE is not None and fetch_nba_players.CACHE.offline
+    if (bio_ids or age_ids) and base_url == fetch_nba_players.BASE_URL and api_key == "REPLACE_ME" and not offline:
+        raise RuntimeError("Renseigne ta clé: variable d'env BALLEDONTLIE_API_KEY (ou --base-url vers une API locale).")
+    started = time.monotonic()
+    n = 0
+    if bio_ids:
+        n += _fan_out(f"{base_url}/players", headers, bio_ids,
+                      {"height": "height", "weight": "weight", "country": "country"}, memo, workers, rate)
+    if age_ids:
+        n += _fan_out(bio_url, headers, age_ids, {"birth_date": lambda p: p.get("birth_date") or p.get("birthdate")},
+                      memo, workers, rate)
+
+    known_ages = previous_ages(previous, as_of)
+    filled = {k: 0 for k in ("age", "age_previous", *BIO_FIELDS)}
+    out = []
+    for p in players:
+        p = dict(p)
+        m = memo.get(str(p.get("extId")))
+        if p.get("age") is None and m.get("birth_date"):
+            p["age"] = age_on(m["birth_date"], as_of)
+            filled["age"] += p["age"] is not None
+        if p.get("age") is None:
+            p["age"] = known_ages.get(normalize_name(f"{p.get('prenom', '')} {p.get('nom', '')}".strip()))
+            filled["age_previous"] += p["age"] is not None
+        if p.get("age") is not None:
+            p["age_as_of"] = p.get("age_as_of") or as_of.isoformat()
+        for field in BIO_FIELDS:
+            if p.get(field) in (None, "") and m.get(field) not in (None, ""):
+                p[field] = m[field]
+                filled[field] += 1
+        out.append(p)
+    unknown = sum(1 for p in out if p.get("age") is None)
+    if unknown:
+        print(f"  -> {unknown} âges toujours inconnus (--bio-url ou roster précédent --previous)")
+
+    print(f"Enrichissement: {len(ids)} joueurs, {len(bio_ids) + len(age_ids)} demandés à l'API en {n} requêtes "
+          f"({time.monotonic() - started:.1f}s), le reste depuis {memo.path}")
+    print("  comblés: " + ", ".join(f"{k}={v}" for k, v in filled.items()))
+    metrics.event("enrich", players=len(ids), requested=len(bio_ids) + len(age_ids), requests=n, **filled)
+    return out
+
+
+def enrich_file(src: str, dest: str, **kwargs) -> int:
+    return write_records(dest, enrich_records(list(iter_records(src)), **kwargs), compact=True)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("src", help="Joueurs au schéma prenom/nom (JSON ou JSONL)")
+    ap.add_argument("dest", help="Fichier enrichi")
+    ap.add_argument("--base-url", type=str, default=fetch_nba_players.BASE_URL, help="API balldontlie (ou mock local)")
+    ap.add_argument("--bio-url", type=str, default=os.environ.get("NBA_BIO_URL"),
+                    help="Endpoint des dates de naissance (player_ids[] -> birth_date)")
+    ap.add_argument("--memo-dir", type=str, default=".enrich_memo", help="Dossier du mémo par saison")
+    ap.add_argument("--season", type=int, default=None, help="Saison (année de départ; défaut: saison en cours)")
+    ap.add_argument("--workers", type=int, default=4, help="Requêtes simultanées (sous le contrôle de débit)")
+    ap.add_argument("--previous", type=str, default=None,
+                    help="Roster de l'app déjà publié, dont on garde les âges (ex: ../assets/data/nba_database_final.json)")
+    metrics.add_arguments(ap)
+    args = ap.parse_args()
+
+    metrics.enable_from_args(args)
+    count = enrich_file(args.src, args.dest, base_url=args.base_url, bio_url=args.bio_url, memo_dir=args.memo_dir,
+                        season=args.season, workers=args.workers, previous=args.previous)
+    print(f"✅ {count} joueurs enrichis -> {args.dest}")
+    fetch_nba_players.RATE.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,57 @@
-import os, json, time, random, argparse
+import os, time, argparse
 import requests
 
+from checkpoint import JsonlCheckpoint
+from record_io import iter_records
+from rate_control import RateController, host_of
+from http_cache import HttpCache, CacheMiss
+import metrics
+
 API_KEY = os.environ.get("BALLDONTLIE_API_KEY") or "REPLACE_ME"  # mets ta clé ici si tu veux
 BASE_URL = "https://api.balldontlie.io/v1"
 
 TEAMS_URL   = f"{BASE_URL}/teams"
 PLAYERS_URL = f"{BASE_URL}/players"
 
-def http_get(url, headers, params, backoff_state: dict):
-    """GET avec gestion 429 (Retry-After ou backoff progressif)."""
-    while True:
-        r = requests.get(url, headers=headers, params=params, timeout=45)
-        if r.status_code == 429:
-            ra = r.headers.get("Retry-After")
-            wait = int(ra) if ra and ra.isdigit() else (30 + backoff_state["k"] * 15)
-            wait += random.randint(0, 5)
-            backoff_state["k"] += 1
-            print(f"[429] Too many requests. Attente {wait}s puis reprise {url} …")
-            time.sleep(wait)
-            continue
-        backoff_state["k"] = 0
-        if r.status_code >= 400:
-            try:
-                print("API error payload:", r.json())
-            except Exception:
-                print("API error text:", r.text)
-            r.raise_for_status()
-        return r.json()
+# ~2 req/s au départ (l'ancien sleep de 0.5s), ajusté ensuite selon les 429 de l'API
+RATE = RateController(initial_rps=2.0, max_rps=10.0, cooldown=15.0)
+# cache HTTP conditionnel (ETag/Last-Modified), configuré en ligne de commande
+CACHE: HttpCache | None = None
+
+def http_get(url, headers, params, rate: RateController | None = None):
+    """GET sous contrôle de débit adaptatif (429: pause Retry-After ou cooldown croissant), via le cache HTTP si actif."""
+    rate = rate or RATE  # résolu à l'appel: RATE peut être remplacé (benchmark, tests)
+    def send(extra_headers: dict):
+        while True:
+            rate.wait(url)
+            started = time.monotonic()
+            r = requests.get(url, headers={**headers, **extra_headers}, params=params, timeout=45)
+            rate.record(url, r.status_code, time.monotonic() - started, r.headers.get("Retry-After"))
+            metrics.inc("http_bytes_total", len(r.content), host=host_of(url))
+            if r.status_code == 429:
+                print(f"[429] Too many requests. Débit réduit, reprise {url} …")
+                metrics.inc("http_retries_total", host=host_of(url), reason="429")
+                metrics.event("throttled", url=url, retry_after=r.headers.get("Retry-After"))
+                continue
+            return r
+
+    r = CACHE.get(url, params, send) if CACHE else send({})
+    if r.status_code >= 400:
+        try:
+            print("API error payload:", r.json())
+        except Exception:
+            print("API error text:", r.text)
+        r.raise_for_status()
+    return r.json()
 
 def load_current_team_ids(headers) -> set[int]:
     """
     Récupère toutes les équipes puis conserve seulement celles
     dont 'conference' est 'East' ou 'West' (les franchises actuelles).
     """
-    backoff = {"k": 0}
     teams: list[dict] = []
     # TEAMS n'est pas paginé (petite liste), on fait un seul appel
-    payload = http_get(TEAMS_URL, headers, {}, backoff)
+    payload = http_get(TEAMS_URL, headers, {})
     for t in payload.get("data", payload if isinstance(payload, list) else []):
         conf = (t.get("conference") or "").strip()
         if conf in ("East", "West"):
@@ -61,7 +76,11 @@ def clean_player(p: dict) -> dict:
         "first_name": p.get("first_name") or "",
         "last_name":  p.get("last_name")  or "",
         "position":   map_pos(p.get("position")),
-        "age": None,  # pas fourni par /players
+        "position_detail": p.get("position") or "",  # ex: "G-F", pour position_primary/secondary
+        "age": None,  # pas fourni par /players (comblé ensuite par enrich_players)
+        "height":  p.get("height"),   # "6-8" (pieds-pouces)
+        "weight":  p.get("weight"),   # livres, en texte
+        "country": p.get("country"),
         "team": {
             "id":           team.get("id"),
             "full_name":    team.get("full_name"),
@@ -70,24 +89,38 @@ def clean_player(p: dict) -> dict:
         },
     }
 
-def fetch_active_players(per_page=100, start_page=1, cap=650, save_path="../assets/data/nba_players_active_2025.json"):
-    if not API_KEY or API_KEY == "REPLACE_ME":
+def fetch_active_players(per_page=100, start_page=None, cap=650, save_path="../assets/data/nba_players_active_2025.json", fresh=False):
+    if (not API_KEY or API_KEY == "REPLACE_ME") and not (CACHE and CACHE.offline):
         raise RuntimeError("Renseigne ta clé: variable d'env BALLEDONTLIE_API_KEY ou remplace API_KEY dans le script.")
 
     headers = {"Authorization": API_KEY}  # IMPORTANT: pas de 'Bearer'
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+
+    # checkpoint JSONL à côté du JSON final (reprise automatique après un crash)
+    ckpt = JsonlCheckpoint(os.path.splitext(save_path)[0] + ".jsonl")
+    if fresh:
+        ckpt.clear()
+    cursor = ckpt.resume()
+    if cursor["done"]:
+        # crawl déjà terminé, seule la compaction avait été interrompue
+        written = ckpt.compact(save_path, key="extId")
+        print(f"✅ Écrit {written} joueurs actifs -> {save_path}")
+        return list(iter_records(save_path))
 
     # 1) IDs des équipes actuelles
     current_team_ids = load_current_team_ids(headers)
 
     # 2) Parcours des pages /players et filtre par équipes actuelles
-    out: list[dict] = []
-    page = start_page
-    backoff = {"k": 0}
+    page = start_page if start_page is not None else cursor["page"] + 1
+    if page > 1:
+        print(f"Reprise à la page {page} ({cursor['count']} joueurs déjà en checkpoint).")
+    total = cursor["count"]
+    started = time.monotonic()
+    fetched = 0
 
     while True:
         params = {"per_page": per_page, "page": page}
-        payload = http_get(PLAYERS_URL, headers, params, backoff)
+        payload = http_get(PLAYERS_URL, headers, params)
         data = payload.get("data", [])
         if not data:
             print("Fin de pagination (data vide).")
@@ -102,29 +135,48 @@ def fetch_active_players(per_page=100, start_page=1, cap=650, save_path="../asse
             if isinstance(tid, int) and tid in current_team_ids:
                 batch.append(clean_player(p))
 
-        out.extend(batch)
-        print(f"page {page}: +{len(batch)} actifs (total={len(out)})")
-
-        # sauvegarde incrémentale
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(out, f, ensure_ascii=False, indent=2)
+        # sauvegarde incrémentale: on n'ajoute que la page courante
+        ckpt.append_page(page, batch)
+        total += len(batch)
+        fetched += len(batch)
+        print(f"page {page}: +{len(batch)} actifs (total={total})")
+        metrics.event("page", source="balldontlie", page=page, received=len(data), kept=len(batch), total=total)
 
         page += 1
-        if len(out) >= cap:
+        if total >= cap:
             print(f"Cap atteint ({cap}). Arrêt anticipé.")
             break
 
-        time.sleep(0.5)  # limiter le débit
-
-    print(f"✅ Écrit {len(out)} joueurs actifs -> {save_path}")
-    return out
+    # 3) Compaction du checkpoint en tableau JSON
+    ckpt.mark_done()
+    written = ckpt.compact(save_path, key="extId")
+    print(f"✅ Écrit {written} joueurs actifs -> {save_path}")
+    metrics.throughput("balldontlie", fetched, time.monotonic() - started)
+    RATE.report()
+    if CACHE:
+        CACHE.report()
+    return list(iter_records(save_path))  # relu depuis le JSON compacté (dédoublonné)
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
-    ap.add_argument("--start", type=int, default=1, help="Page de départ (pour reprise)")
+    ap.add_argument("--start", type=int, default=None, help="Page de départ (par défaut: reprise depuis le checkpoint)")
+    ap.add_argument("--fresh", action="store_true", help="Ignore le checkpoint existant et repart de la page 1")
     ap.add_argument("--per-page", type=int, default=100, help="Taille de page (max 100)")
     ap.add_argument("--cap", type=int, default=650, help="Limite avant arrêt anticipé")
     ap.add_argument("--out", type=str, default="../assets/data/nba_players_active_2025.json", help="Chemin du JSON de sortie")
+    ap.add_argument("--cache-dir", type=str, default=".http_cache", help="Dossier du cache HTTP ('' pour désactiver)")
+    ap.add_argument("--cache-ttl", type=float, default=None, help="Durée (s) pendant laquelle une réponse est servie sans revalidation")
+    ap.add_argument("--cache-max-mb", type=int, default=200, help="Taille max du cache (Mo)")
+    ap.add_argument("--offline", action="store_true", help="Rejoue uniquement le cache, sans réseau")
+    metrics.add_arguments(ap)
     args = ap.parse_args()
 
-    fetch_active_players(per_page=args.per_page, start_page=args.start, cap=args.cap, save_path=args.out)
+    metrics.enable_from_args(args)
+    if args.cache_dir:
+        CACHE = HttpCache(args.cache_dir, args.cache_ttl, args.cache_max_mb * 1024 * 1024, args.offline)
+
+    try:
+        fetch_active_players(per_page=args.per_page, start_page=args.start, cap=args.cap, save_path=args.out, fresh=args.fresh)
+    except CacheMiss as e:
+        # le checkpoint garde les pages déjà rejouées: la reprise repartira de là
+        raise SystemExit(f"❌ Réponse absente du cache HTTP ({args.cache_dir}), {e}")
@@ -0,0 +1,92 @@
+"""
+Serveur HTTP local qui rejoue des pages sauvegardées, pour tester les scrapers hors-ligne.
+
+Un chemin d'URL est résolu dans le dossier de fixtures :
+  /teams/boston-celtics              -> <root>/teams/boston-celtics(.html)
+  /nba-2k/players.json?page=3        -> <root>/nba-2k/players.json@page=3 (sinon sans la query)
+Tout fichier absent renvoie un 404, comme le site réel en fin de pagination.
+Les réponses portent un ETag (hash du contenu): un If-None-Match identique reçoit un 304.
+"""
+import os, time, hashlib, argparse, mimetypes, threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote
+
+
+def resolve_fixture(root: str, raw_path: str) -> str | None:
+    """Retourne le fichier de fixture correspondant à une URL, ou None."""
+    parts = urlsplit(raw_path)
+    rel = unquote(parts.path).lstrip("/")
+    base = os.path.normpath(os.path.join(root, rel or "index.html"))
+    if not base.startswith(os.path.normpath(root)):
+        return None  # pas de sortie du dossier de fixtures
+    candidates = []
+    if parts.query:
+        candidates.append(f"{base}@{parts.query.replace('&', '_')}")
+    candidates += [base, base + ".html", os.path.join(base, "index.html")]
+    for c in candidates:
+        if os.path.isfile(c):
+            return c
+    return None
+
+
+def make_handler(root: str, delay: float = 0.0):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, comme un vrai serveur
+
+        def do_GET(self):
+            if delay:
+                time.sleep(delay)  # latence simulée
+            path = resolve_fixture(root, self.path)
+            if path is None:
+                body = b"not found"
+                self.send_response(404)
+                self.send_header("Content-Type", "text/plain")
+            else:
+                with open(path, "rb") as f:
+                    body = f.read()
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                ctype = mimetypes.guess_type(path.split("@")[0])[0] or "text/html"
+                if self.headers.get("If-None-Match") == etag:
+                    body = b""
+                    self.send_response(304)
+                else:
+                    self.send_response(200)
+                    self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+                self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass  # silencieux: les scrapers affichent déjà leur progression
+
+    return FixtureHandler
+
+
+@contextmanager
+def serve_fixtures(root: str, port: int = 0, delay: float = 0.0):
+    """Démarre le serveur dans un thread et renvoie son URL de base (ex: http://127.0.0.1:54321)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(root, delay))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("root", help="Dossier des pages sauvegardées")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--delay", type=float, default=0.0, help="Latence simulée par requête (s)")
+    args = ap.parse_args()
+
+    with serve_fixtures(args.root, args.port, args.delay) as url:
+        print(f"Fixtures servies depuis {args.root} sur {url} (Ctrl+C pour arrêter)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
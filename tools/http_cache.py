@@ -0,0 +1,191 @@
+"""
+Cache HTTP sur disque avec requêtes conditionnelles (balldontlie, hoopshype).
+
+Une entrée par URL+paramètres (clé sha256) :
+    <dir>/<k[:2]>/<k>.body        corps brut de la réponse
+    <dir>/<k[:2]>/<k>.json        statut, ETag, Last-Modified, date de stockage, content-type
+- entrée plus jeune que `ttl`    -> servie directement, aucune requête
+- sinon                          -> requête avec If-None-Match / If-Modified-Since, un 304 est servi depuis le disque
+                                    (entrée évincée entre la lecture et la réponse: redemandée sans validateurs)
+- `offline=True`                 -> rejoue uniquement le cache (CacheMiss si absent), sans réseau
+La taille totale est bornée par `max_bytes`: les entrées les moins récemment lues sont évincées (LRU sur mtime).
+"""
+import os, json, time, hashlib, threading
+from urllib.parse import urlencode
+import requests
+from requests.structures import CaseInsensitiveDict
+import metrics
+
+CACHEABLE_STATUSES = {200, 404}  # 404 = fin de pagination, utile pour rejouer un crawl hors-ligne
+
+
+class CacheMiss(Exception):
+    """Mode hors-ligne: la réponse demandée n'a jamais été mise en cache."""
+
+    def __init__(self, url: str, params: dict | None = None):
+        query = f"?{urlencode(sorted(params.items()), doseq=True)}" if params else ""
+        super().__init__(f"pas dans le cache (mode hors-ligne): {url}{query}; relancer une fois sans --offline")
+        self.url = url
+
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+
+class HttpCache:
+    def __init__(self, directory: str, ttl: float | None = None, max_bytes: int = 200 * 1024 * 1024, offline: bool = False):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".body", base + ".json"
+
+    def _entries(self):
+        """(chemin du corps, taille, dernier accès) de chaque entrée."""
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for e in os.scandir(sub.path):
+                if e.name.endswith(".body"):
+                    st = e.stat()
+                    yield e.path, st.st_size, st.st_mtime
+
+    def _load(self, key: str) -> tuple[dict, str] | None:
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return (meta, body_path) if os.path.exists(body_path) else None
+
+    def _response(self, url: str, meta: dict, body_path: str) -> requests.Response:
+        with open(body_path, "rb") as f:
+            content = f.read()
+        os.utime(body_path)  # dernier accès, pour l'éviction LRU
+        r = requests.Response()
+        r.status_code = meta["status"]
+        r._content = content
+        r.headers = CaseInsensitiveDict({"Content-Type": meta.get("content_type") or "application/json"})
+        r.url = url
+        r.encoding = "utf-8"
+        r.from_cache = True
+        return r
+
+    # --- API bas niveau (utilisable depuis du code asynchrone) ---
+
+    def lookup_fresh(self, url: str, params: dict | None = None) -> requests.Response | None:
+        """Réponse servie sans réseau (entrée fraîche, ou n'importe quelle entrée en mode hors-ligne)."""
+        entry = self._load(cache_key(url, params))
+        if entry is None:
+            if self.offline:
+                raise CacheMiss(url, params)
+            return None
+        meta, body_path = entry
+        fresh = self.ttl is not None and time.time() - meta["stored_at"] < self.ttl
+        if self.offline or fresh:
+            self.hits += 1
+            metrics.inc("http_cache_total", result="hit")
+            return self._response(url, meta, body_path)
+        return None
+
+    def conditional_headers(self, url: str, params: dict | None = None) -> dict:
+        entry = self._load(cache_key(url, params))
+        if entry is None:
+            return {}
+        meta = entry[0]
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def update(self, url: str, params: dict | None, r: requests.Response) -> requests.Response | None:
+        """
+        Intègre la réponse réseau: 304 -> corps en cache, 200/404 -> stockés.
+        None si un 304 arrive alors que l'entrée a été évincée: il faut redemander sans validateurs.
+        """
+        key = cache_key(url, params)
+        body_path, meta_path = self._paths(key)
+        if r.status_code == 304:
+            entry = self._load(key)
+            if entry is not None:
+                meta = entry[0]
+                meta["stored_at"] = time.time()
+                self._write_meta(meta_path, meta)
+                self.revalidated += 1
+                metrics.inc("http_cache_total", result="revalidated")
+                return self._response(url, meta, body_path)
+            metrics.inc("http_cache_total", result="evicted_304")
+            return None
+        self.misses += 1
+        metrics.inc("http_cache_total", result="miss")
+        if r.status_code in CACHEABLE_STATUSES:
+            self._store(key, url, params, r)
+        r.from_cache = False
+        return r
+
+    def _write_meta(self, meta_path: str, meta: dict):
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def _store(self, key: str, url: str, params: dict | None, r: requests.Response):
+        body_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+        tmp = body_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(r.content)
+        os.replace(tmp, body_path)
+        self._write_meta(meta_path, {
+            "url": url, "params": params or {}, "status": r.status_code,
+            "etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified"),
+            "content_type": r.headers.get("Content-Type"), "stored_at": time.time(),
+        })
+        with self.lock:
+            self.total_bytes += len(r.content) - old_size
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment lues jusqu'à repasser sous max_bytes."""
+        for body_path, size, _ in sorted(self._entries(), key=lambda e: e[2]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            for p in (body_path, body_path[:-len(".body")] + ".json"):
+                if os.path.exists(p):
+                    os.remove(p)
+            self.total_bytes -= size
+
+    # --- API haut niveau ---
+
+    def get(self, url: str, params: dict | None, send) -> requests.Response:
+        """
+        `send(extra_headers)` fait la vraie requête (débit, 429...) et renvoie un requests.Response;
+        il n'est appelé que si le cache ne suffit pas.
+        """
+        cached = self.lookup_fresh(url, params)
+        if cached is not None:
+            return cached
+        r = self.update(url, params, send(self.conditional_headers(url, params)))
+        if r is None:  # 304 mais entrée évincée entre-temps: le corps est redemandé en entier
+            r = send({})
+            r = self.update(url, params, r) or r
+        return r
+
+    def report(self):
+        print(f"[cache] {self.hits} servies du disque, {self.revalidated} revalidées (304), "
+              f"{self.misses} téléchargées, {self.total_bytes / 1024:.0f} Ko en cache")
@@ -0,0 +1,260 @@
+"""
+Métriques et traces structurées partagées par les scripts d'ingestion (fetchers, scrapers, fusions).
+
+    import metrics
+    metrics.enable(events="run.jsonl", prometheus="run.prom")
+    metrics.inc("http_requests_total", host="api.balldontlie.io", status=200)
+    metrics.observe("http_request_seconds", 0.21, host="api.balldontlie.io")
+    with metrics.timed("stage_seconds", stage="match"):
+        ...
+    metrics.event("page", source="balldontlie", page=3, kept=41)
+    metrics.close()          # écrit l'instantané Prometheus (aussi fait à la sortie du processus)
+
+- compteurs (`inc`), jauges (`gauge`) et histogrammes (`observe`, seaux fixes par métrique), étiquetés;
+- événements JSON Lines horodatés (`event`), écrits au fil de l'eau: un run interrompu reste lisible;
+- instantané au format texte Prometheus en fin de run (pour un node_exporter textfile collector, ou un diff).
+
+Désactivé (par défaut), chaque appel se résume à un test sur une globale: on peut instrumenter les
+boucles chaudes sans rien payer. Les métriques vivent dans le processus qui les enregistre: les
+workers d'un ProcessPool ne remontent rien, c'est le processus parent qui compte.
+"""
+import os, sys, json, time, atexit, threading, contextlib
+
+# Seaux des histogrammes (bornes supérieures); les métriques absentes utilisent DEFAULT_BUCKETS.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS = {
+    "http_request_seconds": DEFAULT_BUCKETS,
+    "stage_seconds": (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+}
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class Histogram:
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)      # dernier seau: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.bounds) and value > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, n in zip(self.bounds + (float("inf"),), self.counts):
+            total += n
+            yield bound, total
+
+
+class Registry:
+    def __init__(self, events: str | None = None, prometheus: str | None = None):
+        self.events_path = events
+        self.prometheus_path = prometheus
+        self.run_id = f"{int(time.time())}-{os.getpid()}"
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.counters: dict[tuple, float] = {}
+        self.gauges: dict[tuple, float] = {}
+        self.histograms: dict[tuple, Histogram] = {}
+        self._events = None
+        if events:
+            os.makedirs(os.path.dirname(events) or ".", exist_ok=True)
+            self._events = open(events, "a", encoding="utf-8")
+        self.event("run_start", {"argv": sys.argv})
+
+    def inc(self, name: str, value: float, labels: dict):
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, labels: dict):
+        with self.lock:
+            self.gauges[(name, _labels(labels))] = value
+
+    def observe(self, name: str, value: float, labels: dict):
+        key = (name, _labels(labels))
+        with self.lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = Histogram(BUCKETS.get(name, DEFAULT_BUCKETS))
+            h.observe(value)
+
+    def event(self, name: str, fields: dict):
+        if self._events is None:
+            return
+        line = json.dumps({"ts": round(time.time(), 3), "run": self.run_id, "event": name, **fields},
+                          ensure_ascii=False, default=str)
+        with self.lock:
+            self._events.write(line + "\n")
+            self._events.flush()
+
+    def snapshot(self) -> dict:
+        """Valeurs courantes, pour un rapport ou un benchmark: {"counters", "gauges", "histograms"}."""
+        def key(name, labels):
+            return name + _format_labels(labels)
+
+        with self.lock:
+            return {
+                "counters": {key(*k): v for k, v in self.counters.items()},
+                "gauges": {key(*k): v for k, v in self.gauges.items()},
+                "histograms": {key(*k): {"count": h.count, "sum": round(h.sum, 6)} for k, h in self.histograms.items()},
+            }
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted({n for n, _ in series}):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for (n, labels), v in sorted(series.items()):
+                        if n == name:
+                            lines.append(f"{name}{_format_labels(labels)} {_format_value(v)}")
+            for name in sorted({n for n, _ in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), h in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if n != name:
+                        continue
+                    for bound, total in h.cumulative():
+                        lines.append(f"{name}_bucket{_format_labels(labels, (('le', _format_value(bound)),))} {total}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(round(h.sum, 6))}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        self.event("run_end", {"seconds": round(time.monotonic() - self.started, 3)})
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+        if self.prometheus_path:
+            os.makedirs(os.path.dirname(self.prometheus_path) or ".", exist_ok=True)
+            tmp = f"{self.prometheus_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp, self.prometheus_path)
+
+
+_registry: Registry | None = None
+
+
+def enable(events: str | None = None, prometheus: str | None = None) -> Registry:
+    """Active la collecte (remplace un registre déjà actif, qui est d'abord fermé)."""
+    global _registry
+    if _registry is not None:
+        close()
+    _registry = Registry(events, prometheus)
+    atexit.register(close)
+    return _registry
+
+
+def enabled() -> bool:
+    return _registry is not None
+
+
+def close():
+    """Écrit l'instantané Prometheus, ferme le journal d'événements et désactive la collecte."""
+    global _registry
+    registry, _registry = _registry, None
+    if registry is not None:
+        registry.close()
+
+
+def inc(name: str, value: float = 1, **labels):
+    if _registry is not None:
+        _registry.inc(name, value, labels)
+
+
+def gauge(name: str, value: float, **labels):
+    if _registry is not None:
+        _registry.gauge(name, value, labels)
+
+
+def observe(name: str, value: float, **labels):
+    if _registry is not None:
+        _registry.observe(name, value, labels)
+
+
+def event(name: str, **fields):
+    if _registry is not None:
+        _registry.event(name, fields)
+
+
+@contextlib.contextmanager
+def _timer(name: str, labels: dict):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+def timed(name: str, **labels):
+    """Contexte qui observe sa durée (s) dans l'histogramme `name`; sans effet si désactivé."""
+    if _registry is None:
+        return _NULL_TIMER
+    return _timer(name, labels)
+
+
+def throughput(source: str, records: int, seconds: float):
+    """Enregistrements produits par une source: compteur, débit (jauge) et événement de fin."""
+    if _registry is None:
+        return
+    rate = records / seconds if seconds > 0 else 0.0
+    inc("records_total", records, source=source)
+    gauge("records_per_second", round(rate, 3), source=source)
+    event("records", source=source, count=records, seconds=round(seconds, 3), per_second=round(rate, 3))
+
+
+def match_report(stage: str, report, total: int):
+    """Taux d'appariement et cibles sans correspondance d'une fusion (player_matching.MatchReport)."""
+    if _registry is None:
+        return
+    methods: dict[str, int] = {}
+    for m in report.matches:
+        methods[m.method] = methods.get(m.method, 0) + 1
+    for method, n in methods.items():
+        inc("matched_total", n, stage=stage, method=method)
+    inc("unmatched_total", len(report.unmatched), stage=stage)
+    gauge("match_rate", round(len(report.matches) / total, 4) if total else 0.0, stage=stage)
+    event("match", stage=stage, total=total, matched=len(report.matches), unmatched=len(report.unmatched),
+          comparisons=report.comparisons, **methods)
+
+
+def add_arguments(ap):
+    """Options communes --metrics / --metrics-prom (défauts: variables NBA_METRICS et NBA_METRICS_PROM)."""
+    ap.add_argument("--metrics", type=str, default=os.environ.get("NBA_METRICS"),
+                    help="Journal d'événements JSONL (active les métriques)")
+    ap.add_argument("--metrics-prom", type=str, default=os.environ.get("NBA_METRICS_PROM"),
+                    help="Instantané Prometheus écrit en fin de run (active les métriques)")
+
+
+def enable_from_args(args) -> bool:
+    if args.metrics or args.metrics_prom:
+        enable(args.metrics, args.metrics_prom)
+        return True
+    return False
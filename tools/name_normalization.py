@@ -0,0 +1,66 @@
+"""
+Normalisation des noms de joueurs et table d'alias persistante.
+
+normalize_name: motifs précompilés + mémoïsation LRU, chaque nom distinct n'est calculé qu'une fois.
+AliasTable: nom tel qu'écrit par une source -> player_id canonique, chargée une seule fois dans un dict.
+Elle est consultée sur les noms bruts, après l'égalité exacte (qui prime) et avant toute comparaison
+approchée, et s'enrichit des correspondances sûres de chaque fusion; on peut aussi y corriger des cas
+à la main (surnoms...).
+"""
+import os, re, json, unicodedata
+from functools import lru_cache
+
+SUFFIX_RE = re.compile(r'\b(jr|sr|ii|iii|iv)\b\.?')     # "Jr." en fin de nom ou avant la virgule
+PUNCT_RE = re.compile(r"[.,'’`]")                         # P.J. -> pj, D'Angelo -> dangelo
+SEPARATOR_RE = re.compile(r'[\s\-]+')                     # Gilgeous-Alexander -> gilgeous alexander
+# lettres que la décomposition NFD ne ramène pas à l'ASCII
+EXTRA_ASCII = str.maketrans({"ø": "o", "đ": "d", "ł": "l", "ß": "ss", "æ": "ae", "œ": "oe", "ı": "i"})
+
+
+@lru_cache(maxsize=16384)
+def normalize_name(name: str) -> str:
+    """
+    Nettoie un nom de joueur pour une meilleure correspondance :
+    - Met en minuscules
+    - Supprime les accents et caractères spéciaux
+    - Supprime les suffixes (Jr., III, etc.)
+    Ex: "Nikola Jokić" -> "nikola jokic", "Jackson Jr., Jaren" -> "jackson jaren"
+    """
+    name = name.lower().translate(EXTRA_ASCII)
+    name = unicodedata.normalize('NFD', name).encode('ascii', 'ignore').decode('utf-8')
+    name = PUNCT_RE.sub('', SUFFIX_RE.sub(' ', name))
+    return SEPARATOR_RE.sub(' ', name).strip()
+
+
+class AliasTable:
+    """path=None: table en mémoire seulement (rien n'est écrit)."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.aliases: dict[str, str] = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.aliases = {k: str(v) for k, v in json.load(f).items()}
+
+    def __len__(self):
+        return len(self.aliases)
+
+    def resolve(self, source_name: str) -> str | None:
+        return self.aliases.get(source_name)
+
+    def add(self, source_name: str, player_id):
+        player_id = str(player_id)
+        if self.aliases.get(source_name) != player_id:
+            self.aliases[source_name] = player_id
+            self.dirty = True
+
+    def save(self):
+        # écrite même vide la première fois: le build la déclare comme sortie de l'étape qui l'apprend
+        if not self.path or (not self.dirty and os.path.exists(self.path)):
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(self.aliases.items())), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -0,0 +1,75 @@
+"""
+Stockage compressé des pages HTML brutes d'un crawl (2kratings), pour pouvoir les re-parser sans réseau.
+
+    <dir>/<k[:2]>/<k>.html.gz     page gzip (clé sha1 de l'URL)
+    <dir>/manifest.jsonl          {"url", "kind", "file", "fetched_at", "bytes"} par page écrite
+
+`kind` distingue les pages d'équipe et de joueur. Pour une même URL, la dernière entrée du
+manifeste l'emporte: un nouveau crawl écrase simplement les pages déjà stockées.
+"""
+import os, gzip, json, time, hashlib, threading
+
+
+def read_page(path: str) -> str:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+class PageStore:
+    def __init__(self, directory: str, compresslevel: int = 6):
+        self.directory = directory
+        self.compresslevel = compresslevel
+        self.manifest_path = os.path.join(directory, "manifest.jsonl")
+        self.lock = threading.Lock()
+        self.written = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, url: str) -> str:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], key + ".html.gz")
+
+    def put(self, url: str, kind: str, html: str) -> str:
+        path = self.path_for(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        raw = html.encode("utf-8")
+        data = gzip.compress(raw, self.compresslevel)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        entry = {"url": url, "kind": kind, "file": os.path.relpath(path, self.directory),
+                 "fetched_at": time.time(), "bytes": len(data)}
+        with self.lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.written += 1
+            self.raw_bytes += len(raw)
+            self.stored_bytes += len(data)
+        return path
+
+    def entries(self, kind: str | None = None) -> dict[str, dict]:
+        """URL -> dernière entrée du manifeste (filtrée sur `kind`), pages présentes sur disque seulement."""
+        latest: dict[str, dict] = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        latest[entry["url"]] = entry
+        return {url: e for url, e in latest.items()
+                if (kind is None or e["kind"] == kind) and os.path.exists(os.path.join(self.directory, e["file"]))}
+
+    def file_of(self, entry: dict) -> str:
+        return os.path.join(self.directory, entry["file"])
+
+    def get(self, url: str) -> str | None:
+        path = self.path_for(url)
+        return read_page(path) if os.path.exists(path) else None
+
+    def report(self):
+        if self.written:
+            ratio = self.stored_bytes / self.raw_bytes * 100 if self.raw_bytes else 0.0
+            print(f"[pages] {self.written} pages stockées dans {self.directory}: "
+                  f"{self.raw_bytes / 1e6:.1f} Mo -> {self.stored_bytes / 1e6:.1f} Mo ({ratio:.0f}%)")
@@ -0,0 +1,158 @@
+"""
+Moteur de build incrémental: chaque étape déclare ses fichiers d'entrée et de sortie.
+
+- Une étape est sautée si ses sorties existent et que le hash de contenu de ses entrées
+  (et de ses sorties) est identique à celui du dernier build réussi (état dans `state_path`).
+- Une étape sans entrée (téléchargement) ne tourne que si ses sorties manquent ou sur demande (`refresh`).
+- `previous`: fichiers d'un build précédent (sorties d'une étape en aval) relus par l'étape; hashés comme
+  les entrées, mais sans créer de dépendance (ce serait un cycle).
+- Les étapes dont les dépendances sont prêtes tournent en parallèle (threads: elles attendent surtout le réseau).
+"""
+import os, json, time, hashlib
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable
+import metrics
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], object]
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    previous: list[str] = field(default_factory=list)
+
+
+def file_hash(path: str) -> str | None:
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Pipeline:
+    def __init__(self, stages: list[Stage], state_path: str):
+        self.stages = {s.name: s for s in stages}
+        self.state_path = state_path
+        self.producer = {out: s.name for s in stages for out in s.outputs}
+        try:
+            with open(state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.state = {}
+
+    def deps(self, name: str) -> set[str]:
+        return {self.producer[p] for p in self.stages[name].inputs if p in self.producer}
+
+    def closure(self, targets: list[str]) -> list[str]:
+        """Étapes nécessaires pour produire `targets`, dans un ordre topologique."""
+        order, seen = [], set()
+
+        def visit(name, path=()):
+            if name in path:
+                raise ValueError(f"Cycle de dépendances: {' -> '.join(path + (name,))}")
+            if name in seen:
+                return
+            for dep in sorted(self.deps(name)):
+                visit(dep, path + (name,))
+            seen.add(name)
+            order.append(name)
+
+        for t in targets:
+            visit(t)
+        return order
+
+    def fingerprint(self, stage: Stage) -> dict:
+        out = {
+            "inputs": {p: file_hash(p) for p in stage.inputs},
+            "outputs": {p: file_hash(p) for p in stage.outputs},
+        }
+        if stage.previous:
+            out["previous"] = {p: file_hash(p) for p in stage.previous}
+        return out
+
+    def is_fresh(self, stage: Stage) -> bool:
+        if not all(os.path.exists(p) for p in stage.outputs):
+            return False
+        previous = self.state.get(stage.name)
+        if previous is None:
+            # étape de téléchargement déjà faite à la main: ses sorties suffisent
+            return not stage.inputs
+        return previous == self.fingerprint(stage)
+
+    def _save_state(self):
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def run(self, targets: list[str] | None = None, refresh: set[str] = frozenset(), force: bool = False,
+            jobs: int = 3, dry_run: bool = False) -> dict[str, str]:
+        """Exécute les étapes nécessaires; renvoie le statut de chacune (ran / skipped / failed / blocked)."""
+        order = self.closure(targets or list(self.stages))
+        status: dict[str, str] = {}
+        dirty: set[str] = set()          # étapes (re)jouées pendant ce build
+        pending = list(order)
+        running = {}
+
+        def ready(name):
+            return all(d in status for d in self.deps(name))
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            while pending or running:
+                for name in [n for n in pending if ready(n)]:
+                    pending.remove(name)
+                    stage = self.stages[name]
+                    if any(status[d] in ("failed", "blocked") for d in self.deps(name)):
+                        status[name] = "blocked"
+                        continue
+                    stale = force or name in refresh or bool(self.deps(name) & dirty) or not self.is_fresh(stage)
+                    if not stale:
+                        status[name] = "skipped"
+                        print(f"[pipeline] {name}: à jour, sauté")
+                        metrics.event("stage", stage=name, status="skipped")
+                        continue
+                    if dry_run:
+                        status[name] = "ran"
+                        dirty.add(name)
+                        print(f"[pipeline] {name}: serait relancé")
+                        continue
+                    print(f"[pipeline] {name}: lancement")
+                    running[executor.submit(self._run_stage, stage)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    try:
+                        elapsed = fut.result()
+                    except Exception as e:
+                        status[name] = "failed"
+                        print(f"[pipeline] ❌ {name}: {e}")
+                        metrics.event("stage", stage=name, status="failed", error=str(e))
+                        continue
+                    status[name] = "ran"
+                    dirty.add(name)
+                    self.state[name] = self.fingerprint(self.stages[name])
+                    self._save_state()
+                    print(f"[pipeline] ✅ {name} ({elapsed:.1f}s)")
+                    metrics.observe("stage_seconds", elapsed, stage=name)
+                    metrics.event("stage", stage=name, status="ran", seconds=round(elapsed, 3))
+        return status
+
+    @staticmethod
+    def _run_stage(stage: Stage) -> float:
+        started = time.monotonic()
+        for p in stage.outputs:
+            os.makedirs(os.path.dirname(p) or ".", exist_ok=True)
+        result = stage.run()
+        if result is None:
+            raise RuntimeError("l'étape n'a rien produit (voir le message d'erreur ci-dessus)")
+        missing = [p for p in stage.outputs if not os.path.exists(p)]
+        if missing:
+            raise RuntimeError(f"sorties absentes: {', '.join(missing)}")
+        return time.monotonic() - started
@@ -0,0 +1,186 @@
+"""
+Moteur d'appariement de noms de joueurs, partagé par les scripts de fusion (mix.py, nba_players_updated.py).
+
+1. Égalité exacte des noms normalisés (table de hachage): elle prime toujours sur les alias.
+1b. Table d'alias (nom source -> player_id) pour les noms restants, sans aucune normalisation.
+2. Pour le reste, index de blocage: un nom n'est comparé qu'aux candidats qui partagent
+   une clé (nom de famille, code phonétique du nom de famille, prénom + initiale, mots triés).
+   On reste quasi linéaire au lieu de comparer toutes les paires.
+3. Dans chaque bloc, score difflib (élagué par real_quick_ratio/quick_ratio), et
+   affectation un-pour-un par score décroissant au-dessus d'un seuil.
+"""
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from name_normalization import normalize_name, AliasTable
+
+SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"]) for c in letters}
+
+
+def soundex(word: str) -> str:
+    """Code phonétique Soundex (4 caractères): 'jokic' et 'jokich' partagent J220."""
+    letters = [c for c in word if c.isalpha()]
+    if not letters:
+        return ""
+    codes = [SOUNDEX_CODES.get(c, "0") for c in letters]
+    out = [letters[0].upper()]
+    prev = codes[0]
+    for c, code in zip(letters[1:], codes[1:]):
+        if code != "0" and code != prev:
+            out.append(code)
+        if c not in "hw":
+            prev = code
+    return ("".join(out) + "000")[:4]
+
+
+def blocking_keys(norm: str) -> set[str]:
+    tokens = re.split(r"[\s\-'.]+", norm)
+    tokens = [t for t in tokens if t]
+    if not tokens:
+        return set()
+    first, last = tokens[0], tokens[-1]
+    keys = {f"l:{last}", f"s:{soundex(last)}"}
+    if len(tokens) > 1:
+        keys.add(f"f:{first}:{last[0]}")
+        keys.add("o:" + " ".join(sorted(tokens)))  # prénom et nom inversés
+    return keys
+
+
+def similarity(a: str, b: str, floor: float = 0.0) -> float:
+    """Ratio difflib, meilleur de l'ordre original et de l'ordre trié des mots. 0 si sous `floor`."""
+    sm = SequenceMatcher(None, a, b, autojunk=False)
+    if sm.real_quick_ratio() < floor or sm.quick_ratio() < floor:
+        score = 0.0
+    else:
+        score = sm.ratio()
+    a_sorted, b_sorted = " ".join(sorted(a.split())), " ".join(sorted(b.split()))
+    if (a_sorted, b_sorted) != (a, b):
+        score = max(score, SequenceMatcher(None, a_sorted, b_sorted, autojunk=False).ratio())
+    return score
+
+
+def player_key(player: dict) -> str:
+    """player_id canonique d'un joueur du fichier principal (id de l'API, sinon nom complet)."""
+    pid = player.get('player_id') or player.get('extId') or player.get('id')
+    return str(pid) if pid is not None else f"{player.get('prenom', '')} {player.get('nom', '')}".strip()
+
+
+@dataclass
+class Match:
+    target: int        # index dans la liste à mettre à jour
+    source: int        # index dans la liste de référence
+    score: float       # 1.0 = alias connu ou égalité exacte après normalisation
+    method: str        # "alias", "exact" ou "fuzzy"
+
+
+@dataclass
+class MatchReport:
+    matches: list[Match] = field(default_factory=list)
+    unmatched: list[int] = field(default_factory=list)   # cibles sans correspondance
+    comparisons: int = 0
+
+    def by_target(self) -> dict[int, Match]:
+        return {m.target: m for m in self.matches}
+
+    def summary(self, total: int) -> str:
+        alias = sum(1 for m in self.matches if m.method == "alias")
+        fuzzy = sum(1 for m in self.matches if m.method == "fuzzy")
+        rate = len(self.matches) / total * 100 if total else 0.0
+        return (f"{len(self.matches)}/{total} appariés ({rate:.1f}%), dont {alias} par alias et {fuzzy} approchés; "
+                f"{len(self.unmatched)} sans correspondance; {self.comparisons} comparaisons")
+
+
+def match_names(targets: list[str], sources: list[str], normalize=normalize_name, threshold: float = 0.85,
+                aliases: AliasTable | None = None, target_ids: list | None = None, learn_threshold: float = 0.92,
+                learn_margin: float = 0.1) -> MatchReport:
+    """
+    Associe chaque nom de `targets` à au plus un nom de `sources`.
+    Avec `aliases` et `target_ids` (player_id de chaque cible), les alias connus sont appliqués
+    aux noms sans égalité exacte. Une correspondance approchée n'est apprise que si elle est sûre:
+    score >= learn_threshold et aucun autre nom proche (d'un côté comme de l'autre, parmi les noms
+    restés à apparier) à moins de `learn_margin` ("Keon Johnson" ne doit pas devenir un alias de
+    "Keldon Johnson"). Ces scores voisins sont relevés pendant le calcul des candidats, dans les blocs.
+    Les alias ajoutés à la main dans le fichier font foi.
+    """
+    report = MatchReport()
+    used: set[int] = set()
+    matched_t: set[int] = set()
+
+    norm_t = {i: normalize(n) for i, n in enumerate(targets)}
+    norm_s = {j: normalize(n) for j, n in enumerate(sources)}
+
+    # --- 1) Égalité exacte ---
+    exact: dict[str, int] = {}
+    for j, n in norm_s.items():
+        exact.setdefault(n, j)
+    for i, n in norm_t.items():
+        j = exact.get(n)
+        if j is not None and j not in used:
+            used.add(j)
+            matched_t.add(i)
+            report.matches.append(Match(i, j, 1.0, "exact"))
+
+    # --- 1b) Alias connus, pour les noms sans égalité exacte ---
+    if aliases is not None and target_ids is not None:
+        index_of = {str(pid): i for i, pid in enumerate(target_ids)}
+        for j, name in enumerate(sources):
+            i = index_of.get(aliases.resolve(name))
+            if j not in used and i is not None and i not in matched_t:
+                matched_t.add(i)
+                used.add(j)
+                report.matches.append(Match(i, j, 1.0, "alias"))
+    pending = [i for i in norm_t if i not in matched_t]
+
+    # --- 2) Index de blocage sur les sources restantes ---
+    blocks: dict[str, list[int]] = {}
+    for j, n in norm_s.items():
+        if j not in used:
+            for key in blocking_keys(n):
+                blocks.setdefault(key, []).append(j)
+
+    # --- 3) Scores dans les blocs puis affectation gloutonne ---
+    # Pour apprendre un alias, il faut aussi les scores un peu sous le seuil (noms voisins):
+    # ils sont relevés dans la même boucle, par cible et par source.
+    learn = aliases is not None and target_ids is not None
+    floor = min(threshold, learn_threshold - learn_margin) if learn else threshold
+    near_t: dict[int, list[tuple[float, int]]] = {}
+    near_s: dict[int, list[tuple[float, int]]] = {}
+    candidates: list[tuple[float, int, int]] = []
+    for i in pending:
+        seen: set[int] = set()
+        scored = []
+        for key in blocking_keys(norm_t[i]):
+            for j in blocks.get(key, ()):
+                if j in seen:
+                    continue
+                seen.add(j)
+                report.comparisons += 1
+                score = similarity(norm_t[i], norm_s[j], floor)
+                if score >= threshold:
+                    scored.append((score, i, j))
+                if learn and score >= floor:
+                    near_t.setdefault(i, []).append((score, j))
+                    near_s.setdefault(j, []).append((score, i))
+        # on garde les 3 meilleurs candidats: de quoi arbitrer un conflit sans tout stocker
+        candidates.extend(sorted(scored, reverse=True)[:3])
+
+    for score, i, j in sorted(candidates, reverse=True):
+        if i in matched_t or j in used:
+            continue
+        matched_t.add(i)
+        used.add(j)
+        report.matches.append(Match(i, j, round(score, 3), "fuzzy"))
+
+    report.unmatched = [i for i in pending if i not in matched_t]
+    report.matches.sort(key=lambda m: m.target)
+
+    if learn:
+        for m in report.matches:
+            if m.method != "fuzzy" or m.score < learn_threshold:
+                continue
+            # meilleur autre nom proche de la cible ou de la source (restés en lice après l'égalité exacte)
+            runner_up = max([sc for sc, j in near_t.get(m.target, ()) if norm_s[j] != norm_s[m.source]] +
+                            [sc for sc, i in near_s.get(m.source, ()) if norm_t[i] != norm_t[m.target]], default=0.0)
+            if runner_up <= m.score - learn_margin:
+                aliases.add(sources[m.source], target_ids[m.target])
+    return report
@@ -0,0 +1,185 @@
+"""
+Contrôle de débit adaptatif, partagé par tous les fetchers (balldontlie, hoopshype, 2kratings).
+
+Par hôte, le débit autorisé (requêtes/s) suit une règle AIMD :
+  - succès           -> +`increase` req/s, jusqu'au plafond de l'hôte
+  - 429 / 503        -> débit x `decrease`, et l'hôte est mis en pause
+                        (durée du Retry-After, sinon cooldown doublé à chaque 429 consécutif)
+  - latence en hausse -> pas d'augmentation tant que la latence dépasse 2x sa référence
+On tourne donc au débit le plus élevé toléré par le serveur, plutôt qu'à une constante pessimiste.
+
+Horloge et sommeil sont injectables: RateController(clock=fake.now, sleep=fake.advance, epoch=...)
+rend le module testable sans attendre réellement. Un Retry-After en date HTTP est lu avec la même
+horloge (date courante = epoch + clock()).
+"""
+import time, asyncio, threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import metrics
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Retry-After en secondes ('120') ou en date HTTP (comparée à `now`, timestamp Unix); None si absent/illisible."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - (time.time() if now is None else now))
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    def __init__(self, rate: float, ceiling: float):
+        self.rate = rate
+        self.ceiling = ceiling
+        self.next_slot = 0.0
+        self.blocked_until = 0.0
+        self.strikes = 0               # 429 consécutifs
+        self.latency = None            # moyenne mobile (s)
+        self.latency_ref = None        # plus faible latence observée
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.wait_s = 0.0
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc or url
+
+
+class RateController:
+    def __init__(self, initial_rps: float = 1.0, max_rps: float = 10.0, min_rps: float = 0.05,
+                 increase: float = 0.25, decrease: float = 0.5, cooldown: float = 5.0, max_cooldown: float = 300.0,
+                 ceilings: dict[str, float] | None = None, clock=time.monotonic, sleep=time.sleep,
+                 epoch: float | None = None):
+        self.initial_rps = initial_rps
+        self.max_rps = max_rps
+        self.min_rps = min_rps
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.ceilings = dict(ceilings or {})
+        self.clock = clock
+        self.sleep = sleep
+        # timestamp Unix qui correspond à clock() == 0, pour lire les dates HTTP
+        self.epoch = time.time() - clock() if epoch is None else epoch
+        self.hosts: dict[str, HostState] = {}
+        self.lock = threading.Lock()
+
+    def _host(self, url: str) -> HostState:
+        host = host_of(url)
+        st = self.hosts.get(host)
+        if st is None:
+            ceiling = self.ceilings.get(host, self.max_rps)
+            st = self.hosts[host] = HostState(min(self.initial_rps, ceiling), ceiling)
+        return st
+
+    def set_ceiling(self, host: str, rps: float):
+        """Plafond de requêtes/s pour un hôte (ex: quota documenté de l'API)."""
+        with self.lock:
+            self.ceilings[host] = rps
+            if host in self.hosts:
+                self.hosts[host].ceiling = rps
+                self.hosts[host].rate = min(self.hosts[host].rate, rps)
+
+    # --- Avant la requête ---
+
+    def reserve(self, url: str) -> float:
+        """Réserve le prochain créneau de l'hôte et renvoie le délai à attendre (s)."""
+        with self.lock:
+            st = self._host(url)
+            now = self.clock()
+            slot = max(now, st.next_slot, st.blocked_until)
+            st.next_slot = slot + 1.0 / st.rate
+            st.requests += 1
+            delay = slot - now
+            st.wait_s += delay
+        if delay > 0:
+            metrics.inc("rate_wait_seconds_total", delay, host=host_of(url))
+        return delay
+
+    def wait(self, url: str) -> float:
+        delay = self.reserve(url)
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    async def wait_async(self, url: str) -> float:
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    # --- Après la requête ---
+
+    def record(self, url: str, status: int | None, latency: float | None = None, retry_after: str | float | None = None):
+        """Retour d'expérience d'une requête: statut HTTP (None = erreur réseau), latence, Retry-After."""
+        if metrics.enabled():
+            host = host_of(url)
+            metrics.inc("http_requests_total", host=host, status=status if status is not None else "error")
+            if latency is not None:
+                metrics.observe("http_request_seconds", latency, host=host)
+        if status in THROTTLE_STATUSES:
+            self.record_throttle(url, retry_after)
+        elif status is None or status >= 500:
+            with self.lock:
+                self._host(url).errors += 1
+        else:
+            self.record_success(url, latency)
+
+    def record_success(self, url: str, latency: float | None = None):
+        with self.lock:
+            st = self._host(url)
+            st.strikes = 0
+            slow = False
+            if latency is not None:
+                st.latency = latency if st.latency is None else 0.8 * st.latency + 0.2 * latency
+                st.latency_ref = latency if st.latency_ref is None else min(st.latency_ref, latency)
+                slow = st.latency > 2 * st.latency_ref
+            if not slow:
+                st.rate = min(st.ceiling, st.rate + self.increase)
+
+    def record_throttle(self, url: str, retry_after: str | float | None = None) -> float:
+        """Réduit le débit et met l'hôte en pause; renvoie la durée de la pause."""
+        if isinstance(retry_after, str) or retry_after is None:
+            retry_after = parse_retry_after(retry_after, self.epoch + self.clock())
+        with self.lock:
+            st = self._host(url)
+            st.throttled += 1
+            st.rate = max(self.min_rps, st.rate * self.decrease)
+            pause = retry_after if retry_after is not None else min(self.max_cooldown, self.cooldown * 2 ** st.strikes)
+            st.strikes += 1
+            st.blocked_until = max(st.blocked_until, self.clock() + pause)
+            st.next_slot = max(st.next_slot, st.blocked_until)
+        metrics.inc("http_throttled_total", host=host_of(url))
+        metrics.inc("throttle_pause_seconds_total", pause, host=host_of(url))
+        return pause
+
+    # --- Compteurs ---
+
+    def stats(self) -> dict:
+        with self.lock:
+            hosts = {
+                host: {
+                    "requests": st.requests, "throttled": st.throttled, "errors": st.errors,
+                    "wait_s": round(st.wait_s, 3), "rps": round(st.rate, 3),
+                    "latency_ms": round(st.latency * 1000, 1) if st.latency is not None else None,
+                }
+                for host, st in self.hosts.items()
+            }
+        total = {k: sum(h[k] for h in hosts.values()) for k in ("requests", "throttled", "errors", "wait_s")}
+        return {"total": total, "hosts": hosts}
+
+    def report(self):
+        s = self.stats()
+        t = s["total"]
+        print(f"[débit] {t['requests']} requêtes, {t['throttled']} x 429, {t['errors']} erreurs, "
+              f"{t['wait_s']:.1f}s d'attente")
+        for host, h in s["hosts"].items():
+            print(f"  {host}: {h['rps']} req/s, latence {h['latency_ms']} ms")
@@ -0,0 +1,230 @@
+"""
+Historique des notes: un instantané en colonnes NumPy (.npz) par export du roster, et des diffs vectorisés.
+
+    <dir>/<AAAAMMJJTHHMMSS.mmm>.npz   (millisecondes: deux exports dans la même seconde ne s'écrasent pas)
+        player_id  int64   id balldontlie (extId), trié: les instantanés s'alignent par recherche dichotomique
+        overall    int16   note brute de la source (-1 = absente)
+        potential  int16
+        age        int16   (-1 = inconnu)
+        team       int16   indice dans `teams` (-1 = sans équipe)
+        teams      str     noms d'équipe de l'instantané
+        names      str     "Prénom Nom"
+        taken_at   float64 horodatage (s)
+
+Comparer deux instantanés ne relit que quelques tableaux compressés (quelques ms, quel que soit
+le nombre d'instantanés conservés), au lieu de re-parser deux JSON.
+
+    python ratings_history.py build/ratings_history                 # plus gros écarts entre les deux derniers
+    python ratings_history.py build/ratings_history --teams --gaps
+"""
+import os, time, argparse
+import numpy as np
+
+MISSING = -1
+
+
+def _int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return MISSING
+
+
+class Snapshot:
+    def __init__(self, columns: dict, path: str | None = None):
+        self.path = path
+        self.player_id = columns["player_id"]
+        self.overall = columns["overall"]
+        self.potential = columns["potential"]
+        self.age = columns["age"]
+        self.team = columns["team"]
+        self.teams = columns["teams"]
+        self.names = columns["names"]
+        self.taken_at = float(columns["taken_at"])
+
+    def __len__(self):
+        return len(self.player_id)
+
+    @property
+    def label(self) -> str:
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(self.taken_at))
+
+    def column(self, name: str) -> np.ndarray:
+        return getattr(self, name)
+
+    def team_names(self) -> np.ndarray:
+        """Nom d'équipe de chaque joueur ('' sans équipe)."""
+        names = np.append(self.teams, "")
+        return names[self.team]
+
+
+def snapshot_from_records(players, taken_at: float | None = None) -> Snapshot:
+    """
+    Joueurs au schéma prenom/nom (fichiers de fusion, RosterStore.master_records) -> instantané.
+    Les joueurs sans id numérique ne peuvent pas être suivis d'un instantané à l'autre et sont ignorés.
+    """
+    rows, teams = [], {}
+    for p in players:
+        pid = _int(p.get("extId"))
+        if pid == MISSING:
+            continue
+        team = p.get("team") or {}
+        team_name = team.get("team_name") or team.get("full_name")
+        team_idx = MISSING if team_name is None else teams.setdefault(team_name, len(teams))
+        rows.append((pid, _int(p.get("overall")), _int(p.get("potential")), _int(p.get("age")), team_idx,
+                     f"{p.get('prenom', '')} {p.get('nom', '')}".strip()))
+    rows.sort(key=lambda r: r[0])
+    return Snapshot({
+        "player_id": np.array([r[0] for r in rows], dtype=np.int64),
+        "overall": np.array([r[1] for r in rows], dtype=np.int16),
+        "potential": np.array([r[2] for r in rows], dtype=np.int16),
+        "age": np.array([r[3] for r in rows], dtype=np.int16),
+        "team": np.array([r[4] for r in rows], dtype=np.int16),
+        "teams": np.array(list(teams), dtype=str),
+        "names": np.array([r[5] for r in rows], dtype=str),
+        "taken_at": np.float64(time.time() if taken_at is None else taken_at),
+    })
+
+
+def save_snapshot(directory: str, players, taken_at: float | None = None) -> str:
+    """Écrit l'instantané des joueurs dans `directory`; renvoie son chemin. Un instantané existant n'est jamais remplacé."""
+    snap = snapshot_from_records(players, taken_at)
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(snap.taken_at)) + f".{int(snap.taken_at % 1 * 1000):03d}"
+    path = os.path.join(directory, stamp + ".npz")
+    if os.path.exists(path):
+        raise FileExistsError(f"{path}: un instantané porte déjà cette date")
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, player_id=snap.player_id, overall=snap.overall, potential=snap.potential,
+                            age=snap.age, team=snap.team, teams=snap.teams, names=snap.names,
+                            taken_at=np.float64(snap.taken_at))
+    os.replace(tmp, path)
+    return path
+
+
+def load_snapshot(path: str) -> Snapshot:
+    with np.load(path) as data:
+        return Snapshot({k: data[k] for k in data.files}, path)
+
+
+def list_snapshots(directory: str) -> list[str]:
+    """Chemins des instantanés, du plus ancien au plus récent."""
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, f) for f in sorted(os.listdir(directory)) if f.endswith(".npz")]
+
+
+# --- Diffs et agrégats (vectorisés) ---
+
+def diff(old: Snapshot, new: Snapshot, column: str = "overall") -> dict:
+    """
+    Écart de `column` pour les joueurs présents dans les deux instantanés et notés des deux côtés,
+    plus les ids arrivés et partis. Tableaux alignés: player_id, names, old, new, delta.
+    """
+    common, i, j = np.intersect1d(old.player_id, new.player_id, assume_unique=True, return_indices=True)
+    a, b = old.column(column)[i], new.column(column)[j]
+    rated = (a != MISSING) & (b != MISSING)
+    return {
+        "player_id": common[rated],
+        "names": new.names[j][rated],
+        "old": a[rated],
+        "new": b[rated],
+        "delta": (b[rated].astype(np.int32) - a[rated]),
+        "added": np.setdiff1d(new.player_id, old.player_id, assume_unique=True),
+        "removed": np.setdiff1d(old.player_id, new.player_id, assume_unique=True),
+    }
+
+
+def movers(old: Snapshot, new: Snapshot, n: int = 10, column: str = "overall") -> tuple[list, list]:
+    """Les n plus fortes hausses et baisses: listes de (nom, ancienne, nouvelle, écart)."""
+    d = diff(old, new, column)
+    order = np.argsort(d["delta"], kind="stable")
+
+    def rows(idx):
+        return [(str(d["names"][k]), int(d["old"][k]), int(d["new"][k]), int(d["delta"][k])) for k in idx]
+
+    ups = [k for k in order[::-1][:n] if d["delta"][k] > 0]
+    downs = [k for k in order[:n] if d["delta"][k] < 0]
+    return rows(ups), rows(downs)
+
+
+def team_means(snapshots: list[Snapshot], column: str = "overall") -> tuple[list[str], np.ndarray]:
+    """
+    Moyenne de `column` par équipe et par instantané: (équipes triées, matrice [instantanés x équipes]),
+    NaN quand une équipe n'a aucun joueur noté dans un instantané.
+    """
+    vocab = sorted({str(t) for s in snapshots for t in s.teams})
+    index = {t: k for k, t in enumerate(vocab)}
+    out = np.full((len(snapshots), len(vocab)), np.nan)
+    for row, s in enumerate(snapshots):
+        values = s.column(column)
+        keep = (s.team != MISSING) & (values != MISSING)
+        remap = np.array([index[str(t)] for t in s.teams], dtype=np.int64)
+        teams = remap[s.team[keep]]
+        sums = np.bincount(teams, weights=values[keep], minlength=len(vocab))
+        counts = np.bincount(teams, minlength=len(vocab))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[row] = np.where(counts > 0, sums / counts, np.nan)
+    return vocab, out
+
+
+def potential_gaps(snap: Snapshot, n: int = 10, max_age: int | None = None) -> list[tuple]:
+    """Les n plus grands écarts potentiel - overall (joueurs notés; `max_age` pour ne garder que les jeunes)."""
+    keep = (snap.overall != MISSING) & (snap.potential != MISSING)
+    if max_age is not None:
+        keep &= (snap.age != MISSING) & (snap.age <= max_age)
+    idx = np.flatnonzero(keep)
+    gaps = snap.potential[idx].astype(np.int32) - snap.overall[idx]
+    top = idx[np.argsort(-gaps, kind="stable")[:n]]
+    return [(str(snap.names[k]), int(snap.overall[k]), int(snap.potential[k]), int(snap.potential[k] - snap.overall[k]))
+            for k in top]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("directory", help="Dossier des instantanés (ex: build/ratings_history)")
+    ap.add_argument("--old", type=str, default=None, help="Instantané de départ (défaut: l'avant-dernier)")
+    ap.add_argument("--new", type=str, default=None, help="Instantané d'arrivée (défaut: le dernier)")
+    ap.add_argument("--top", type=int, default=10, help="Nombre de lignes par tableau")
+    ap.add_argument("--column", choices=["overall", "potential"], default="overall")
+    ap.add_argument("--teams", action="store_true", help="Moyenne par équipe sur tous les instantanés")
+    ap.add_argument("--gaps", action="store_true", help="Plus grands écarts potentiel - overall (dernier instantané)")
+    ap.add_argument("--max-age", type=int, default=None, help="Avec --gaps: âge maximum")
+    args = ap.parse_args()
+
+    paths = list_snapshots(args.directory)
+    if not paths:
+        ap.error(f"aucun instantané dans {args.directory}")
+    new = load_snapshot(args.new or paths[-1])
+    old = load_snapshot(args.old) if args.old else (load_snapshot(paths[-2]) if len(paths) > 1 else None)
+
+    if old is not None:
+        started = time.perf_counter()
+        ups, downs = movers(old, new, args.top, args.column)
+        d = diff(old, new, args.column)
+        print(f"{args.column}: {old.label} -> {new.label}, {len(d['delta'])} joueurs comparés, "
+              f"{int(np.count_nonzero(d['delta']))} changements, +{len(d['added'])} / -{len(d['removed'])} joueurs "
+              f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+        for title, rows in (("Hausses", ups), ("Baisses", downs)):
+            print(f"\n{title}:")
+            for name, a, b, delta in rows:
+                print(f"  {name:<28} {a:>3} -> {b:<3} ({delta:+d})")
+    else:
+        print(f"Un seul instantané ({new.label}): rien à comparer.")
+
+    if args.teams:
+        snaps = [load_snapshot(p) for p in paths]
+        vocab, means = team_means(snaps, args.column)
+        print(f"\nMoyenne {args.column} par équipe ({len(snaps)} instantanés, premier -> dernier):")
+        for k in np.argsort(-np.nan_to_num(means[-1], nan=-1.0)):
+            print(f"  {vocab[k]:<28} {means[0, k]:>5.1f} -> {means[-1, k]:>5.1f}")
+
+    if args.gaps:
+        print(f"\nPlus grands écarts potentiel - overall ({new.label}):")
+        for name, ov, pot, gap in potential_gaps(new, args.top, args.max_age):
+            print(f"  {name:<28} {ov:>3} -> {pot:<3} (+{gap})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Lecture et écriture d'enregistrements JSON en flux, sans charger un fichier entier en mémoire.
+
+iter_records: générateur sur un tableau JSON ou un fichier JSON Lines (format détecté au premier
+caractère). Le tableau est lu par blocs et décodé objet par objet (JSONDecoder.raw_decode).
+RecordWriter: écrit les enregistrements un à un dans un fichier temporaire, renommé à la fin
+(os.replace); en cas d'exception le fichier de destination n'est pas touché.
+
+    with RecordWriter("out.json", compact=True) as out:
+        out.write_all(transforme(iter_records("in.json")))
+
+La mémoire reste bornée par le plus gros enregistrement, quelle que soit la taille du fichier.
+"""
+import os, json
+
+CHUNK_SIZE = 1 << 16
+_DECODER = json.JSONDecoder()
+_WS = " \t\r\n"
+
+
+def detect_format(path: str) -> str:
+    """'json' si le fichier commence par '[' (tableau), 'jsonl' sinon."""
+    with open(path, encoding="utf-8-sig") as f:
+        while True:
+            c = f.read(1)
+            if not c:
+                return "jsonl"
+            if c not in _WS:
+                return "json" if c == "[" else "jsonl"
+
+
+def _iter_array(f, chunk_size: int):
+    buf, pos, eof = "", 0, False
+
+    def refill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            refill()
+
+    refill()
+    skip_ws()
+    if buf[pos:pos + 1] != "[":
+        raise ValueError(f"tableau JSON attendu, trouvé {buf[pos:pos + 20]!r}")
+    pos += 1
+    first = True
+    while True:
+        skip_ws()
+        if pos >= len(buf):
+            raise ValueError("fin de fichier avant la fin du tableau JSON")
+        if buf[pos] == "]":
+            return
+        if not first:
+            if buf[pos] != ",":
+                raise ValueError(f"',' attendue entre deux enregistrements, trouvé {buf[pos:pos + 20]!r}")
+            pos += 1
+            skip_ws()
+        while True:
+            try:
+                record, end = _DECODER.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                refill()            # enregistrement coupé par la fin du bloc
+                continue
+            if end == len(buf) and not eof:
+                refill()            # un nombre nu pourrait continuer dans le bloc suivant
+                continue
+            break
+        pos = end
+        first = False
+        yield record
+
+
+def iter_records(path: str, chunk_size: int = CHUNK_SIZE):
+    """Enregistrements d'un tableau JSON ou d'un fichier JSON Lines, un par un."""
+    fmt = detect_format(path)
+    with open(path, encoding="utf-8-sig") as f:
+        if fmt == "json":
+            yield from _iter_array(f, chunk_size)
+            return
+        for n, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{n}: ligne JSON invalide ({e})") from e
+
+
+class RecordWriter:
+    """
+    fmt: 'json' (tableau) ou 'jsonl'; par défaut selon l'extension du fichier.
+    Tableau: indent=2 donne exactement la sortie de json.dump(..., indent=2);
+    compact=True écrit un enregistrement par ligne, sans espaces (environ 2x plus petit).
+    """
+
+    def __init__(self, path: str, fmt: str | None = None, indent: int | None = 2, compact: bool = False):
+        self.path = path
+        self.fmt = fmt or ("jsonl" if path.endswith(".jsonl") else "json")
+        self.indent = None if compact or self.fmt == "jsonl" else indent
+        self.count = 0
+        self._tmp = f"{path}.tmp"
+        self._f = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._f = open(self._tmp, "w", encoding="utf-8")
+        return self
+
+    def _dumps(self, record) -> str:
+        if self.indent is None:
+            return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        text = json.dumps(record, ensure_ascii=False, indent=self.indent)
+        pad = " " * self.indent
+        return pad + text.replace("\n", "\n" + pad)
+
+    def write(self, record):
+        text = self._dumps(record)
+        if self.fmt == "jsonl":
+            self._f.write(text + "\n")
+        else:
+            self._f.write(("[\n" if self.count == 0 else ",\n") + text)
+        self.count += 1
+
+    def write_all(self, records) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None and self.fmt == "json":
+                self._f.write("\n]" if self.count else "[]")
+        finally:
+            self._f.close()
+        if exc_type is None:
+            os.replace(self._tmp, self.path)
+        else:
+            os.remove(self._tmp)
+        return False
+
+
+def write_records(path: str, records, fmt: str | None = None, indent: int | None = 2, compact: bool = False) -> int:
+    """Écrit un itérable d'enregistrements (liste ou générateur); renvoie leur nombre."""
+    with RecordWriter(path, fmt, indent, compact) as out:
+        return out.write_all(records)
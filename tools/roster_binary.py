@@ -0,0 +1,198 @@
+"""
+Roster binaire en colonnes, émis à côté de nba_database_final.json (même contenu, ~6x plus petit que le JSON indenté).
+
+Disposition (petit-boutiste, chaque bloc aligné sur 4 octets):
+
+    en-tête      "<4sHHII"   magic b"NBAR", version, drapeaux, nb joueurs, nb chaînes
+    répertoire   nb colonnes (u16) puis, par colonne, "<12sc3xI": nom, code de type (array), offset
+    chaînes      offsets u32[nb chaînes + 1] puis les octets UTF-8 concaténés
+    colonnes     un tableau de largeur fixe par champ, nb joueurs éléments chacun
+
+Les textes (nom, slug, pays, équipe, conférence, postes) sont des indices u32 dans la table de chaînes
+internées (0xFFFFFFFF = absent).
+Les notes sont déjà bornées comme dans NbaRepository.loadPlayers (drapeau FLAG_CLAMPED): le chargement
+copie chaque colonne d'un bloc (array.frombytes), sans décoder champ par champ.
+height_ft et weight_kg sont recalculés à partir de height_cm et weight_lb, comme le fait build_roster.
+"""
+import os, sys, struct
+from array import array
+
+MAGIC = b"NBAR"
+VERSION = 2
+FLAG_CLAMPED = 1
+NULL_STR = 0xFFFFFFFF
+HEADER = struct.Struct("<4sHHII")
+COLUMN_ENTRY = struct.Struct("<12sc3xI")
+
+# (nom, code array): u32 d'abord, puis u16, puis u8 -> alignement naturel de chaque colonne
+COLUMNS = [
+    ("id", "I"),
+    ("name", "I"), ("slug", "I"), ("country", "I"), ("team", "I"), ("conf", "I"), ("pos1", "I"), ("pos2", "I"),
+    ("team_id", "h"), ("height", "H"), ("weight", "H"),
+    ("age", "B"), ("overall", "B"), ("potential", "B"),
+]
+STRING_COLUMNS = ("name", "slug", "country", "team", "conf", "pos1", "pos2")
+DEFAULT_AGE = 26        # âge supposé par l'app quand il manque
+
+
+def clamp_ratings(overall, potential, age) -> tuple[int, int]:
+    """Mêmes règles que NbaRepository.loadPlayers (lib/data/nba_repository.dart)."""
+    def clamp(v, lo, hi, default):
+        return default if v is None else min(max(int(v), lo), hi)
+
+    ov = clamp(overall, 60, 99, 78)
+    pot = clamp(potential, ov, 99, ov + 4)
+    age = DEFAULT_AGE if age is None else int(age)
+    if age >= 36:
+        pot = min(max(pot, ov), ov + 1)
+    elif age >= 33:
+        pot = min(max(pot, ov), 85)
+    return ov, pot
+
+
+def _pad4(n: int) -> int:
+    return -n % 4
+
+
+def _column_bytes(code: str, values: list) -> bytes:
+    col = array(code, values)
+    if sys.byteorder == "big":
+        col.byteswap()
+    return col.tobytes()
+
+
+def encode_roster(records: list[dict]) -> bytes:
+    """Enregistrements au schéma de l'app (voir build_roster.to_app_record) -> octets du fichier."""
+    strings: dict[str, int] = {}
+
+    def intern(s):
+        if s is None:
+            return NULL_STR
+        if s not in strings:
+            strings[s] = len(strings)
+        return strings[s]
+
+    cols: dict[str, list] = {name: [] for name, _ in COLUMNS}
+    for r in records:
+        bio, team, ratings = r.get("bio") or {}, r.get("team") or {}, r.get("ratings") or {}
+        ov, pot = clamp_ratings(ratings.get("overall"), ratings.get("potential"), bio.get("age"))
+        cols["id"].append(int(r["player_id"]))
+        for name, value in zip(STRING_COLUMNS, (r.get("full_name"), r.get("slug"), bio.get("country"),
+                                                team.get("team_name"), team.get("conference"),
+                                                r.get("position_primary"), r.get("position_secondary"))):
+            cols[name].append(intern(value))
+        cols["team_id"].append(-1 if team.get("team_id") is None else int(team["team_id"]))
+        cols["height"].append(0 if bio.get("height_m") is None else round(bio["height_m"] * 100))
+        cols["weight"].append(bio.get("weight_lb") or 0)
+        cols["age"].append(bio.get("age") or 0)
+        cols["overall"].append(ov)
+        cols["potential"].append(pot)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+    blob = b"".join(encoded)
+    string_table = _column_bytes("I", offsets) + blob + b"\0" * _pad4(len(blob))
+
+    body, directory = [], []
+    pos = HEADER.size + 2 + len(COLUMNS) * COLUMN_ENTRY.size
+    pos += _pad4(pos)
+    string_offset = pos
+    pos += len(string_table)
+    for name, code in COLUMNS:
+        data = _column_bytes(code, cols[name])
+        directory.append(COLUMN_ENTRY.pack(name.encode("ascii"), code.encode("ascii"), pos))
+        body.append(data + b"\0" * _pad4(len(data)))
+        pos += len(body[-1])
+
+    head = HEADER.pack(MAGIC, VERSION, FLAG_CLAMPED, len(records), len(strings))
+    head += struct.pack("<H", len(COLUMNS)) + b"".join(directory)
+    head += b"\0" * (string_offset - len(head))
+    return head + string_table + b"".join(body)
+
+
+def write_roster(path: str, records) -> int:
+    """Écrit le roster binaire; renvoie le nombre de joueurs."""
+    records = list(records)
+    data = encode_roster(records)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(records)
+
+
+class Roster:
+    """Roster binaire décodé en colonnes: `columns[nom]` est un array (copie), `strings` la table internée."""
+
+    def __init__(self, data: bytes):
+        magic, version, self.flags, self.count, n_strings = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("pas un roster binaire (magic invalide)")
+        if version != VERSION:
+            raise ValueError(f"version de roster non supportée: {version} (attendue {VERSION})")
+        view = memoryview(data)
+        (n_columns,) = struct.unpack_from("<H", data, HEADER.size)
+        entries = [COLUMN_ENTRY.unpack_from(data, HEADER.size + 2 + i * COLUMN_ENTRY.size) for i in range(n_columns)]
+
+        pos = HEADER.size + 2 + n_columns * COLUMN_ENTRY.size
+        pos += _pad4(pos)
+        offsets = self._array("I", view[pos:pos + 4 * (n_strings + 1)])
+        blob = bytes(view[pos + 4 * (n_strings + 1):pos + 4 * (n_strings + 1) + offsets[-1]])
+        self.strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n_strings)]
+
+        self.columns: dict[str, array] = {}
+        for raw_name, raw_code, offset in entries:
+            code = raw_code.decode("ascii")
+            size = array(code).itemsize * self.count
+            self.columns[raw_name.rstrip(b"\0").decode("ascii")] = self._array(code, view[offset:offset + size])
+
+    @staticmethod
+    def _array(code: str, buf) -> array:
+        col = array(code)
+        col.frombytes(buf)
+        if sys.byteorder == "big":
+            col.byteswap()
+        return col
+
+    def __len__(self):
+        return self.count
+
+    def string(self, index: int) -> str | None:
+        return None if index == NULL_STR else self.strings[index]
+
+    def record(self, i: int) -> dict:
+        """Joueur i au schéma de nba_database_final.json (notes bornées)."""
+        c = self.columns
+        height_cm, weight_lb, team_id = c["height"][i], c["weight"][i], c["team_id"][i]
+        return {
+            "player_id": c["id"][i],
+            "full_name": self.string(c["name"][i]),
+            "slug": self.string(c["slug"][i]),
+            "bio": {
+                "age": c["age"][i] or None,
+                "country": self.string(c["country"][i]),
+                "height_m": height_cm / 100 if height_cm else None,
+                "height_ft": round(height_cm / 100 / 0.3048, 2) if height_cm else None,
+                "weight_kg": round(weight_lb * 0.45359237, 1) if weight_lb else None,
+                "weight_lb": weight_lb or None,
+            },
+            "team": {
+                "team_id": None if team_id < 0 else team_id,
+                "team_name": self.string(c["team"][i]),
+                "conference": self.string(c["conf"][i]),
+            },
+            "position_primary": self.string(c["pos1"][i]),
+            "position_secondary": self.string(c["pos2"][i]),
+            "ratings": {"overall": c["overall"][i], "potential": c["potential"][i]},
+        }
+
+    def iter_records(self):
+        for i in range(self.count):
+            yield self.record(i)
+
+
+def read_roster(path: str) -> Roster:
+    with open(path, "rb") as f:
+        return Roster(f.read())
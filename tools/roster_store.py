@@ -0,0 +1,304 @@
+"""
+Roster local indexé (SQLite): joueurs, équipe de chaque joueur dans le temps, notes relevées par source.
+
+    players            un joueur par player_id (extId balldontlie), nom normalisé indexé, actif ou non,
+                       âge daté (age_as_of) pour pouvoir le vieillir
+    team_membership    passages en équipe: [since, until), until NULL = équipe actuelle
+    ratings_snapshots  (player_id, source, taken_at) -> overall, potential; une ligne par changement de note
+    ratings_seen       (player_id, source) -> dernier relevé où la source a encore donné une note au joueur
+    rating_runs        source -> date de son dernier relevé (export_app n'exporte que les notes vues à ce relevé)
+
+Le build alimente la base étape par étape (enrich: joueurs et équipes; apply_hoopshype et
+merge_2kratings: notes de chaque source) puis export_app la relit en une requête au lieu de
+dépendre de la chaîne de fichiers réécrits. Chaque écriture groupée tient dans une transaction.
+
+    python roster_store.py build/roster.db --team BOS
+    python roster_store.py build/roster.db --history "Luka Doncic"
+"""
+import os, sqlite3, time, argparse
+
+from name_normalization import normalize_name
+from player_matching import player_key
+
+SCHEMA_VERSION = 3
+# ordre de priorité des sources pour les notes exportées: même résultat que la chaîne de fusions
+# (2kratings écrase overall et potential, hoopshype ne donne que overall)
+RATING_SOURCES = ("2kratings", "hoopshype")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id       TEXT PRIMARY KEY,
+    first_name      TEXT NOT NULL,
+    last_name       TEXT NOT NULL,
+    norm_name       TEXT NOT NULL,
+    position        TEXT,
+    position_detail TEXT,
+    age             INTEGER,
+    age_as_of       TEXT,
+    height          TEXT,
+    weight          TEXT,
+    country         TEXT,
+    active          INTEGER NOT NULL DEFAULT 1,
+    updated_at      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS players_norm_name ON players(norm_name);
+
+CREATE TABLE IF NOT EXISTS team_membership (
+    player_id    TEXT NOT NULL REFERENCES players(player_id),
+    team_id      INTEGER,
+    team_name    TEXT,
+    abbreviation TEXT,
+    conference   TEXT,
+    since        REAL NOT NULL,
+    until        REAL
+);
+CREATE INDEX IF NOT EXISTS team_membership_player ON team_membership(player_id, since);
+CREATE INDEX IF NOT EXISTS team_membership_current ON team_membership(team_id) WHERE until IS NULL;
+
+CREATE TABLE IF NOT EXISTS ratings_snapshots (
+    player_id TEXT NOT NULL REFERENCES players(player_id),
+    source    TEXT NOT NULL,
+    taken_at  REAL NOT NULL,
+    overall   INTEGER,
+    potential INTEGER,
+    PRIMARY KEY (player_id, source, taken_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ratings_seen (
+    player_id TEXT NOT NULL REFERENCES players(player_id),
+    source    TEXT NOT NULL,
+    seen_at   REAL NOT NULL,
+    PRIMARY KEY (player_id, source)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rating_runs (
+    source   TEXT PRIMARY KEY,
+    taken_at REAL NOT NULL
+);
+"""
+
+# base en version 1 ou 2: âges non datés
+MIGRATE_V2 = "ALTER TABLE players ADD COLUMN age_as_of TEXT;"
+
+# base en version 1: la dernière note de chaque joueur est considérée comme vue au dernier relevé de sa source
+MIGRATE_V1 = """
+INSERT OR IGNORE INTO rating_runs SELECT source, MAX(taken_at) FROM ratings_snapshots GROUP BY source;
+INSERT OR IGNORE INTO ratings_seen
+SELECT DISTINCT r.player_id, r.source, u.taken_at FROM ratings_snapshots r JOIN rating_runs u ON u.source = r.source;
+"""
+
+UPSERT_PLAYER = """
+INSERT INTO players (player_id, first_name, last_name, norm_name, position, position_detail,
+                     age, age_as_of, height, weight, country, active, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+ON CONFLICT(player_id) DO UPDATE SET
+    first_name = excluded.first_name, last_name = excluded.last_name, norm_name = excluded.norm_name,
+    position = excluded.position, position_detail = excluded.position_detail, age = excluded.age,
+    age_as_of = excluded.age_as_of,
+    height = excluded.height, weight = excluded.weight, country = excluded.country,
+    active = 1, updated_at = excluded.updated_at
+"""
+
+LATEST_RATINGS = """
+SELECT r.player_id, r.source, r.taken_at, r.overall, r.potential
+FROM ratings_snapshots r
+JOIN (SELECT player_id, source, MAX(taken_at) AS taken_at FROM ratings_snapshots GROUP BY player_id, source) l
+  ON l.player_id = r.player_id AND l.source = r.source AND l.taken_at = r.taken_at
+"""
+
+# dernière note des seuls joueurs que la source a encore relevés à son dernier passage
+CURRENT_RATINGS = LATEST_RATINGS + """
+JOIN ratings_seen s ON s.player_id = r.player_id AND s.source = r.source
+JOIN rating_runs u ON u.source = r.source AND u.taken_at = s.seen_at
+"""
+
+CURRENT_PLAYERS = """
+SELECT p.*, m.team_id, m.team_name, m.abbreviation, m.conference
+FROM players p
+LEFT JOIN team_membership m ON m.player_id = p.player_id AND m.until IS NULL
+"""
+
+
+def _team_of(record: dict) -> tuple:
+    """(team_id, team_name, abbreviation, conference) d'un joueur au schéma prenom/nom (voir build_roster)."""
+    team = record.get("team") or {}
+    return (team.get("team_id", team.get("id")), team.get("team_name") or team.get("full_name"),
+            team.get("abbreviation"), team.get("conference"))
+
+
+class RosterStore:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"{path}: schéma version {version}, ce script ne connaît que la {SCHEMA_VERSION}")
+        if version in (1, 2):
+            self.conn.executescript(MIGRATE_V2)
+        self.conn.executescript(SCHEMA)
+        if version == 1:
+            self.conn.executescript(MIGRATE_V1)
+        if version != SCHEMA_VERSION:
+            # pas d'écriture à chaque ouverture: le fichier reste identique (hash d'entrée d'export_app)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Écritures groupées (une transaction chacune) ---
+
+    def sync_players(self, records, taken_at: float | None = None) -> int:
+        """
+        Remplace le roster actif par `records` (schéma prenom/nom): upsert des joueurs, les absents
+        passent inactifs; un changement d'équipe ferme l'appartenance en cours et en ouvre une nouvelle.
+        """
+        now = time.time() if taken_at is None else taken_at
+        with self.conn:
+            current = {row["player_id"]: (row["team_id"], row["team_name"], row["abbreviation"], row["conference"])
+                       for row in self.conn.execute("SELECT * FROM team_membership WHERE until IS NULL")}
+            players, teams = {}, {}
+            for p in records:
+                pid = player_key(p)
+                first, last = p.get("prenom") or "", p.get("nom") or ""
+                players[pid] = (pid, first, last, normalize_name(f"{first} {last}"), p.get("position"),
+                                p.get("position_detail"), p.get("age"), p.get("age_as_of"), p.get("height"),
+                                None if p.get("weight") is None else str(p.get("weight")), p.get("country"), now)
+                teams[pid] = _team_of(p)
+            self.conn.executemany(UPSERT_PLAYER, players.values())
+            self.conn.execute("UPDATE players SET active = 0 WHERE updated_at < ?", (now,))
+
+            # appartenances closes: équipe changée ou joueur sorti du roster; ouvertes: nouvelle équipe connue
+            closed = [(now, pid) for pid, team in current.items() if teams.get(pid) != team]
+            opened = [(pid, *team, now) for pid, team in teams.items()
+                      if current.get(pid) != team and any(v is not None for v in team)]
+            self.conn.executemany("UPDATE team_membership SET until = ? WHERE player_id = ? AND until IS NULL", closed)
+            self.conn.executemany(
+                "INSERT INTO team_membership (player_id, team_id, team_name, abbreviation, conference, since) "
+                "VALUES (?, ?, ?, ?, ?, ?)", opened)
+        return len(players)
+
+    def add_ratings(self, source: str, rows, taken_at: float | None = None) -> int:
+        """
+        Relevé de notes d'une source: `rows` = (player_id, overall, potential). Une ligne n'est ajoutée que si la
+        note diffère du dernier relevé de la même source; les joueurs inconnus sont ignorés. Renvoie le nombre ajouté.
+        Le relevé devient le dernier de la source: les joueurs absents de `rows` n'ont plus de note exportée.
+        """
+        now = time.time() if taken_at is None else taken_at
+        with self.conn:
+            known = {row[0] for row in self.conn.execute("SELECT player_id FROM players")}
+            latest = {row["player_id"]: (row["overall"], row["potential"])
+                      for row in self.conn.execute(LATEST_RATINGS + " WHERE r.source = ?", (source,))}
+            fresh, seen = {}, {}
+            for pid, overall, potential in rows:
+                pid = str(pid)
+                if pid not in known:
+                    continue
+                seen[pid] = (pid, source, now)
+                if latest.get(pid) != (overall, potential):
+                    fresh[pid] = (pid, source, now, overall, potential)
+            self.conn.executemany("INSERT OR REPLACE INTO ratings_snapshots VALUES (?, ?, ?, ?, ?)", fresh.values())
+            self.conn.executemany("INSERT OR REPLACE INTO ratings_seen VALUES (?, ?, ?)", seen.values())
+            self.conn.execute("INSERT OR REPLACE INTO rating_runs VALUES (?, ?)", (source, now))
+        return len(fresh)
+
+    # --- Requêtes ---
+
+    def player(self, player_id) -> dict | None:
+        row = self.conn.execute(CURRENT_PLAYERS + " WHERE p.player_id = ?", (str(player_id),)).fetchone()
+        return dict(row) if row else None
+
+    def find(self, name: str) -> list[dict]:
+        """Joueurs dont le nom normalisé est celui de `name` (Dončić == Doncic, suffixes ignorés)."""
+        return [dict(r) for r in self.conn.execute(CURRENT_PLAYERS + " WHERE p.norm_name = ?", (normalize_name(name),))]
+
+    def team(self, team) -> list[dict]:
+        """Joueurs actifs actuellement dans l'équipe `team` (id, abréviation ou nom complet)."""
+        if isinstance(team, int) or str(team).isdigit():
+            where, args = "m.team_id = ?", (int(team),)
+        else:
+            where, args = "(m.abbreviation = ? OR m.team_name = ?)", (team, team)
+        sql = CURRENT_PLAYERS + f" WHERE p.active = 1 AND {where} ORDER BY p.last_name, p.first_name"
+        return [dict(r) for r in self.conn.execute(sql, args)]
+
+    def rating_history(self, player_id, source: str | None = None) -> list[dict]:
+        sql = "SELECT source, taken_at, overall, potential FROM ratings_snapshots WHERE player_id = ?"
+        args = [str(player_id)]
+        if source:
+            sql += " AND source = ?"
+            args.append(source)
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY taken_at, source", args)]
+
+    def team_history(self, player_id) -> list[dict]:
+        return [dict(r) for r in self.conn.execute(
+            "SELECT team_id, team_name, abbreviation, conference, since, until FROM team_membership "
+            "WHERE player_id = ? ORDER BY since", (str(player_id),))]
+
+    def master_records(self) -> list[dict]:
+        """
+        Joueurs actifs au schéma prenom/nom des fichiers de fusion, avec la note du dernier relevé de chaque
+        source (2kratings d'abord, sinon hoopshype), triés par nom puis prénom comme l'export historique.
+        Un joueur que la source n'a plus relevé n'en garde pas une note périmée.
+        """
+        latest: dict[str, dict] = {}
+        for row in self.conn.execute(CURRENT_RATINGS):
+            latest.setdefault(row["player_id"], {})[row["source"]] = (row["overall"], row["potential"])
+        out = []
+        for r in self.conn.execute(CURRENT_PLAYERS + " WHERE p.active = 1"):
+            ratings = latest.get(r["player_id"], {})
+            source = next((s for s in RATING_SOURCES if s in ratings), None)
+            overall, potential = ratings[source] if source else (None, None)
+            out.append({
+                "extId": r["player_id"], "prenom": r["first_name"], "nom": r["last_name"],
+                "position": r["position"], "position_detail": r["position_detail"] or "", "age": r["age"],
+                "age_as_of": r["age_as_of"],
+                "height": r["height"], "weight": r["weight"], "country": r["country"],
+                "team": {"id": r["team_id"], "full_name": r["team_name"], "abbreviation": r["abbreviation"],
+                         "conference": r["conference"]} if r["team_id"] is not None or r["team_name"] else {},
+                "overall": overall, "potential": potential,
+            })
+        out.sort(key=lambda p: (p["nom"].lower(), p["prenom"].lower()))
+        return out
+
+    def counts(self) -> dict:
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("players", "team_membership", "ratings_snapshots")}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("db", help="Fichier SQLite du roster (ex: build/roster.db)")
+    ap.add_argument("--team", type=str, default=None, help="Joueurs d'une équipe (id, abréviation ou nom)")
+    ap.add_argument("--history", type=str, default=None, help="Historique des notes et équipes d'un joueur (id ou nom)")
+    args = ap.parse_args()
+
+    with RosterStore(args.db) as store:
+        if args.team:
+            for p in store.team(args.team):
+                print(f"{p['player_id']:>8}  {p['first_name']} {p['last_name']} ({p['position'] or '?'})")
+        if args.history:
+            players = [store.player(args.history)] if args.history.isdigit() else store.find(args.history)
+            for p in filter(None, players):
+                print(f"{p['first_name']} {p['last_name']} ({p['player_id']})")
+                for t in store.team_history(p["player_id"]):
+                    until = time.strftime("%Y-%m-%d", time.localtime(t["until"])) if t["until"] else "..."
+                    print(f"  {time.strftime('%Y-%m-%d', time.localtime(t['since']))} -> {until}  {t['team_name']}")
+                for s in store.rating_history(p["player_id"]):
+                    print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(s['taken_at']))}  {s['source']:<10} "
+                          f"overall={s['overall']} potential={s['potential']}")
+        if not (args.team or args.history):
+            print(", ".join(f"{k}={v}" for k, v in store.counts().items()))
+
+
+if __name__ == "__main__":
+    main()
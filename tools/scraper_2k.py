@@ -1,76 +1,215 @@
-import requests
-import json
-import time
-from bs4 import BeautifulSoup
-
-# URL de la page principale
-main_url = 'https://eu.hoopshype.com/nba-2k/players/'
-headers = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
-
-all_players_data = []
-
-try:
-    # --- ÉTAPE 1 : Récupérer les données de la Page 1 ET le Build ID ---
-    print("Récupération de la page 1 et du Build ID...")
-    response = requests.get(main_url, headers=headers)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    data_script = soup.find('script', {'id': '__NEXT_DATA__'})
-    json_data = json.loads(data_script.string)
-
-    # On extrait le Build ID, nécessaire pour appeler l'API
-    build_id = json_data['buildId']
-    print(f"Build ID trouvé : {build_id}")
-
-    # On extrait les joueurs de la première page en utilisant le chemin complet
-    initial_players = json_data['props']['pageProps']['dehydratedState']['queries'][3]['state']['data']['pages'][0]['videoGameRatings']['videoGameRatings']
-    for player in initial_players:
-        full_name = f"{player['fullPlayer']['firstName']} {player['fullPlayer']['lastName']}"
-        all_players_data.append({"nom": full_name, "note_generale": int(player['rating'])})
-    
-    print(f"{len(all_players_data)} joueurs de la page 1 ajoutés.")
-
-    # --- ÉTAPE 2 : Boucler sur les pages 2 à 24 en appelant l'API ---
-    for page_num in range(2, 25):
-        
-        # On construit l'URL de l'API pour les pages suivantes
-        api_url = f"https://eu.hoopshype.com/_next/data/{build_id}/nba-2k/players.json?page={page_num}"
-        
-        print(f"Récupération de la page {page_num} via l'API...")
-        response = requests.get(api_url, headers=headers)
-        
-        if response.status_code == 404:
-            print(f"Page {page_num} non trouvée. Fin du scraping.")
-            break
-            
-        response.raise_for_status()
-        
-        page_data = response.json()
-        
-        # --- CORRECTION FINALE ---
-        # On utilise le MÊME chemin complet pour les données de l'API que pour la page 1
-        players_list = page_data['pageProps']['dehydratedState']['queries'][3]['state']['data']['pages'][0]['videoGameRatings']['videoGameRatings']
-
-        if not players_list:
-            print(f"Aucun joueur sur la page {page_num}. Fin.")
-            break
-
-        for player in players_list:
-            # On utilise aussi la MÊME méthode pour extraire le nom
-            full_name = f"{player['fullPlayer']['firstName']} {player['fullPlayer']['lastName']}"
-            all_players_data.append({"nom": full_name, "note_generale": int(player['rating'])})
-
-        print(f"{len(players_list)} joueurs de la page {page_num} ajoutés.")
-        time.sleep(1)
-
-    # --- ÉTAPE 3 : Sauvegarde finale ---
-    with open('nba_2k_ratings_ALL_PAGES.json', 'w', encoding='utf-8') as json_file:
-        json.dump(all_players_data, json_file, indent=4, ensure_ascii=False)
-
-    print(f"\n✅ Mission accomplie ! {len(all_players_data)} joueurs au total ont été sauvegardés dans 'nba_2k_ratings_ALL_PAGES.json'.")
-
-except Exception as e:
-    print(f"\n❌ Une erreur est survenue : {e}")
\ No newline at end of file
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from rate_control import RateController, host_of
+from http_cache import HttpCache, CacheMiss
+from record_io import write_records
+import metrics
+
+BASE_URL = 'https://eu.hoopshype.com'
+headers = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TransientError(Exception):
+    """Erreur passagère (5xx, 429, coupure réseau) qui mérite un nouvel essai."""
+
+    def __init__(self, message, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+def extract_players(page_props: dict) -> list[dict]:
+    """Même chemin complet pour la page 1 (HTML) et les pages suivantes (API)."""
+    ratings = page_props['dehydratedState']['queries'][3]['state']['data']['pages'][0]['videoGameRatings']['videoGameRatings']
+    return [
+        {"nom": f"{p['fullPlayer']['firstName']} {p['fullPlayer']['lastName']}", "note_generale": int(p['rating'])}
+        for p in ratings or []
+    ]
+
+
+def make_session(pool_size: int) -> requests.Session:
+    """Session keep-alive: les connexions TCP/TLS sont réutilisées entre les pages."""
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _get(session: requests.Session, url: str, extra_headers: dict | None = None):
+    """GET bloquant (exécuté dans un thread)."""
+    try:
+        return session.get(url, headers=extra_headers, timeout=30)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        raise TransientError(str(e))
+
+
+async def fetch_json(session, url: str, rate: RateController, cache: HttpCache | None = None,
+                     retries: int = 4, base_delay: float = 0.5) -> dict | None:
+    """
+    GET sous contrôle de débit, avec nouvel essai sur erreur passagère. None si la page n'existe pas (404).
+    Les 429 mettent l'hôte en pause dans le contrôleur; les autres erreurs attendent un backoff à jitter complet.
+    Avec un cache, une page inchangée est revalidée (304) au lieu d'être re-téléchargée.
+    """
+    r = cache.lookup_fresh(url) if cache else None
+    attempt = 0
+    while r is None:
+        await rate.wait_async(url)
+        started = time.monotonic()
+        try:
+            extra = cache.conditional_headers(url) if cache else {}
+            r = await asyncio.to_thread(_get, session, url, extra)
+            rate.record(url, r.status_code, time.monotonic() - started, r.headers.get("Retry-After"))
+            metrics.inc("http_bytes_total", len(r.content), host=host_of(url))
+            if r.status_code in RETRY_STATUSES:
+                raise TransientError(f"HTTP {r.status_code}", r.status_code)
+            if cache:
+                r = cache.update(url, None, r)
+                if r is None:  # 304 sur une entrée évincée: nouvel essai, sans validateurs cette fois
+                    raise TransientError("304 sans entrée en cache", 304)
+        except TransientError as e:
+            r = None
+            if e.status is None:
+                rate.record(url, None)
+            if attempt == retries:
+                raise
+            print(f"  -> {e} sur {url}, nouvel essai")
+            metrics.inc("http_retries_total", host=host_of(url), reason=e.status or "network")
+            if e.status != 429:
+                delay = random.uniform(0, base_delay * 2 ** attempt)
+                metrics.inc("backoff_seconds_total", delay, host=host_of(url))
+                await asyncio.sleep(delay)
+            attempt += 1
+    if r.status_code == 404:
+        return None
+    r.raise_for_status()
+    return r.json()
+
+
+async def fetch_pages(session, build_id: str, rate: RateController, first_page: int = 2, last_page: int = 24,
+                      concurrency: int = 6, base_url: str = BASE_URL, cache: HttpCache | None = None) -> list[dict]:
+    """
+    Récupère les pages first_page..last_page en parallèle. Les workers prennent les numéros
+    dans l'ordre: dès qu'une page est en 404 ou vide, aucune page suivante n'est plus demandée.
+    """
+    pages = iter(range(first_page, last_page + 1))
+    stop_at = last_page + 1
+    results: dict[int, list[dict]] = {}
+
+    async def worker():
+        nonlocal stop_at
+        for page_num in pages:
+            if page_num >= stop_at:
+                return
+            api_url = f"{base_url}/_next/data/{build_id}/nba-2k/players.json?page={page_num}"
+            page_data = await fetch_json(session, api_url, rate, cache)
+            if page_data is None:
+                if page_num < stop_at:
+                    print(f"Page {page_num} non trouvée. Fin du scraping.")
+                stop_at = min(stop_at, page_num)
+                return
+            players_list = extract_players(page_data['pageProps'])
+            if not players_list:
+                if page_num < stop_at:
+                    print(f"Aucun joueur sur la page {page_num}. Fin.")
+                stop_at = min(stop_at, page_num)
+                return
+            results[page_num] = players_list
+            print(f"{len(players_list)} joueurs de la page {page_num} ajoutés.")
+            metrics.event("page", source="hoopshype", page=page_num, players=len(players_list))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    # les pages au-delà de la première page manquante sont ignorées
+    return [p for page_num in sorted(results) if page_num < stop_at for p in results[page_num]]
+
+
+def scrape_all(base_url: str = BASE_URL, last_page: int = 24, concurrency: int = 6, max_rps: float = 8.0,
+               rate: RateController | None = None, cache: HttpCache | None = None) -> list[dict]:
+    started = time.monotonic()
+    session = make_session(concurrency)
+    rate = rate or RateController(initial_rps=min(4.0, max_rps), max_rps=max_rps, increase=1.0)
+
+    # --- ÉTAPE 1 : Récupérer les données de la Page 1 ET le Build ID ---
+    print("Récupération de la page 1 et du Build ID...")
+    main_url = f"{base_url}/nba-2k/players/"
+
+    def send(extra_headers: dict):
+        rate.wait(main_url)
+        r = session.get(main_url, headers=extra_headers, timeout=30)
+        rate.record(main_url, r.status_code, r.elapsed.total_seconds(), r.headers.get("Retry-After"))
+        metrics.inc("http_bytes_total", len(r.content), host=host_of(main_url))
+        return r
+
+    response = cache.get(main_url, None, send) if cache else send({})
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, 'html.parser')
+
+    data_script = soup.find('script', {'id': '__NEXT_DATA__'})
+    json_data = json.loads(data_script.string)
+
+    # On extrait le Build ID, nécessaire pour appeler l'API
+    build_id = json_data['buildId']
+    print(f"Build ID trouvé : {build_id}")
+
+    all_players_data = extract_players(json_data['props']['pageProps'])
+    print(f"{len(all_players_data)} joueurs de la page 1 ajoutés.")
+
+    # --- ÉTAPE 2 : Pages 2 à last_page via l'API, en parallèle ---
+    all_players_data += asyncio.run(fetch_pages(session, build_id, rate, 2, last_page, concurrency, base_url, cache))
+    metrics.throughput("hoopshype", len(all_players_data), time.monotonic() - started)
+    rate.report()
+    if cache:
+        cache.report()
+    return all_players_data
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--base-url", type=str, default=BASE_URL, help="Hôte à interroger (ex: serveur de fixtures local)")
+    ap.add_argument("--last-page", type=int, default=24, help="Dernière page à demander")
+    ap.add_argument("--concurrency", type=int, default=6, help="Requêtes simultanées")
+    ap.add_argument("--max-rps", type=float, default=8.0, help="Plafond de requêtes/s (le débit s'adapte en dessous)")
+    ap.add_argument("--out", type=str, default="nba_2k_ratings_ALL_PAGES.json", help="Chemin du JSON de sortie")
+    ap.add_argument("--cache-dir", type=str, default=".http_cache", help="Dossier du cache HTTP ('' pour désactiver)")
+    ap.add_argument("--cache-ttl", type=float, default=None, help="Durée (s) pendant laquelle une réponse est servie sans revalidation")
+    ap.add_argument("--cache-max-mb", type=int, default=200, help="Taille max du cache (Mo)")
+    ap.add_argument("--offline", action="store_true", help="Rejoue uniquement le cache, sans réseau")
+    ap.add_argument("--compact", action="store_true", help="JSON compact (un joueur par ligne) au lieu d'indenté")
+    metrics.add_arguments(ap)
+    args = ap.parse_args()
+    metrics.enable_from_args(args)
+
+    try:
+        started = time.monotonic()
+        cache = HttpCache(args.cache_dir, args.cache_ttl, args.cache_max_mb * 1024 * 1024, args.offline) if args.cache_dir else None
+        all_players_data = scrape_all(args.base_url, args.last_page, args.concurrency, args.max_rps, cache=cache)
+
+        # --- ÉTAPE 3 : Sauvegarde finale ---
+        write_records(args.out, all_players_data, indent=4, compact=args.compact)
+
+        print(f"\n✅ Mission accomplie ! {len(all_players_data)} joueurs au total ont été sauvegardés dans '{args.out}' "
+              f"en {time.monotonic() - started:.1f}s.")
+
+    except CacheMiss as e:
+        print(f"\n❌ Page absente du cache HTTP ({args.cache_dir}), {e}")
+        return 1
+    except Exception as e:
+        print(f"\n❌ Une erreur est survenue : {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
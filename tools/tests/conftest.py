@@ -0,0 +1,6 @@
+import os, sys
+
+# les scripts de tools/ (et ceux d'assets/data) s'importent entre eux par leur nom de module
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, os.path.join(HERE, "..", "..", "assets", "data"))
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import balance_sim
+
+
+def test_salary_ask_and_acceptance_follow_advance_week():
+    # _salaryAsk: 80² x 4000 x (1 + 0 x 0.02) x (1 + 65 x 0.004)
+    assert balance_sim.salary_ask(np.array([80]), np.array([0]), np.array([65]))[0] == 32_256_000
+    # _playerAcceptsOffer: palier du ratio, +0.1 après 30 ans, -0.2 x cupidité, borné à [0.1, 0.9]
+    prob = balance_sim.accept_probability(np.array([1.2, 1.0, 0.9, 0.5]), np.array([31, 25, 25, 25]),
+                                          np.array([0.0, 0.5, 0.5, 1.0]))
+    assert prob.tolist() == pytest.approx([0.9, 0.5, 0.3, 0.1])
+
+
+def free_agent_world(players: int = balance_sim.MIN_PLAYERS, teams: int = 5) -> dict:
+    """Tous agents libres, overall = potentiel = 70, 25 ans: pas de progression ni de vieillissement qui compte."""
+    return {"overall": np.full(players, 70, dtype=np.int16), "potential": np.full(players, 70, dtype=np.int16),
+            "age": np.full(players, 25, dtype=np.int16), "pos": np.arange(players, dtype=np.int16) % 5,
+            "team": np.full(players, -1, dtype=np.int16), "teams": [f"T{t}" for t in range(teams)]}
+
+
+def test_offer_count_and_acceptance_match_a_hand_computed_season():
+    config = {"cap": 1e12, "luxuryTaxFactor": 0.0, "offerAggressiveness": 1.0}
+    out = balance_sim.simulate(free_agent_world(), config, leagues=200, seasons=1, seed=1)
+
+    # faBoost: 5 équipes par semaine pendant les semaines 1-12, puis 2 (headroom et agents libres toujours là)
+    assert out["offers"] == 200 * (12 * 5 + 40 * 2)
+    assert out["skipped_no_headroom"] == 0
+    # offre = demande (headroom illimité) -> palier 1.0 -> 0.6 - 0.5 x 0.2 = 50% d'acceptation
+    assert out["accepted"] / out["evaluated"] == pytest.approx(0.5, abs=0.02)
+    # les offres créées en semaines 51-52 ne sont résolues qu'après la saison
+    assert out["evaluated"] <= out["offers"] - 200 * 2 * 2
+
+
+def test_market_opens_when_initial_contracts_expire():
+    world = free_agent_world()
+    world["team"] = (np.arange(len(world["team"])) % 5).astype(np.int16)   # tout le monde sous contrat
+    world["overall"][:] = world["potential"][:] = 95                        # 35-50M: 64 joueurs par équipe >> cap
+    config = {"cap": 150e6, "luxuryTaxFactor": 0.75, "offerAggressiveness": 1.0}
+    out = balance_sim.simulate(world, config, leagues=20, seasons=balance_sim.MIN_SEASONS, seed=3)
+
+    assert out["season_offers"][0] == 0           # équipes au-dessus du cap jusqu'à la semaine 53
+    # contrats relevés en semaine 56: au plus 2 offres par semaine de 56 à 104, et le cap se remplit de nouveau
+    assert 0.9 * 20 * 2 * 49 < out["season_offers"][1] <= 20 * 2 * 49
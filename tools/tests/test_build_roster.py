@@ -0,0 +1,55 @@
+import build_roster
+from pipeline import Pipeline, Stage
+
+
+def test_each_alias_table_is_an_output_of_the_stage_that_learns_it(tmp_path):
+    pipeline = build_roster.make_pipeline(str(tmp_path), str(tmp_path / "out.json"))
+    assert str(tmp_path / "name_aliases_hoopshype.json") in pipeline.stages["apply_hoopshype"].outputs
+    assert str(tmp_path / "name_aliases_2kratings.json") in pipeline.stages["merge_2kratings"].outputs
+    # aucun fichier écrit par deux étapes, ni relu par l'étape qui l'écrit: un second build n'a rien à rejouer
+    outputs = [p for s in pipeline.stages.values() for p in s.outputs]
+    assert len(outputs) == len(set(outputs))
+    assert all(not set(s.inputs) & set(s.outputs) for s in pipeline.stages.values())
+
+
+def test_editing_aliases_makes_the_match_stage_stale(tmp_path):
+    pipeline = build_roster.make_pipeline(str(tmp_path), str(tmp_path / "out.json"))
+    stage = pipeline.stages["merge_2kratings"]
+    for path in stage.inputs + stage.outputs:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{}")
+    pipeline.state[stage.name] = pipeline.fingerprint(stage)
+    assert pipeline.is_fresh(stage)
+    (tmp_path / "name_aliases_2kratings.json").write_text('{"Nic Claxton": "7"}', encoding="utf-8")
+    assert not pipeline.is_fresh(stage)
+
+
+def test_enrich_declares_the_published_roster_as_previous(tmp_path):
+    out = str(tmp_path / "out.json")
+    pipeline = build_roster.make_pipeline(str(tmp_path), out)
+    assert pipeline.stages["enrich"].previous == [out]
+    assert pipeline.closure(["export_app"])[-1] == "export_app"      # pas de cycle
+
+
+def test_previous_output_is_hashed_without_a_dependency(tmp_path):
+    src, mid, out = (str(tmp_path / n) for n in ("src", "mid", "out"))
+    with open(src, "w") as f:
+        f.write("1")
+
+    def copy(a, b, suffix=""):
+        with open(a) as f, open(b, "w") as g:
+            g.write(f.read() + suffix)
+        return 1
+
+    stages = [Stage("first", lambda: copy(src, mid), inputs=[src], outputs=[mid], previous=[out]),
+              Stage("last", lambda: copy(mid, out, "!"), inputs=[mid], outputs=[out])]
+    state = str(tmp_path / "state.json")
+    assert Pipeline(stages, state).run(jobs=1) == {"first": "ran", "last": "ran"}
+    # `out` a changé depuis le passage de `first`: relancé une fois (et son aval), puis le build est stable
+    assert Pipeline(stages, state).run(jobs=1) == {"first": "ran", "last": "ran"}
+    assert Pipeline(stages, state).run(jobs=1) == {"first": "skipped", "last": "skipped"}
+
+
+def test_export_reads_the_roster_store_as_an_input(tmp_path):
+    pipeline = build_roster.make_pipeline(str(tmp_path), str(tmp_path / "out.json"))
+    assert str(tmp_path / "roster.db") in pipeline.stages["export_app"].inputs
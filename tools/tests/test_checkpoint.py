@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import fetch_nba_players
+from checkpoint import JsonlCheckpoint
+from fixture_server import serve_fixtures
+from rate_control import RateController
+from record_io import iter_records
+
+
+def test_resume_truncates_the_interrupted_page(tmp_path):
+    ckpt = JsonlCheckpoint(str(tmp_path / "players.jsonl"))
+    ckpt.append_page(1, [{"extId": "1"}, {"extId": "2"}])
+    # crash au milieu de la page 2: lignes écrites mais curseur jamais mis à jour
+    with open(ckpt.path, "a", encoding="utf-8") as f:
+        f.write('{"extId":"3"}\n{"extId":')
+
+    resumed = JsonlCheckpoint(ckpt.path)
+    cursor = resumed.resume()
+    assert (cursor["page"], cursor["count"], cursor["done"]) == (1, 2, False)
+    assert [r["extId"] for r in resumed.iter_records()] == ["1", "2"]
+
+    resumed.append_page(2, [{"extId": "3"}])
+    assert [r["extId"] for r in resumed.iter_records()] == ["1", "2", "3"]
+
+
+def test_compact_keeps_the_last_record_per_key_and_clears(tmp_path):
+    ckpt = JsonlCheckpoint(str(tmp_path / "players.jsonl"))
+    ckpt.append_page(1, [{"extId": "1", "v": 1}, {"extId": "2", "v": 1}])
+    ckpt.append_page(2, [{"extId": "1", "v": 2}])
+    dest = tmp_path / "players.json"
+
+    assert ckpt.compact(str(dest), key="extId") == 2
+    assert sorted((r["extId"], r["v"]) for r in json.loads(dest.read_text(encoding="utf-8"))) == [("1", 2), ("2", 1)]
+    assert not (tmp_path / "players.jsonl").exists() and not (tmp_path / "players.jsonl.cursor.json").exists()
+    assert JsonlCheckpoint(ckpt.path).resume()["page"] == 0
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Deux pages /players (la troisième est vide) et deux équipes, dont une historique."""
+    root = tmp_path / "fixtures" / "v1"
+    root.mkdir(parents=True)
+    (root / "teams").write_text(json.dumps({"data": [{"id": 1, "conference": "East"},
+                                                     {"id": 99, "conference": " "}]}), encoding="utf-8")
+    pages = [[{"id": 1, "team": {"id": 1}}, {"id": 2, "team": {"id": 99}}], [{"id": 3, "team": {"id": 1}}], []]
+    for n, data in enumerate(pages, start=1):
+        (root / f"players@per_page=2_page={n}").write_text(json.dumps({"data": data}), encoding="utf-8")
+    with serve_fixtures(str(tmp_path / "fixtures")) as url:
+        monkeypatch.setattr(fetch_nba_players, "API_KEY", "test")
+        monkeypatch.setattr(fetch_nba_players, "TEAMS_URL", f"{url}/v1/teams")
+        monkeypatch.setattr(fetch_nba_players, "PLAYERS_URL", f"{url}/v1/players")
+        monkeypatch.setattr(fetch_nba_players, "RATE", RateController(initial_rps=1000, max_rps=1000))
+        monkeypatch.setattr(fetch_nba_players, "CACHE", None)
+        yield
+
+
+def test_fetch_resumes_from_cursor_and_returns_players(api, tmp_path):
+    save = str(tmp_path / "active.json")
+    ckpt = JsonlCheckpoint(str(tmp_path / "active.jsonl"))
+    ckpt.append_page(1, [fetch_nba_players.clean_player({"id": 1, "first_name": "Repris", "team": {"id": 1}})])
+
+    players = fetch_nba_players.fetch_active_players(per_page=2, save_path=save)
+    assert [p["extId"] for p in players] == ["1", "3"]
+    assert players[0]["first_name"] == "Repris"             # page 1 reprise du checkpoint, pas re-téléchargée
+    assert players == list(iter_records(save))
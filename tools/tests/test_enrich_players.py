@@ -0,0 +1,90 @@
+import datetime, json
+
+import pytest
+
+import enrich_players
+from rate_control import RateController
+from fixture_server import serve_fixtures
+
+SEASON = 2025
+AS_OF = datetime.date(2025, 11, 1)
+
+
+def player(ext_id, prenom, nom, **kw):
+    return {"extId": ext_id, "prenom": prenom, "nom": nom, "age": None, "height": None, "weight": None,
+            "country": None, "team": {"id": 1, "full_name": "Boston Celtics"}, **kw}
+
+
+PLAYERS = [
+    player(1, "Jayson", "Tatum"),
+    player(2, "Jaylen", "Brown", height="6-6", weight="223", country="USA"),
+    player(3, "Derrick", "White", age=31),
+]
+
+
+@pytest.fixture
+def api(tmp_path):
+    """API balldontlie rejouée par fixture_server: /v1/players et un endpoint de dates de naissance."""
+    root = tmp_path / "fixtures" / "v1"
+    root.mkdir(parents=True)
+    (root / "players").write_text(json.dumps({"data": [
+        {"id": 1, "height": "6-8", "weight": "210", "country": "USA"},
+        {"id": 3, "height": "6-4", "weight": "190", "country": "USA"},
+    ]}), encoding="utf-8")
+    (root / "bio").write_text(json.dumps({"data": [{"id": 1, "birth_date": "1998-03-03"}]}), encoding="utf-8")
+    with serve_fixtures(str(tmp_path / "fixtures")) as url:
+        yield f"{url}/v1"
+
+
+def enrich(base_url, memo_dir, **kw):
+    return enrich_players.enrich_records(PLAYERS, base_url=base_url, memo_dir=str(memo_dir), season=SEASON,
+                                         workers=2, as_of=AS_OF, **kw)
+
+
+def test_fills_missing_fields_without_overwriting(api, tmp_path):
+    out = {p["extId"]: p for p in enrich(api, tmp_path / "memo", bio_url=f"{api}/bio")}
+    assert (out[1]["height"], out[1]["weight"], out[1]["country"], out[1]["age"]) == ("6-8", "210", "USA", 27)
+    assert out[2]["height"] == "6-6" and out[2]["age"] is None     # inconnu de l'API, rien d'inventé
+    assert out[3]["age"] == 31                                      # valeur présente jamais remplacée
+
+
+def test_memo_answers_the_next_run_without_network(api, tmp_path):
+    first = enrich(api, tmp_path / "memo", bio_url=f"{api}/bio")
+    assert (tmp_path / "memo" / f"enrich_{SEASON}.jsonl").exists()
+    # serveur injoignable: tout doit venir du mémo (y compris "joueur inconnu de l'API")
+    dead = "http://127.0.0.1:9/v1"
+    rate = RateController(clock=lambda: 0.0, sleep=lambda s: None)
+    assert enrich(dead, tmp_path / "memo", bio_url=f"{dead}/bio", rate=rate) == first
+
+
+def test_keeps_ages_of_the_previous_roster(api, tmp_path):
+    previous = tmp_path / "nba_database_final.json"
+    previous.write_text(json.dumps([
+        {"player_id": 1, "full_name": "Jaylen Brown", "bio": {"age": 29}},
+        {"player_id": 2, "full_name": "Jayson Tatum", "bio": {"age": 26}},
+    ]), encoding="utf-8")
+    out = {p["extId"]: p for p in enrich(api, tmp_path / "memo", previous=str(previous))}
+    assert out[2]["age"] == 29
+    assert out[1]["age"] == 26       # sans --bio-url, l'âge publié est conservé au lieu de devenir null
+
+
+def test_previous_ages_grow_with_the_time_elapsed(api, tmp_path):
+    previous = tmp_path / "nba_database_final.json"
+    previous.write_text(json.dumps([
+        {"player_id": 1, "full_name": "Jayson Tatum", "bio": {"age": 25, "age_as_of": "2023-10-15"}},
+        {"player_id": 2, "full_name": "Jaylen Brown", "bio": {"age": 28, "age_as_of": "2024-11-02"}},
+    ]), encoding="utf-8")
+    out = {p["extId"]: p for p in enrich(api, tmp_path / "memo", previous=str(previous))}
+    assert (out[1]["age"], out[1]["age_as_of"]) == (27, "2025-11-01")   # deux ans écoulés
+    assert out[2]["age"] == 28                                          # un an moins un jour
+    assert out[3]["age_as_of"] == "2025-11-01"
+
+
+def test_api_key_is_only_required_when_a_request_is_sent(tmp_path, monkeypatch):
+    monkeypatch.setattr(enrich_players.fetch_nba_players, "API_KEY", "REPLACE_ME")
+    monkeypatch.setattr(enrich_players.fetch_nba_players, "CACHE", None)
+    complete = [player(1, "Jayson", "Tatum", age=27, height="6-8", weight="210", country="USA")]
+    out = enrich_players.enrich_records(complete, memo_dir=str(tmp_path / "memo"), season=SEASON, as_of=AS_OF)
+    assert out[0]["age"] == 27
+    with pytest.raises(RuntimeError, match="clé"):
+        enrich_players.enrich_records(PLAYERS, memo_dir=str(tmp_path / "memo"), season=SEASON, as_of=AS_OF)
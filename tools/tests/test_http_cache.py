@@ -0,0 +1,70 @@
+import asyncio, json, shutil
+
+import pytest
+import requests
+
+import scraper_2k
+from fixture_server import serve_fixtures
+from http_cache import HttpCache, CacheMiss
+from rate_control import RateController
+
+
+def response(status: int, body: bytes = b"", etag: str | None = None) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r._content = body
+    if etag:
+        r.headers["ETag"] = etag
+    return r
+
+
+def evict_all(cache: HttpCache):
+    for sub in cache.directory.iterdir():
+        if sub.is_dir():
+            shutil.rmtree(sub)
+
+
+def test_304_for_an_evicted_entry_is_refetched_without_validators(tmp_path):
+    cache = HttpCache(tmp_path / "cache")
+    cache.get("http://api.test/teams", None, lambda h: response(200, b'{"v": 1}', etag='"a"'))
+    sent = []
+
+    def send(extra_headers):
+        sent.append(extra_headers)
+        if extra_headers:
+            evict_all(cache)          # évincée pendant que la requête conditionnelle était en vol
+            return response(304)
+        return response(200, b'{"v": 2}', etag='"b"')
+
+    r = cache.get("http://api.test/teams", None, send)
+    assert r.json() == {"v": 2}
+    assert sent == [{"If-None-Match": '"a"'}, {}]
+    assert cache.conditional_headers("http://api.test/teams") == {"If-None-Match": '"b"'}   # nouveau corps stocké
+
+
+def test_offline_miss_names_the_url(tmp_path):
+    cache = HttpCache(tmp_path / "cache", offline=True)
+    with pytest.raises(CacheMiss, match=r"pas dans le cache.*players\?page=2"):
+        cache.get("http://api.test/players", {"page": 2}, lambda h: pytest.fail("aucune requête hors-ligne"))
+
+
+def test_async_fetch_retries_an_evicted_304(tmp_path):
+    root = tmp_path / "fixtures"
+    root.mkdir()
+    (root / "page.json").write_text(json.dumps({"page": 2}), encoding="utf-8")
+    cache = HttpCache(tmp_path / "cache")
+    rate = RateController(initial_rps=1000, max_rps=1000)
+    with serve_fixtures(str(root)) as url:
+        session = scraper_2k.make_session(1)
+        assert asyncio.run(scraper_2k.fetch_json(session, f"{url}/page.json", rate, cache)) == {"page": 2}
+
+        headers = cache.conditional_headers
+
+        def evicting_headers(*args):
+            out = headers(*args)
+            evict_all(cache)
+            return out
+
+        cache.conditional_headers = evicting_headers
+        assert asyncio.run(scraper_2k.fetch_json(session, f"{url}/page.json", rate, cache, base_delay=0)) == {"page": 2}
+    assert cache.revalidated == 0 and cache.misses == 2
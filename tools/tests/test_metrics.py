@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import metrics
+import scraper_2k
+from fixture_server import serve_fixtures
+from rate_control import RateController
+
+
+def page_props(players: list[tuple[str, str, int]]) -> dict:
+    """Même imbrication que les pages hoopshype (voir scraper_2k.extract_players)."""
+    ratings = [{"fullPlayer": {"firstName": first, "lastName": last}, "rating": str(rating)}
+               for first, last, rating in players]
+    data = {"pages": [{"videoGameRatings": {"videoGameRatings": ratings}}]}
+    return {"dehydratedState": {"queries": [{}, {}, {}, {"state": {"data": data}}]}}
+
+
+@pytest.fixture
+def hoopshype(tmp_path):
+    """Page 1 en HTML (__NEXT_DATA__ + buildId), page 2 via l'API JSON, page 3 en 404."""
+    root = tmp_path / "fixtures"
+    (root / "nba-2k" / "players").mkdir(parents=True)
+    next_data = {"buildId": "b1", "props": {"pageProps": page_props([("Nikola", "Jokić", 98), ("Luka", "Dončić", 95)])}}
+    (root / "nba-2k" / "players" / "index.html").write_text(
+        f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data)}</script>', encoding="utf-8")
+    api = root / "_next" / "data" / "b1" / "nba-2k"
+    api.mkdir(parents=True)
+    (api / "players.json@page=2").write_text(json.dumps({"pageProps": page_props([("Jayson", "Tatum", 93)])}),
+                                             encoding="utf-8")
+    with serve_fixtures(str(root)) as url:
+        yield url
+
+
+@pytest.fixture
+def registry(tmp_path):
+    yield metrics.enable(events=str(tmp_path / "run.jsonl"), prometheus=str(tmp_path / "run.prom"))
+    metrics.close()
+
+
+def scrape(url):
+    return scraper_2k.scrape_all(url, last_page=3, concurrency=2, rate=RateController(initial_rps=1000, max_rps=1000))
+
+
+def test_scrape_records_counters_events_and_a_prometheus_snapshot(hoopshype, registry, tmp_path):
+    players = scrape(hoopshype)
+    assert [p["nom"] for p in players] == ["Nikola Jokić", "Luka Dončić", "Jayson Tatum"]
+
+    host = hoopshype.split("//", 1)[1]
+    counters = registry.snapshot()["counters"]
+    assert counters[f'http_requests_total{{host="{host}",status="200"}}'] == 2
+    assert counters[f'http_requests_total{{host="{host}",status="404"}}'] == 1
+    assert counters['records_total{source="hoopshype"}'] == 3
+    assert counters[f'http_bytes_total{{host="{host}"}}'] > 0
+
+    metrics.close()
+    events = [json.loads(line) for line in (tmp_path / "run.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [e["event"] for e in events][0] == "run_start" and events[-1]["event"] == "run_end"
+    assert len({e["run"] for e in events}) == 1
+    assert [(e["source"], e["page"], e["players"]) for e in events if e["event"] == "page"] == [("hoopshype", 2, 1)]
+    assert next(e for e in events if e["event"] == "records")["count"] == 3
+    prom = (tmp_path / "run.prom").read_text(encoding="utf-8")
+    assert "# TYPE records_total counter" in prom and 'records_total{source="hoopshype"} 3' in prom
+    assert f'http_request_seconds_count{{host="{host}"}} 3' in prom
+
+
+def test_disabled_metrics_record_nothing(hoopshype, tmp_path):
+    assert not metrics.enabled()
+    assert len(scrape(hoopshype)) == 3
+    assert metrics.timed("stage_seconds", stage="x") is metrics._NULL_TIMER
+    assert list(tmp_path.glob("*.prom")) == [] and list(tmp_path.glob("*.jsonl")) == []
@@ -0,0 +1,173 @@
+import os
+import urllib.request
+
+import pytest
+
+newupdate2k = pytest.importorskip("newupdate2k")
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+
+from fixture_server import serve_fixtures
+from rate_control import RateController
+
+BASE = "http://2k.test"
+TEAMS = [f"{BASE}/teams/a", f"{BASE}/teams/b"]
+ROSTERS = {TEAMS[0]: ["a1", "a2", "a3"], TEAMS[1]: ["b1", "b2", "b3"]}
+
+
+def team_page(slugs):
+    rows = "".join(f"<tr><td><a href='/players/{s}'>{s}</a></td><td>80</td></tr>" for s in slugs)
+    return f"<table><tbody>{rows}</tbody></table>"
+
+
+def player_page(slug):
+    return (f"<h1>Player {slug}</h1><span class='attribute-box-player'>80</span>"
+            f"<h4 class='card-title'>Potential <span class='attribute-box'>85</span></h4>")
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """Pages servies sans navigateur; `down` contient les URLs qui échouent."""
+    down = set()
+
+    def fetch(pool, rate, url, selectors, timeout, scroll):
+        if url in down:
+            raise RuntimeError("page indisponible")
+        if url in ROSTERS:
+            return team_page(ROSTERS[url])
+        return player_page(url.rsplit("/", 1)[-1])
+
+    monkeypatch.setattr(newupdate2k, "_fetch_with_pool", fetch)
+    return down
+
+
+def crawl(state, delta=False):
+    return list(newupdate2k.scrape_players(TEAMS, parse_workers=0, state=state, delta=delta))
+
+
+def test_failed_team_page_keeps_previous_players(tmp_path, site):
+    state = newupdate2k.RowState(str(tmp_path / "rows.json"))
+    assert len(crawl(state)) == 6 and len(state) == 6
+
+    site.add(TEAMS[1])
+    for delta in (False, True):
+        state = newupdate2k.RowState(str(tmp_path / "rows.json"))
+        players = crawl(state, delta)
+        assert sorted(p["nom"] for p in players) == [f"Player {s}" for s in ("a1", "a2", "a3", "b1", "b2", "b3")]
+        assert len(newupdate2k.RowState(str(tmp_path / "rows.json"))) == 6
+
+
+def test_failed_team_without_previous_state_fails(tmp_path, site):
+    site.add(TEAMS[1])
+    with pytest.raises(RuntimeError, match="teams/b"):
+        crawl(newupdate2k.RowState(str(tmp_path / "rows.json")))
+
+
+def test_blank_player_page_is_retried_then_skipped(tmp_path, monkeypatch, site):
+    calls = {}
+    fetch = newupdate2k._fetch_with_pool
+
+    def flaky(pool, rate, url, selectors, timeout, scroll):
+        calls[url] = calls.get(url, 0) + 1
+        if url.endswith("/a1") and calls[url] == 1 or url.endswith("/b2"):
+            return "<html><body></body></html>"   # page bloquée
+        return fetch(pool, rate, url, selectors, timeout, scroll)
+
+    monkeypatch.setattr(newupdate2k, "_fetch_with_pool", flaky)
+    players = crawl(newupdate2k.RowState(str(tmp_path / "rows.json")))
+    names = sorted(p["nom"] for p in players)
+    assert names == [f"Player {s}" for s in ("a1", "a2", "a3", "b1", "b3")]
+    assert calls[f"{BASE}/players/a1"] == 2 and calls[f"{BASE}/players/b2"] == 2
+
+
+def test_main_exit_code_on_failure(tmp_path, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("plus de navigateur")
+        yield
+
+    monkeypatch.setattr(newupdate2k, "scrape_players", broken)
+    monkeypatch.setattr("sys.argv", ["newupdate2k.py", "--headless", "--out", str(tmp_path / "out.json")])
+    assert newupdate2k.main() == 1
+    assert not (tmp_path / "out.json").exists()
+
+
+def test_reparse_carries_players_missing_from_the_store(tmp_path, site):
+    from page_store import PageStore
+    store = PageStore(str(tmp_path / "pages"))
+    state = newupdate2k.RowState(str(tmp_path / "rows.json"))
+    list(newupdate2k.scrape_players(TEAMS, parse_workers=0, state=state, store=store))
+
+    os.remove(store.file_of(store.entries()[TEAMS[1]]))               # page d'équipe perdue
+    os.remove(store.file_of(store.entries()[f"{BASE}/players/a2"]))    # page joueur perdue
+    state = newupdate2k.RowState(str(tmp_path / "rows.json"))
+    players = list(newupdate2k.reparse(PageStore(store.directory), parse_workers=0, state=state))
+    assert sorted(p["nom"] for p in players) == [f"Player {s}" for s in ("a1", "a2", "a3", "b1", "b2", "b3")]
+    assert len(newupdate2k.RowState(str(tmp_path / "rows.json"))) == 6
+
+
+def test_delta_refetches_only_the_changed_row(tmp_path, monkeypatch, site):
+    state = newupdate2k.RowState(str(tmp_path / "rows.json"))
+    crawl(state)
+
+    calls = []
+    fetch = newupdate2k._fetch_with_pool
+
+    def counting(pool, rate, url, selectors, timeout, scroll):
+        calls.append(url)
+        html = fetch(pool, rate, url, selectors, timeout, scroll)
+        # la note de b2 a bougé sur la page d'équipe
+        return html.replace("b2</a></td><td>80", "b2</a></td><td>81") if url == TEAMS[1] else html
+
+    monkeypatch.setattr(newupdate2k, "_fetch_with_pool", counting)
+    players = crawl(newupdate2k.RowState(str(tmp_path / "rows.json")), delta=True)
+    assert sorted(calls) == sorted(TEAMS + [f"{BASE}/players/b2"])
+    assert len(players) == 6
+
+
+class HttpDriver:
+    """Navigateur minimal pour le DriverPool: GET HTTP, sélecteurs CSS via BeautifulSoup (pas de Chrome ici)."""
+    created = []
+
+    def __init__(self):
+        self.page_source, self.visited, self.closed = "", [], False
+        HttpDriver.created.append(self)
+
+    def get(self, url):
+        with urllib.request.urlopen(url) as r:
+            self.page_source = r.read().decode("utf-8")
+        self.visited.append(url)
+
+    def execute_script(self, script):
+        pass
+
+    def find_element(self, by, selector):
+        element = BeautifulSoup(self.page_source, "html.parser").select_one(selector)
+        if element is None:
+            raise NoSuchElementException(selector)
+        return element
+
+    def quit(self):
+        self.closed = True
+
+
+def test_driver_pool_scrapes_the_fixture_server(tmp_path, monkeypatch):
+    root = tmp_path / "fixtures"
+    for team, slugs in (("a", ROSTERS[TEAMS[0]]), ("b", ROSTERS[TEAMS[1]])):
+        (root / "teams").mkdir(parents=True, exist_ok=True)
+        (root / "teams" / team).write_text(team_page(slugs), encoding="utf-8")
+        for slug in slugs:
+            (root / "players").mkdir(exist_ok=True)
+            (root / "players" / slug).write_text(player_page(slug), encoding="utf-8")
+    HttpDriver.created = []
+    monkeypatch.setattr(newupdate2k, "make_driver", lambda headless: HttpDriver())
+
+    with serve_fixtures(str(root)) as url:
+        players = list(newupdate2k.scrape_players([f"{url}/teams/a", f"{url}/teams/b"], workers=2, timeout=1,
+                                                  rate=RateController(initial_rps=1000, max_rps=1000),
+                                                  parse_workers=0))
+    assert sorted((p["nom"], p["Overall"], p["potential"]) for p in players) == \
+        [(f"Player {s}", 80, 85) for s in ("a1", "a2", "a3", "b1", "b2", "b3")]
+    # deux navigateurs au plus, partagés entre les 8 pages puis fermés
+    assert 1 <= len(HttpDriver.created) <= 2
+    assert sum(len(d.visited) for d in HttpDriver.created) == 8
+    assert all(d.closed for d in HttpDriver.created)
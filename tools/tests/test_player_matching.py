@@ -0,0 +1,46 @@
+from name_normalization import AliasTable
+from player_matching import match_names
+
+
+def methods(report, targets, sources):
+    return {targets[m.target]: (sources[m.source], m.method) for m in report.matches}
+
+
+def test_exact_match_beats_stale_alias(tmp_path):
+    aliases = AliasTable(str(tmp_path / "aliases.json"))
+    # 1er passage: Keldon absent de la source, Keon absent des cibles -> appariement approché (0.923)
+    match_names(["Keldon Johnson"], ["Keon Johnson"], aliases=aliases, target_ids=["10"])
+    aliases.add("Keon Johnson", "10")    # même si l'alias a été appris (ou saisi) à tort
+
+    # 2e passage: les deux joueurs sont présents des deux côtés, les égalités exactes l'emportent
+    targets, sources = ["Keldon Johnson", "Keon Johnson"], ["Keon Johnson", "Keldon Johnson"]
+    report = match_names(targets, sources, aliases=aliases, target_ids=["10", "11"])
+    assert methods(report, targets, sources) == {
+        "Keldon Johnson": ("Keldon Johnson", "exact"),
+        "Keon Johnson": ("Keon Johnson", "exact"),
+    }
+
+
+def test_alias_applies_when_no_exact_match(tmp_path):
+    aliases = AliasTable(str(tmp_path / "aliases.json"))
+    aliases.add("Nic Claxton", "7")
+    report = match_names(["Nicolas Claxton"], ["Nic Claxton"], aliases=aliases, target_ids=["7"])
+    assert [(m.target, m.source, m.method) for m in report.matches] == [(0, 0, "alias")]
+
+
+def test_learns_only_clear_fuzzy_matches(tmp_path):
+    aliases = AliasTable(str(tmp_path / "aliases.json"))
+    targets, sources = ["Nikola Jokic", "Nikola Jovic", "Jalen Williams"], ["Nikola Jokich", "Jalen Wiliams"]
+    report = match_names(targets, sources, aliases=aliases, target_ids=["1", "2", "3"])
+    assert methods(report, targets, sources) == {
+        "Nikola Jokic": ("Nikola Jokich", "fuzzy"),
+        "Jalen Williams": ("Jalen Wiliams", "fuzzy"),
+    }
+    # "Nikola Jokich" est presque aussi proche de Jovic (0.88): apparié, mais pas appris
+    assert aliases.aliases == {"Jalen Wiliams": "3"}
+
+
+def test_exact_matches_are_not_stored_as_aliases(tmp_path):
+    aliases = AliasTable(str(tmp_path / "aliases.json"))
+    match_names(["Luka Dončić"], ["Luka Doncic"], aliases=aliases, target_ids=["5"])
+    assert len(aliases) == 0 and not aliases.dirty
@@ -0,0 +1,78 @@
+import pytest
+
+from rate_control import RateController, parse_retry_after
+
+URL = "http://api.test/v1/players"
+EPOCH = 1_700_000_000.0   # 2023-11-14T22:13:20Z
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+        self.slept = []
+
+    def now(self):
+        return self.t
+
+    def advance(self, seconds):
+        self.slept.append(seconds)
+        self.t += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def controller(clock, **kw):
+    kw = {"initial_rps": 1.0, "max_rps": 2.0, "increase": 0.5, "cooldown": 5.0, **kw}
+    return RateController(clock=clock.now, sleep=clock.advance, epoch=EPOCH, **kw)
+
+
+def test_slots_are_spaced_by_the_current_rate(clock):
+    rc = controller(clock)
+    assert [rc.wait(URL) for _ in range(3)] == [0.0, 1.0, 1.0]
+    assert clock.t == 2.0
+
+
+def test_additive_increase_up_to_the_ceiling(clock):
+    rc = controller(clock)
+    for _ in range(5):
+        rc.record(URL, 200, latency=0.1)
+    assert rc.stats()["hosts"]["api.test"]["rps"] == 2.0
+
+
+def test_slow_responses_stop_the_increase(clock):
+    rc = controller(clock, max_rps=10.0)
+    rc.record(URL, 200, latency=0.1)
+    rate = rc.stats()["hosts"]["api.test"]["rps"]
+    for _ in range(5):
+        rc.record(URL, 200, latency=2.0)
+    assert rc.stats()["hosts"]["api.test"]["rps"] == rate
+
+
+def test_429_halves_the_rate_and_backs_off_exponentially(clock):
+    rc = controller(clock)
+    assert rc.record_throttle(URL) == 5.0
+    assert rc.record_throttle(URL) == 10.0
+    assert rc.stats()["hosts"]["api.test"]["rps"] == 0.25
+    assert rc.wait(URL) == 10.0              # la pause la plus longue l'emporte
+    rc.record(URL, 200)
+    assert rc.record_throttle(URL) == 5.0    # un succès remet le compteur à zéro
+
+
+def test_retry_after_seconds_and_http_date_use_the_injected_clock(clock):
+    rc = controller(clock)
+    clock.t = 100.0
+    assert rc.record_throttle(URL, "30") == 30.0
+    # date HTTP 42 s après "maintenant" (EPOCH + 100) selon l'horloge injectée, pas l'horloge murale
+    assert rc.record_throttle(URL, "Tue, 14 Nov 2023 22:15:42 GMT") == pytest.approx(42.0)
+    assert rc.wait(URL) == pytest.approx(42.0)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Tue, 14 Nov 2023 22:13:20 GMT", now=EPOCH - 5) == 5.0
+    assert parse_retry_after("Tue, 14 Nov 2023 22:13:20 GMT", now=EPOCH + 5) == 0.0
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import ratings_history
+
+
+def player(ext_id: str, nom: str, overall, potential=None, team: str | None = "Boston Celtics", age: int = 25) -> dict:
+    return {"extId": ext_id, "prenom": "J", "nom": nom, "overall": overall, "potential": potential, "age": age,
+            "team": {"full_name": team} if team else {}}
+
+
+BEFORE = [player("3", "Brown", 85, 88), player("1", "Tatum", 93, 94), player("2", "Holiday", 82, None)]
+AFTER = [player("1", "Tatum", 95, 95), player("3", "Brown", 84, 88), player("4", "Pritchard", 76, 79, team=None)]
+
+
+def test_write_read_diff_round_trip(tmp_path):
+    directory = str(tmp_path / "history")
+    # deux exports dans la même seconde: deux fichiers, dans l'ordre
+    first = ratings_history.save_snapshot(directory, BEFORE, taken_at=1_760_000_000.25)
+    second = ratings_history.save_snapshot(directory, AFTER, taken_at=1_760_000_000.75)
+    assert ratings_history.list_snapshots(directory) == [first, second]
+
+    old, new = (ratings_history.load_snapshot(p) for p in (first, second))
+    assert old.player_id.tolist() == [1, 2, 3] and old.potential.tolist() == [94, ratings_history.MISSING, 88]
+    assert new.taken_at == 1_760_000_000.75
+    assert new.team_names().tolist() == ["Boston Celtics", "Boston Celtics", ""]
+
+    d = ratings_history.diff(old, new)
+    assert d["player_id"].tolist() == [1, 3] and d["delta"].tolist() == [2, -1]
+    assert d["added"].tolist() == [4] and d["removed"].tolist() == [2]
+    assert ratings_history.movers(old, new) == ([("J Tatum", 93, 95, 2)], [("J Brown", 85, 84, -1)])
+    vocab, means = ratings_history.team_means([old, new])
+    assert vocab == ["Boston Celtics"] and means[:, 0].tolist() == pytest.approx([(85 + 93 + 82) / 3, 89.5])
+
+
+def test_existing_snapshot_is_never_overwritten(tmp_path):
+    directory = str(tmp_path / "history")
+    path = ratings_history.save_snapshot(directory, BEFORE, taken_at=1_760_000_000.5)
+    with pytest.raises(FileExistsError):
+        ratings_history.save_snapshot(directory, AFTER, taken_at=1_760_000_000.5)
+    assert np.array_equal(ratings_history.load_snapshot(path).overall, [93, 82, 85])
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from record_io import RecordWriter, iter_records, write_records
+
+RECORDS = [
+    {"nom": "Nikola Jokić", "Overall": 98, "bio": {"age": 30, "taille": None}},
+    {"nom": "D'Angelo Russell", "Overall": 77, "notes": [1.5, -2, 1e20, "a,b]"]},
+    [1, 2, 3],
+    12345678901234567890,
+    "chaîne seule",
+    None,
+]
+
+
+@pytest.mark.parametrize("name, kwargs", [("out.json", {}), ("out.json", {"compact": True}), ("out.jsonl", {})])
+@pytest.mark.parametrize("chunk_size", [7, 1 << 16])
+def test_round_trip(tmp_path, name, kwargs, chunk_size):
+    path = str(tmp_path / name)
+    assert write_records(path, iter(RECORDS), **kwargs) == len(RECORDS)
+    # petits blocs: enregistrements et nombres coupés en plein milieu
+    assert list(iter_records(path, chunk_size=chunk_size)) == RECORDS
+
+
+def test_indented_array_matches_json_dump(tmp_path):
+    path = tmp_path / "out.json"
+    write_records(str(path), RECORDS)
+    assert path.read_text(encoding="utf-8") == json.dumps(RECORDS, ensure_ascii=False, indent=2)
+    write_records(str(path), [])
+    assert path.read_text(encoding="utf-8") == "[]" and list(iter_records(str(path))) == []
+
+
+def test_failed_write_leaves_destination_untouched(tmp_path):
+    path = tmp_path / "out.json"
+    write_records(str(path), RECORDS[:1])
+    before = path.read_text(encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with RecordWriter(str(path)) as out:
+            out.write({"nom": "à moitié"})
+            raise RuntimeError("crash")
+    assert path.read_text(encoding="utf-8") == before
+    assert not (tmp_path / "out.json.tmp").exists()
+
+
+def test_invalid_jsonl_line_is_located(tmp_path):
+    path = tmp_path / "bad.jsonl"
+    path.write_text('{"a": 1}\n\n{"a": \n', encoding="utf-8")
+    with pytest.raises(ValueError, match=r"bad\.jsonl:3"):
+        list(iter_records(str(path)))
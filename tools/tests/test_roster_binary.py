@@ -0,0 +1,43 @@
+import struct
+
+import pytest
+
+from roster_binary import Roster, encode_roster, write_roster, read_roster
+
+
+def app_record(i, name, **kw):
+    return {
+        "player_id": i, "full_name": name, "slug": name.lower().replace(" ", "_"),
+        "bio": {"age": 24, "country": "FR", "height_m": 2.03, "height_ft": 6.66, "weight_kg": 99.8, "weight_lb": 220},
+        "team": {"team_id": 5, "team_name": "Boston Celtics", "conference": "Est"},
+        "position_primary": "F", "position_secondary": None,
+        "ratings": {"overall": 85, "potential": 90}, **kw,
+    }
+
+
+def test_round_trip(tmp_path):
+    records = [app_record(1, "Victor Wembanyama"),
+               app_record(2, "Nikola Jokić", team={"team_id": None, "team_name": None, "conference": None},
+                          ratings={"overall": 50, "potential": 40})]
+    path = str(tmp_path / "roster.bin")
+    assert write_roster(path, records) == 2
+    out = list(read_roster(path).iter_records())
+    assert out[0] == records[0]
+    assert out[1]["team"] == {"team_id": None, "team_name": None, "conference": None}
+    assert out[1]["ratings"] == {"overall": 60, "potential": 60}   # bornées comme dans l'app
+
+
+def test_more_than_65535_distinct_strings():
+    records = [app_record(i, f"Player {i}") for i in range(40_000)]   # 80 000 noms et slugs distincts
+    roster = Roster(encode_roster(records))
+    assert len(roster.strings) > 0xFFFF
+    assert roster.record(39_999)["full_name"] == "Player 39999"
+    assert roster.record(39_999)["position_secondary"] is None
+
+
+
+def test_rejects_other_versions():
+    data = bytearray(encode_roster([app_record(1, "Luka Doncic")]))
+    struct.pack_into("<H", data, 4, 1)
+    with pytest.raises(ValueError, match="version de roster non supportée: 1"):
+        Roster(bytes(data))
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from roster_store import RosterStore
+
+BOS = {"id": 2, "full_name": "Boston Celtics", "abbreviation": "BOS", "conference": "East"}
+DAL = {"id": 7, "full_name": "Dallas Mavericks", "abbreviation": "DAL", "conference": "West"}
+
+
+def player(ext_id: str, prenom: str, nom: str, team: dict, age: int = 25) -> dict:
+    return {"extId": ext_id, "prenom": prenom, "nom": nom, "position": "G", "age": age, "team": team}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with RosterStore(str(tmp_path / "roster.db")) as s:
+        s.sync_players([player("1", "Luka", "Dončić", DAL), player("2", "Jayson", "Tatum", BOS)], taken_at=100)
+        yield s
+
+
+def test_sync_upserts_and_deactivates_missing_players(store):
+    store.sync_players([player("1", "Luka", "Dončić", DAL, age=26), player("3", "Jaylen", "Brown", BOS)], taken_at=200)
+
+    assert store.player("1")["age"] == 26 and store.player("1")["active"] == 1
+    assert store.player("2")["active"] == 0                     # absent du roster: gardé mais inactif
+    assert [p["last_name"] for p in store.team("BOS")] == ["Brown"]
+    assert [p["player_id"] for p in store.find("Luka Doncic")] == ["1"]
+    assert store.counts()["players"] == 3
+
+
+def test_team_change_closes_the_current_membership(store):
+    store.sync_players([player("1", "Luka", "Dončić", BOS), player("2", "Jayson", "Tatum", BOS)], taken_at=200)
+
+    history = store.team_history("1")
+    assert [(t["abbreviation"], t["since"], t["until"]) for t in history] == [("DAL", 100, 200), ("BOS", 200, None)]
+    assert store.team_history("2") == [dict(team_id=2, team_name="Boston Celtics", abbreviation="BOS",
+                                            conference="East", since=100, until=None)]
+
+
+def test_add_ratings_only_stores_changes_of_known_players(store):
+    assert store.add_ratings("2kratings", [("1", 95, 97), ("2", 93, 94), ("99", 70, 70)], taken_at=100) == 2
+    assert store.add_ratings("2kratings", [("1", 95, 97), ("2", 92, 94)], taken_at=200) == 1
+
+    assert [(s["taken_at"], s["overall"]) for s in store.rating_history("2")] == [(100, 93), (200, 92)]
+    assert [s["taken_at"] for s in store.rating_history("1")] == [100]
+    ratings = {p["extId"]: (p["overall"], p["potential"]) for p in store.master_records()}
+    assert ratings == {"1": (95, 97), "2": (92, 94)}           # note inchangée du joueur 1 toujours exportée
+
+
+def test_master_records_drop_ratings_missing_from_the_last_run(store):
+    store.add_ratings("2kratings", [("1", 95, 97), ("2", 93, 94)], taken_at=100)
+    store.add_ratings("hoopshype", [("2", 91, None)], taken_at=100)
+    # 2kratings ne relève plus le joueur 2: sa note de 2kratings est périmée, celle de hoopshype prend le relais
+    store.add_ratings("2kratings", [("1", 95, 97)], taken_at=200)
+    store.add_ratings("hoopshype", [], taken_at=200)
+
+    records = store.master_records()
+    assert [(p["nom"], p["overall"], p["potential"]) for p in records] == [("Dončić", 95, 97), ("Tatum", None, None)]
+    assert records[0]["team"]["abbreviation"] == "DAL"
+
+    store.add_ratings("hoopshype", [("2", 90, None)], taken_at=300)
+    assert store.master_records()[1]["overall"] == 90
+
+
+def test_version_1_database_keeps_its_last_ratings(tmp_path):
+    path = str(tmp_path / "roster.db")
+    with RosterStore(path) as s:
+        s.sync_players([player("1", "Luka", "Dončić", DAL)], taken_at=100)
+        s.add_ratings("2kratings", [("1", 95, 97)], taken_at=100)
+        s.conn.executescript("DROP TABLE ratings_seen; DROP TABLE rating_runs; "
+                             "ALTER TABLE players DROP COLUMN age_as_of; PRAGMA user_version = 1;")
+
+    with RosterStore(path) as s:
+        assert [(p["overall"], p["potential"]) for p in s.master_records()] == [(95, 97)]
+    assert sqlite3.connect(path).execute("PRAGMA user_version").fetchone()[0] == 3
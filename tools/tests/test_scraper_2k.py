@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+import requests
+
+import scraper_2k
+from rate_control import RateController
+
+
+def response(status: int, body: bytes = b"", retry_after: str | None = None) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r._content = body
+    if retry_after:
+        r.headers["Retry-After"] = retry_after
+    return r
+
+
+class StubSession:
+    """Session requests qui rejoue une suite de réponses et note les URLs demandées."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append(url)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def rate(monkeypatch):
+    """Contrôleur rapide dont les pauses (Retry-After ou cooldown) sont notées."""
+    rc = RateController(initial_rps=1000, max_rps=1000, cooldown=60)
+    rc.pauses = []
+    throttle = rc.record_throttle
+
+    def record_throttle(url, retry_after=None):
+        rc.pauses.append(throttle(url, retry_after))
+        return rc.pauses[-1]
+
+    monkeypatch.setattr(rc, "record_throttle", record_throttle)
+    return rc
+
+
+def test_async_fetch_waits_retry_after_then_succeeds(rate):
+    session = StubSession(response(429, retry_after="0"), response(200, b'{"page": 2}'))
+    url = "http://hoopshype.test/_next/data/b/nba-2k/players.json?page=2"
+
+    assert asyncio.run(scraper_2k.fetch_json(session, url, rate, base_delay=0)) == {"page": 2}
+    assert session.calls == [url, url]
+    assert rate.pauses == [0]                    # Retry-After suivi, pas le cooldown de 60s
+    assert rate.stats()["total"]["throttled"] == 1
+
+
+def test_main_page_throttle_honours_retry_after(monkeypatch, rate):
+    monkeypatch.setattr(scraper_2k, "make_session", lambda size: StubSession(response(429, retry_after="7")))
+    with pytest.raises(requests.HTTPError):
+        scraper_2k.scrape_all("http://hoopshype.test", rate=rate)
+    assert rate.pauses == [7]
+
+
+def test_main_exit_code_on_failure(tmp_path, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("site indisponible")
+
+    monkeypatch.setattr(scraper_2k, "scrape_all", broken)
+    monkeypatch.setattr("sys.argv", ["scraper_2k.py", "--cache-dir", "", "--out", str(tmp_path / "out.json")])
+    assert scraper_2k.main() == 1
+    assert not (tmp_path / "out.json").exists()